@@ -5,8 +5,29 @@ sys.path.append('.')
 
 from app.database import SessionLocal, engine
 from app.models import User, Puzzle, PuzzleCell, Clue
-from app.models.puzzle import Direction
-from datetime import datetime
+from app.utils.grid import Grid
+
+# Word square: every row reads the same as the matching column
+SAMPLE_ROWS = [
+    "HEART",
+    "EMBER",
+    "ABUSE",
+    "RESIN",
+    "TREND",
+]
+
+SAMPLE_CLUES = {
+    ("HEART", "ACROSS"): "Organ that pumps blood",
+    ("EMBER", "ACROSS"): "Glowing coal",
+    ("ABUSE", "ACROSS"): "Misuse",
+    ("RESIN", "ACROSS"): "Sticky tree secretion",
+    ("TREND", "ACROSS"): "Fad",
+    ("HEART", "DOWN"): "Courage",
+    ("EMBER", "DOWN"): "Campfire remnant",
+    ("ABUSE", "DOWN"): "Mistreat",
+    ("RESIN", "DOWN"): "Amber, originally",
+    ("TREND", "DOWN"): "General direction",
+}
 
 def create_sample_puzzle():
     db = SessionLocal()
@@ -33,68 +54,19 @@ def create_sample_puzzle():
         db.commit()
         db.refresh(puzzle)
         
-        # Create cells - simple pattern with some black squares
-        cells_data = [
-            # Row 0
-            {"row": 0, "col": 0, "solution": "C", "number": 1, "is_black": False},
-            {"row": 0, "col": 1, "solution": "A", "number": None, "is_black": False},
-            {"row": 0, "col": 2, "solution": "T", "number": None, "is_black": False},
-            {"row": 0, "col": 3, "solution": None, "number": None, "is_black": True},
-            {"row": 0, "col": 4, "solution": "D", "number": 2, "is_black": False},
-            # Row 1
-            {"row": 1, "col": 0, "solution": "A", "number": 3, "is_black": False},
-            {"row": 1, "col": 1, "solution": "R", "number": None, "is_black": False},
-            {"row": 1, "col": 2, "solution": "E", "number": None, "is_black": False},
-            {"row": 1, "col": 3, "solution": None, "number": None, "is_black": True},
-            {"row": 1, "col": 4, "solution": "O", "number": None, "is_black": False},
-            # Row 2
-            {"row": 2, "col": 0, "solution": "R", "number": None, "is_black": False},
-            {"row": 2, "col": 1, "solution": "E", "number": None, "is_black": False},
-            {"row": 2, "col": 2, "solution": "D", "number": None, "is_black": False},
-            {"row": 2, "col": 3, "solution": None, "number": None, "is_black": True},
-            {"row": 2, "col": 4, "solution": "G", "number": None, "is_black": False},
-            # Row 3
-            {"row": 3, "col": 0, "solution": None, "number": None, "is_black": True},
-            {"row": 3, "col": 1, "solution": "A", "number": 4, "is_black": False},
-            {"row": 3, "col": 2, "solution": "G", "number": None, "is_black": False},
-            {"row": 3, "col": 3, "solution": "E", "number": None, "is_black": False},
-            {"row": 3, "col": 4, "solution": None, "number": None, "is_black": True},
-            # Row 4
-            {"row": 4, "col": 0, "solution": "S", "number": 5, "is_black": False},
-            {"row": 4, "col": 1, "solution": "U", "number": None, "is_black": False},
-            {"row": 4, "col": 2, "solution": "N", "number": None, "is_black": False},
-            {"row": 4, "col": 3, "solution": None, "number": None, "is_black": True},
-            {"row": 4, "col": 4, "solution": "S", "number": 6, "is_black": False}
-        ]
-        
-        for cell_data in cells_data:
-            cell = PuzzleCell(
-                puzzle_id=puzzle.id,
-                row=cell_data["row"],
-                col=cell_data["col"],
-                solution=cell_data["solution"],
-                number=cell_data["number"],
-                is_black_square=cell_data["is_black"]
-            )
-            db.add(cell)
-        
-        # Create clues
-        clues_data = [
-            {"number": 1, "direction": Direction.ACROSS, "text": "Feline animal", "answer": "CAT"},
-            {"number": 2, "direction": Direction.DOWN, "text": "Canine animal", "answer": "DOG"},
-            {"number": 3, "direction": Direction.ACROSS, "text": "Take care of", "answer": "ARE"},
-            {"number": 4, "direction": Direction.ACROSS, "text": "Years lived", "answer": "AGE"},
-            {"number": 5, "direction": Direction.ACROSS, "text": "Hot star", "answer": "SUN"},
-            {"number": 6, "direction": Direction.DOWN, "text": "Bright star", "answer": "S"}
-        ]
+        # Cells and numbering come straight from the grid
+        grid = Grid(5, 5, "".join(SAMPLE_ROWS))
+        for cell_data in grid.to_cells():
+            db.add(PuzzleCell(puzzle_id=puzzle.id, **cell_data))
         
-        for clue_data in clues_data:
+        # One clue per entry in the grid
+        for number, direction, answer in grid.words():
             clue = Clue(
                 puzzle_id=puzzle.id,
-                number=clue_data["number"],
-                direction=clue_data["direction"],
-                text=clue_data["text"],
-                answer=clue_data["answer"]
+                number=number,
+                direction=direction,
+                text=SAMPLE_CLUES[(answer, direction.value)],
+                answer=answer
             )
             db.add(clue)
         
@@ -108,4 +80,4 @@ def create_sample_puzzle():
         db.close()
 
 if __name__ == "__main__":
-    create_sample_puzzle()
\ No newline at end of file
+    create_sample_puzzle()
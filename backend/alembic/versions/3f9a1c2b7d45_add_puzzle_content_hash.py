@@ -0,0 +1,80 @@
+"""Add puzzle content hash
+
+Revision ID: 3f9a1c2b7d45
+Revises: 6c72db46d69f
+Create Date: 2026-10-19 10:12:04.118203
+
+"""
+import hashlib
+from typing import Optional, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2b7d45'
+down_revision: Union[str, Sequence[str], None] = '6c72db46d69f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _content_hash(grid_size: int, cells, clues) -> Optional[str]:
+    """
+    Frozen copy of Grid.from_cells + Grid.content_hash as of this revision,
+    so later changes to the app can't change what this backfill computes.
+    None for a grid that doesn't fit its size.
+    """
+    squares = ['?'] * (grid_size * grid_size)
+    for cell in cells:
+        row, col = cell['row'], cell['col']
+        if not (0 <= row < grid_size and 0 <= col < grid_size):
+            return None
+        squares[row * grid_size + col] = '.' if cell['is_black_square'] else (cell['solution'] or '?').upper()
+    solution = ''.join(squares)
+    if len(solution) != grid_size * grid_size:
+        return None
+    entries = []
+    for clue in clues:
+        direction = getattr(clue['direction'], 'value', clue['direction'])
+        text = ' '.join((clue['text'] or '').split())
+        answer = ''.join((clue['answer'] or '').upper().split())
+        entries.append(f"{clue['number']}|{direction}|{answer}|{text}")
+    entries.sort()
+    digest = hashlib.sha256(f"{grid_size}x{grid_size}\n{solution}\n".encode('utf-8'))
+    digest.update('\n'.join(entries).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('puzzles') as batch_op:
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+        batch_op.create_index('ix_puzzles_content_hash', ['content_hash'], unique=False)
+
+    # Backfill existing puzzles so re-imports of them are caught too
+    conn = op.get_bind()
+    puzzles = conn.execute(sa.text("SELECT id, grid_size FROM puzzles")).fetchall()
+    for puzzle_id, grid_size in puzzles:
+        cells = conn.execute(
+            sa.text("SELECT row, col, solution, is_black_square FROM puzzle_cells WHERE puzzle_id = :id"),
+            {"id": puzzle_id}
+        ).mappings().all()
+        clues = conn.execute(
+            sa.text("SELECT number, direction, text, answer FROM clues WHERE puzzle_id = :id"),
+            {"id": puzzle_id}
+        ).mappings().all()
+        digest = _content_hash(grid_size, cells, clues)
+        if digest is None:
+            continue
+        conn.execute(
+            sa.text("UPDATE puzzles SET content_hash = :digest WHERE id = :id"),
+            {"digest": digest, "id": puzzle_id}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('puzzles') as batch_op:
+        batch_op.drop_index('ix_puzzles_content_hash')
+        batch_op.drop_column('content_hash')
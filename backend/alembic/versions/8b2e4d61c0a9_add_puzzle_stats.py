@@ -0,0 +1,45 @@
+"""Add puzzle stats
+
+Revision ID: 8b2e4d61c0a9
+Revises: 3f9a1c2b7d45
+Create Date: 2026-10-19 11:03:52.604417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d61c0a9'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2b7d45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Counts from existing progress: run `python backfill_stats.py` afterwards
+    op.create_table(
+        'puzzle_stats',
+        sa.Column('puzzle_id', sa.Integer(), nullable=False),
+        sa.Column('starts', sa.Integer(), nullable=False),
+        sa.Column('completions', sa.Integer(), nullable=False),
+        sa.Column('score_total', sa.BigInteger(), nullable=False),
+        sa.Column('solve_time_total', sa.BigInteger(), nullable=False),
+        sa.Column('solve_time_sketch', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['puzzle_id'], ['puzzles.id'], ),
+        sa.PrimaryKeyConstraint('puzzle_id')
+    )
+    # A zero row per existing puzzle, so saves only ever update (and lock) one
+    op.execute(
+        "INSERT INTO puzzle_stats (puzzle_id, starts, completions, score_total, solve_time_total) "
+        "SELECT id, 0, 0, 0, 0 FROM puzzles"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('puzzle_stats')
@@ -0,0 +1,46 @@
+"""Add progress state archive
+
+Revision ID: a9d3e6f1c274
+Revises: f2c8d4a61b37
+Create Date: 2026-10-19 16:41:52.905113
+
+"""
+import zlib
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3e6f1c274'
+down_revision: Union[str, Sequence[str], None] = 'f2c8d4a61b37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user_progress', sa.Column('state_archive', sa.LargeBinary(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Put archived states back in current_state before the column goes
+    progress = sa.table(
+        'user_progress',
+        sa.column('id', sa.Integer),
+        sa.column('current_state', sa.Text),
+        sa.column('state_archive', sa.LargeBinary)
+    )
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(progress.c.id, progress.c.state_archive).where(
+        progress.c.state_archive.isnot(None)
+    )).all()
+    for progress_id, data in rows:
+        bind.execute(progress.update().where(progress.c.id == progress_id).values(
+            current_state=zlib.decompress(data).decode('utf-8'), state_archive=None
+        ))
+    # SQLite can't drop columns in place on older versions; batch mode recreates the table
+    with op.batch_alter_table('user_progress') as batch_op:
+        batch_op.drop_column('state_archive')
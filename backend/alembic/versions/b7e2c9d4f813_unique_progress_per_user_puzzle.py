@@ -0,0 +1,42 @@
+"""Unique progress per user and puzzle
+
+Revision ID: b7e2c9d4f813
+Revises: d5b81f3e9a60
+Create Date: 2026-10-19 19:12:08.514337
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2c9d4f813'
+down_revision: Union[str, Sequence[str], None] = 'd5b81f3e9a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Racing first saves could insert two rows for one user and puzzle: keep
+    # the completed (then furthest along, then newest) one. Starts counted
+    # twice are corrected by running `python backfill_stats.py` afterwards
+    op.execute(
+        "DELETE FROM user_progress WHERE id IN ("
+        " SELECT id FROM ("
+        "  SELECT id, ROW_NUMBER() OVER ("
+        "   PARTITION BY user_id, puzzle_id"
+        "   ORDER BY CASE WHEN is_completed THEN 1 ELSE 0 END DESC,"
+        "            COALESCE(completion_percentage, 0) DESC, id DESC"
+        "  ) AS position FROM user_progress"
+        " ) ranked WHERE position > 1"
+        ")"
+    )
+    op.create_index('uq_user_progress_user_puzzle', 'user_progress', ['user_id', 'puzzle_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('uq_user_progress_user_puzzle', table_name='user_progress')
@@ -0,0 +1,43 @@
+"""Cascade puzzle deletes
+
+Revision ID: c41d7e9a2f38
+Revises: 8b2e4d61c0a9
+Create Date: 2026-10-19 12:20:17.331085
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d7e9a2f38'
+down_revision: Union[str, Sequence[str], None] = '8b2e4d61c0a9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables whose puzzle_id references puzzles.id
+CHILD_TABLES = ['puzzle_cells', 'clues', 'user_progress', 'puzzle_stats']
+
+# Matches PostgreSQL's default names and names SQLite's unnamed constraints
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def _replace_puzzle_fk(table: str, ondelete) -> None:
+    name = f'{table}_puzzle_id_fkey'
+    # SQLite can't alter constraints; batch mode recreates the table there
+    with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(name, type_='foreignkey')
+        batch_op.create_foreign_key(name, 'puzzles', ['puzzle_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in CHILD_TABLES:
+        _replace_puzzle_fk(table, 'CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in CHILD_TABLES:
+        _replace_puzzle_fk(table, None)
@@ -0,0 +1,33 @@
+"""Index puzzle child foreign keys
+
+Revision ID: d5b81f3e9a60
+Revises: a9d3e6f1c274
+Create Date: 2026-10-19 18:05:44.120734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5b81f3e9a60'
+down_revision: Union[str, Sequence[str], None] = 'a9d3e6f1c274'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Cascaded puzzle deletes and per-puzzle reads otherwise scan these tables
+    op.create_index(op.f('ix_puzzle_cells_puzzle_id'), 'puzzle_cells', ['puzzle_id'], unique=False)
+    op.create_index(op.f('ix_clues_puzzle_id'), 'clues', ['puzzle_id'], unique=False)
+    op.create_index(op.f('ix_user_progress_puzzle_id'), 'user_progress', ['puzzle_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_progress_puzzle_id'), table_name='user_progress')
+    op.drop_index(op.f('ix_clues_puzzle_id'), table_name='clues')
+    op.drop_index(op.f('ix_puzzle_cells_puzzle_id'), table_name='puzzle_cells')
@@ -0,0 +1,42 @@
+"""Add solve event chunks
+
+Revision ID: e7a3b5c90d12
+Revises: c41d7e9a2f38
+Create Date: 2026-10-19 13:21:40.772915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3b5c90d12'
+down_revision: Union[str, Sequence[str], None] = 'c41d7e9a2f38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'solve_event_chunks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('progress_id', sa.Integer(), nullable=False),
+        sa.Column('event_count', sa.Integer(), nullable=False),
+        sa.Column('elapsed_ms', sa.Integer(), nullable=False),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+        sa.ForeignKeyConstraint(['progress_id'], ['user_progress.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_solve_event_chunks_id'), 'solve_event_chunks', ['id'], unique=False)
+    op.create_index(op.f('ix_solve_event_chunks_progress_id'), 'solve_event_chunks', ['progress_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_solve_event_chunks_progress_id'), table_name='solve_event_chunks')
+    op.drop_index(op.f('ix_solve_event_chunks_id'), table_name='solve_event_chunks')
+    op.drop_table('solve_event_chunks')
@@ -0,0 +1,30 @@
+"""Add next puzzle indexes
+
+Revision ID: f2c8d4a61b37
+Revises: e7a3b5c90d12
+Create Date: 2026-10-19 15:02:17.338410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2c8d4a61b37'
+down_revision: Union[str, Sequence[str], None] = 'e7a3b5c90d12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_user_progress_user_puzzle', 'user_progress', ['user_id', 'puzzle_id', 'is_completed'], unique=False)
+    op.create_index('ix_puzzles_size_difficulty_id', 'puzzles', ['grid_size', 'difficulty', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_puzzles_size_difficulty_id', table_name='puzzles')
+    op.drop_index('ix_user_progress_user_puzzle', table_name='user_progress')
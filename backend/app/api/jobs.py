@@ -0,0 +1,174 @@
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response
+from sqlalchemy.orm import Session
+from typing import List
+import base64
+
+from ..database import get_read_db, SessionLocal, ReadSessionLocal
+from ..models import puzzle as puzzle_model, user as user_model
+from ..schemas import job as job_schema
+from ..api.auth import get_current_user
+from ..api.puzzles import parse_puzzle_file, puzzle_grid, insert_puzzle, find_duplicates, build_export
+from ..utils.jobs import get_job_queue, job_handler, QueueFull, SUCCEEDED
+
+router = APIRouter()
+
+@job_handler("import")
+def run_import(payload, ctx):
+    """
+    Import each uploaded file; a bad file is reported without failing the
+    others, and puzzles already stored (or repeated in the batch) are
+    reported as duplicates instead of being inserted again.
+    """
+    result = ctx.job.get("result") or {"puzzle_ids": [], "duplicates": [], "errors": [], "done": 0}
+    files = payload["files"]
+    db = SessionLocal()
+    try:
+        user = db.get(user_model.User, payload["user_id"])
+        if user is None:
+            raise ValueError("The submitting user no longer exists")
+        
+        # Parse and hash everything first so duplicates are found with one query
+        parsed = {}
+        for position in range(result["done"], len(files)):
+            upload = files[position]
+            try:
+                puzzle_create = parse_puzzle_file(upload["filename"], base64.b64decode(upload["content"]))
+                grid = puzzle_grid(puzzle_create)
+                parsed[position] = (puzzle_create, grid, grid.content_hash(puzzle_create.clues))
+            except HTTPException as e:
+                parsed[position] = e.detail
+            except ValueError as e:
+                parsed[position] = str(e)
+        existing = find_duplicates(db, [p[2] for p in parsed.values() if isinstance(p, tuple)])
+        
+        # Resume after the last file a previous attempt finished
+        for position in range(result["done"], len(files)):
+            filename = files[position]["filename"]
+            ctx.progress(position / len(files), f"Importing {filename}")
+            entry = parsed[position]
+            if not isinstance(entry, tuple):
+                result["errors"].append({"filename": filename, "detail": entry})
+            elif entry[2] in existing:
+                result["duplicates"].append({"filename": filename, "puzzle_id": existing[entry[2]]})
+            else:
+                puzzle_create, grid, digest = entry
+                try:
+                    puzzle = insert_puzzle(db, puzzle_create, grid, user, digest)
+                    result["puzzle_ids"].append(puzzle.id)
+                    existing[digest] = puzzle.id
+                except HTTPException as e:
+                    result["errors"].append({"filename": filename, "detail": e.detail})
+            result["done"] = position + 1
+            ctx.checkpoint(result)
+    finally:
+        db.close()
+    if not result["puzzle_ids"] and not result["duplicates"]:
+        raise ValueError("; ".join(f"{e['filename']}: {e['detail']}" for e in result["errors"]))
+    return result
+
+@job_handler("export")
+def run_export(payload, ctx):
+    db = ReadSessionLocal()
+    try:
+        puzzle = db.get(puzzle_model.Puzzle, payload["puzzle_id"])
+        if puzzle is None:
+            raise ValueError("Puzzle not found")
+        ctx.progress(0.5, "Rendering")
+        try:
+            content, media_type, filename = build_export(puzzle, payload["format"])
+        except HTTPException as e:
+            raise ValueError(e.detail)
+        except NotImplementedError as e:
+            raise ValueError(str(e))
+    finally:
+        db.close()
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return {
+        "filename": filename,
+        "media_type": media_type,
+        "size": len(content),
+        "content": base64.b64encode(content).decode("ascii")
+    }
+
+def _job_response(job) -> dict:
+    job = dict(job)
+    # File contents are served by /download, not inlined in the status
+    if job["kind"] == "export" and isinstance(job.get("result"), dict):
+        job["result"] = {k: v for k, v in job["result"].items() if k != "content"}
+        if job["status"] == SUCCEEDED:
+            job["download_url"] = f"/api/jobs/{job['id']}/download"
+    return job
+
+def _get_own_job(job_id: str, current_user: user_model.User):
+    job = get_job_queue().get(job_id)
+    if job is None or job["user_id"] != current_user.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+def _submit(kind: str, payload, current_user: user_model.User):
+    try:
+        return get_job_queue().submit(kind, payload, user_id=current_user.id)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+
+@router.post("/import", response_model=job_schema.Job, status_code=202)
+async def submit_import(
+    files: List[UploadFile] = File(...),
+    current_user: user_model.User = Depends(get_current_user)
+):
+    uploads = []
+    for file in files:
+        if not file.filename.endswith(('.puz', '.json')):
+            raise HTTPException(status_code=400, detail=f"Unsupported file format: {file.filename}")
+        content = await file.read()
+        uploads.append({"filename": file.filename, "content": base64.b64encode(content).decode("ascii")})
+    job = _submit("import", {"user_id": current_user.id, "files": uploads}, current_user)
+    return _job_response(job)
+
+@router.post("/export/{puzzle_id}/{format}", response_model=job_schema.Job, status_code=202)
+def submit_export(
+    puzzle_id: int,
+    format: str,
+    db: Session = Depends(get_read_db),
+    current_user: user_model.User = Depends(get_current_user)
+):
+    if format not in ("puz", "nyt"):
+        raise HTTPException(status_code=400, detail="Unsupported export format")
+    exists = db.query(puzzle_model.Puzzle.id).filter(puzzle_model.Puzzle.id == puzzle_id).first()
+    if not exists:
+        raise HTTPException(status_code=404, detail="Puzzle not found")
+    job = _submit("export", {"puzzle_id": puzzle_id, "format": format}, current_user)
+    return _job_response(job)
+
+@router.get("/{job_id}", response_model=job_schema.Job)
+def get_job(job_id: str, current_user: user_model.User = Depends(get_current_user)):
+    return _job_response(_get_own_job(job_id, current_user))
+
+@router.post("/{job_id}/cancel", response_model=job_schema.Job)
+def cancel_job(job_id: str, current_user: user_model.User = Depends(get_current_user)):
+    _get_own_job(job_id, current_user)
+    return _job_response(get_job_queue().cancel(job_id))
+
+@router.post("/{job_id}/retry", response_model=job_schema.Job)
+def retry_job(job_id: str, current_user: user_model.User = Depends(get_current_user)):
+    _get_own_job(job_id, current_user)
+    try:
+        job = get_job_queue().retry(job_id)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    if job is None:
+        raise HTTPException(status_code=409, detail="Only failed or cancelled jobs can be retried")
+    return _job_response(job)
+
+@router.get("/{job_id}/download")
+def download_job_result(job_id: str, current_user: user_model.User = Depends(get_current_user)):
+    job = _get_own_job(job_id, current_user)
+    if job["kind"] != "export" or job["status"] != SUCCEEDED:
+        raise HTTPException(status_code=409, detail="Job has no finished export")
+    result = job["result"]
+    return Response(
+        content=base64.b64decode(result["content"]),
+        media_type=result["media_type"],
+        headers={"Content-Disposition": f"attachment; filename={result['filename']}"}
+    )
@@ -1,13 +1,21 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Optional
 import json
 
-from ..database import get_db
+from ..config import settings
+from ..database import get_db, get_read_db, insert_or_ignore, ReadSessionLocal
 from ..models import user_progress as progress_model, puzzle as puzzle_model
+from ..models.solve_event import SolveEventChunk
 from ..schemas import progress as progress_schema
-from ..api.auth import get_current_user
+from ..api.auth import get_current_user, is_admin
 from ..models.user import User
+from ..utils.event_log import encode_events, replay_events
+from ..utils.serialization import FastJSONResponse, progress_to_dict, dumps
+from ..utils.stats import record_progress
+from ..utils.recommend import candidate_cache
 
 router = APIRouter()
 
@@ -22,21 +30,27 @@ def save_progress(
     if not puzzle:
         raise HTTPException(status_code=404, detail="Puzzle not found")
     
-    # Find or create progress record
-    db_progress = db.query(progress_model.UserProgress).filter(
+    # Find or create progress record, locked so concurrent saves by the same
+    # user can't both count as its first save or its completion
+    query = db.query(progress_model.UserProgress).filter(
         progress_model.UserProgress.user_id == current_user.id,
         progress_model.UserProgress.puzzle_id == progress.puzzle_id
-    ).first()
+    ).with_for_update()
+    db_progress = query.first()
     
-    if not db_progress:
-        db_progress = progress_model.UserProgress(
-            user_id=current_user.id,
-            puzzle_id=progress.puzzle_id
-        )
-        db.add(db_progress)
+    started = db_progress is None
+    if started:
+        # Only the save whose insert lands is the start; a racing one updates that row
+        started = insert_or_ignore(db, progress_model.UserProgress, {
+            "user_id": current_user.id,
+            "puzzle_id": progress.puzzle_id
+        })
+        db_progress = query.first()
+    was_completed = bool(db_progress.is_completed)
     
     # Update progress
     db_progress.current_state = json.dumps(progress.current_state)
+    db_progress.state_archive = None  # Back in the hot tier
     db_progress.completion_percentage = progress.completion_percentage
     
     if progress.completion_time:
@@ -48,17 +62,128 @@ def save_progress(
     # Check if completed
     if progress.completion_percentage >= 100:
         db_progress.is_completed = True
-        db_progress.completed_at = datetime.utcnow()
+        db_progress.completed_at = datetime.now(timezone.utc)
+    
+    # Keep the per-puzzle stats current in the same transaction
+    completed = bool(db_progress.is_completed) and not was_completed
+    record_progress(db, progress.puzzle_id, started, completed,
+                    db_progress.score, db_progress.completion_time)
     
     db.commit()
     db.refresh(db_progress)
     
-    return db_progress
+    # The solved puzzle must not be offered as the next one
+    if completed:
+        candidate_cache.invalidate_user(current_user.id)
+    
+    return FastJSONResponse(progress_to_dict(db_progress))
+
+@router.get("/events/export")
+def export_solve_events(
+    puzzle_id: Optional[int] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Every logged event as NDJSON, one line per event, decoded as it streams."""
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only administrators can export solve events")
+    
+    def generate():
+        # Own session: the response outlives the request's dependencies
+        db = ReadSessionLocal()
+        try:
+            query = db.query(
+                SolveEventChunk.progress_id,
+                SolveEventChunk.data,
+                progress_model.UserProgress.user_id,
+                progress_model.UserProgress.puzzle_id
+            ).join(progress_model.UserProgress, SolveEventChunk.progress_id == progress_model.UserProgress.id)
+            if puzzle_id is not None:
+                query = query.filter(progress_model.UserProgress.puzzle_id == puzzle_id)
+            query = query.order_by(SolveEventChunk.progress_id, SolveEventChunk.id)
+            
+            current, t = None, 0
+            for progress_id, data, user_id, chunk_puzzle_id in query.yield_per(500):
+                if progress_id != current:
+                    current, t = progress_id, 0
+                lines = []
+                for event in replay_events([data], start=t):
+                    t = event["t"]
+                    lines.append(dumps({
+                        "progress_id": progress_id,
+                        "user_id": user_id,
+                        "puzzle_id": chunk_puzzle_id,
+                        **event
+                    }))
+                yield b"\n".join(lines) + b"\n"
+        finally:
+            db.close()
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@router.post("/{puzzle_id}/events", response_model=progress_schema.SolveEventsAppended, status_code=201)
+def append_solve_events(
+    puzzle_id: int,
+    batch: progress_schema.SolveEventBatch,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Append a batch of solve events as one compressed chunk. The progress row
+    itself (and its current_state) is left untouched.
+    """
+    if not settings.SOLVE_EVENT_LOG:
+        raise HTTPException(status_code=404, detail="Solve event logging is disabled")
+    
+    row = db.query(progress_model.UserProgress.id, puzzle_model.Puzzle.grid_size).join(
+        puzzle_model.Puzzle, progress_model.UserProgress.puzzle_id == puzzle_model.Puzzle.id
+    ).filter(
+        progress_model.UserProgress.user_id == current_user.id,
+        progress_model.UserProgress.puzzle_id == puzzle_id
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="No progress found for this puzzle")
+    progress_id, grid_size = row
+    
+    for event in batch.events:
+        if (event.row is None) != (event.col is None):
+            raise HTTPException(status_code=400, detail="Events need both row and col, or neither")
+        if event.row is not None and (event.row >= grid_size or event.col >= grid_size):
+            raise HTTPException(status_code=400, detail="Event cell is outside the grid")
+    try:
+        data, count, elapsed = encode_events(event.model_dump() for event in batch.events)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    db.add(SolveEventChunk(progress_id=progress_id, event_count=count, elapsed_ms=elapsed, data=data))
+    db.commit()
+    return {"progress_id": progress_id, "appended": count}
+
+@router.get("/{puzzle_id}/replay", response_model=progress_schema.Replay)
+def replay_solve(
+    puzzle_id: int,
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    progress_id = db.query(progress_model.UserProgress.id).filter(
+        progress_model.UserProgress.user_id == current_user.id,
+        progress_model.UserProgress.puzzle_id == puzzle_id
+    ).scalar()
+    if progress_id is None:
+        raise HTTPException(status_code=404, detail="No progress found for this puzzle")
+    
+    chunks = db.query(SolveEventChunk.data).filter(
+        SolveEventChunk.progress_id == progress_id
+    ).order_by(SolveEventChunk.id)
+    return FastJSONResponse({
+        "progress_id": progress_id,
+        "puzzle_id": puzzle_id,
+        "events": list(replay_events(data for (data,) in chunks))
+    })
 
 @router.get("/{puzzle_id}", response_model=progress_schema.Progress)
 def get_progress(
     puzzle_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     progress = db.query(progress_model.UserProgress).filter(
@@ -69,15 +194,15 @@ def get_progress(
     if not progress:
         raise HTTPException(status_code=404, detail="No progress found for this puzzle")
     
-    return progress
+    return FastJSONResponse(progress_to_dict(progress))
 
 @router.get("/user/all")
 def get_user_progress(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     progress_list = db.query(progress_model.UserProgress).filter(
         progress_model.UserProgress.user_id == current_user.id
     ).all()
     
-    return progress_list
\ No newline at end of file
+    return FastJSONResponse([progress_to_dict(p) for p in progress_list])
\ No newline at end of file
@@ -1,30 +1,128 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response, Header, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session, selectinload
-from typing import List, Optional
+from typing import Dict, List, Optional
+from datetime import datetime, timezone
 import json
+import math
+import threading
 
-from ..database import get_db
-from ..models import puzzle as puzzle_model, user as user_model, user_progress as progress_model
+from ..database import get_db, get_read_db
+from ..models import puzzle as puzzle_model, user as user_model, user_progress as progress_model, puzzle_stats as stats_model
 from ..schemas import puzzle as puzzle_schema
-from ..api.auth import get_current_user
-from ..utils import parse_puz_file, export_to_puz, parse_nyt_format, export_to_nyt
+from ..api.auth import get_current_user, is_admin
+from ..utils import parse_puz_file, export_to_puz, parse_nyt_format, parse_nyt_data, export_to_nyt
+from ..utils.feed import FeedParser
+from ..utils.word_index import add_answers, expire_word_index, get_word_index, refresh_word_index
+from ..utils.autofill import autofill
+from ..utils.grid import Grid, BLOCK, EMPTY
+from ..utils.answer_index import answer_cache, get_answer_index
+from ..utils.compact import wants_compact, compact_puzzle, COMPACT_MEDIA_TYPE
+from ..utils.serialization import FastJSONResponse, dumps, puzzle_to_dict, puzzles_to_list
+from ..utils.stats import stats_summary
+from ..utils.snapshot import get_snapshot
+from ..utils.recommend import candidate_cache, next_puzzle
+from ..utils.bundles import get_bundle, window_summaries, changed_since
+from ..middleware.compression import negotiate_encoding
+from ..config import settings
 
 router = APIRouter()
 
+def _compact_response(data) -> Response:
+    return Response(content=dumps(data), media_type=COMPACT_MEDIA_TYPE, headers={"Vary": "Accept"})
+
 @router.get("/", response_model=List[puzzle_schema.Puzzle])
 def get_puzzles(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db)
 ):
     puzzles = db.query(puzzle_model.Puzzle).options(
         selectinload(puzzle_model.Puzzle.cells),
         selectinload(puzzle_model.Puzzle.clues)
     ).offset(skip).limit(limit).all()
-    return puzzles
+    
+    # Wire format v2 on request (?format=compact or the v2 Accept type)
+    if wants_compact(accept, format):
+        return _compact_response([compact_puzzle(p) for p in puzzles])
+    return FastJSONResponse(puzzles_to_list(puzzles), headers={"Vary": "Accept"})
+
+@router.get("/manifest", response_model=puzzle_schema.BundleManifest)
+def get_manifest(since: Optional[datetime] = None, db: Session = Depends(get_read_db)):
+    """
+    Offline sync: every bundle window with its etag, plus (with ?since=) the
+    puzzles created or edited since that version. Clients re-download only
+    the windows whose etag differs from the copy they hold.
+    """
+    size = settings.PUZZLE_BUNDLE_SIZE
+    windows = window_summaries(db, size)
+    for window in windows:
+        window["url"] = f"/api/puzzles/bundles/{window['window']}"
+    versions = [w["updated_at"] for w in windows if w["updated_at"] is not None]
+    return FastJSONResponse({
+        "version": max(versions) if versions else None,
+        "bundle_size": size,
+        "windows": windows,
+        "changed": changed_since(db, since) if since is not None else None
+    })
+
+@router.get("/next", response_model=puzzle_schema.NextPuzzle)
+def get_next_puzzle(
+    size: Optional[int] = None,
+    difficulty: Optional[str] = None,
+    exclude: Optional[int] = None,
+    db: Session = Depends(get_read_db),
+    current_user: user_model.User = Depends(get_current_user)
+):
+    """A random puzzle the user hasn't completed, optionally of a given size and difficulty."""
+    puzzle = next_puzzle(db, current_user.id, size, difficulty, exclude)
+    if puzzle is None:
+        raise HTTPException(status_code=404, detail="No unsolved puzzles match")
+    return FastJSONResponse(puzzle)
+
+@router.get("/bundles/{window}")
+def get_puzzle_bundle(
+    window: int,
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db)
+):
+    """A window of puzzles in the compact format, served pre-compressed."""
+    bundle = get_bundle(db, window)
+    if bundle is None:
+        raise HTTPException(status_code=404, detail="Bundle not found")
+    
+    etag = f'"{bundle.etag}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60", "Vary": "Accept-Encoding"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    
+    encoding = negotiate_encoding(accept_encoding or "") or "identity"
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=bundle.bodies[encoding], media_type=COMPACT_MEDIA_TYPE, headers=headers)
 
 @router.get("/{puzzle_id}", response_model=puzzle_schema.PuzzleWithProgress)
-def get_puzzle(puzzle_id: int, db: Session = Depends(get_db)):
+def get_puzzle(
+    puzzle_id: int,
+    format: Optional[str] = None,
+    accept: Optional[str] = Header(None),
+    db: Session = Depends(get_read_db)
+):
+    compact = wants_compact(accept, format)
+    
+    # Pre-serialized body straight from the mapped snapshot when it has this puzzle
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        body = snapshot.get(puzzle_id, compact, db if settings.SNAPSHOT_VERIFY else None)
+        if body is not None:
+            return Response(content=body, media_type=COMPACT_MEDIA_TYPE if compact else "application/json",
+                            headers={"Vary": "Accept"})
+    
     puzzle = db.query(puzzle_model.Puzzle).options(
         selectinload(puzzle_model.Puzzle.cells),
         selectinload(puzzle_model.Puzzle.clues)
@@ -33,12 +131,15 @@ def get_puzzle(puzzle_id: int, db: Session = Depends(get_db)):
     if not puzzle:
         raise HTTPException(status_code=404, detail="Puzzle not found")
     
+    if compact:
+        return _compact_response(compact_puzzle(puzzle))
+    
     # For now, return without user progress
     # TODO: Add authentication and progress tracking
-    puzzle_dict = puzzle.__dict__.copy()
+    puzzle_dict = puzzle_to_dict(puzzle)
     puzzle_dict["user_progress"] = None
     
-    return puzzle_dict
+    return FastJSONResponse(puzzle_dict, headers={"Vary": "Accept"})
 
 @router.post("/", response_model=puzzle_schema.Puzzle)
 def create_puzzle(
@@ -46,49 +147,100 @@ def create_puzzle(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(get_current_user)
 ):
+    grid = puzzle_grid(puzzle)
+    return insert_puzzle(db, puzzle, grid, current_user)
+
+def puzzle_grid(puzzle: puzzle_schema.PuzzleCreate) -> Grid:
     # Validate grid size
     if puzzle.grid_size < 5 or puzzle.grid_size > 25:
         raise HTTPException(status_code=400, detail="Grid size must be between 5 and 25")
     
-    # Create puzzle
-    db_puzzle = puzzle_model.Puzzle(
-        title=puzzle.title,
-        author_id=current_user.id,
-        grid_size=puzzle.grid_size,
-        difficulty=puzzle.difficulty,
-        description=puzzle.description
-    )
-    db.add(db_puzzle)
-    db.commit()
-    db.refresh(db_puzzle)
-    
-    # Add cells
-    for cell in puzzle.cells:
-        db_cell = puzzle_model.PuzzleCell(
-            puzzle_id=db_puzzle.id,
-            row=cell.row,
-            col=cell.col,
-            solution=cell.solution,
-            number=cell.number,
-            is_black_square=cell.is_black_square
-        )
-        db.add(db_cell)
+    # Validate the grid
+    try:
+        return Grid.from_cells(puzzle.cells, puzzle.grid_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def insert_puzzle(
+    db: Session,
+    puzzle: puzzle_schema.PuzzleCreate,
+    grid: Grid,
+    author: user_model.User,
+    content_hash: Optional[str] = None
+) -> puzzle_model.Puzzle:
+    """Check the clues agree with the grid, then store the puzzle, its cells and clues."""
+    errors = grid.validate_clues(puzzle.clues)
+    if errors:
+        raise HTTPException(status_code=400, detail="Clues do not match the grid: " + "; ".join(errors))
     
-    # Add clues
-    for clue in puzzle.clues:
-        db_clue = puzzle_model.Clue(
-            puzzle_id=db_puzzle.id,
-            number=clue.number,
-            direction=clue.direction,
-            text=clue.text,
-            answer=clue.answer
-        )
-        db.add(db_clue)
+    puzzle_id = insert_puzzles(db, [(puzzle, grid, content_hash or grid.content_hash(puzzle.clues))], author)[0]
+    return db.get(puzzle_model.Puzzle, puzzle_id)
+
+def insert_puzzles(db: Session, entries, author: user_model.User) -> List[int]:
+    """
+    Store already validated (PuzzleCreate, Grid, content hash) entries in one
+    transaction: the puzzle rows first for their ids, then every cell, clue
+    and empty stats row as one executemany per table. Returns the new ids.
+    """
+    if not entries:
+        return []
+    rows = [
+        {
+            "title": puzzle.title,
+            "author_id": author.id,
+            "grid_size": puzzle.grid_size,
+            "difficulty": puzzle.difficulty,
+            "description": puzzle.description,
+            "content_hash": digest
+        }
+        for puzzle, grid, digest in entries
+    ]
+    # render_nulls keeps rows with and without NULLs in one batched INSERT
+    puzzle_ids = list(db.scalars(
+        insert(puzzle_model.Puzzle)
+        .returning(puzzle_model.Puzzle.id, sort_by_parameter_order=True)
+        .execution_options(render_nulls=True),
+        rows
+    ))
     
+    cells, clues, stats = [], [], []
+    for puzzle_id, (puzzle, grid, _) in zip(puzzle_ids, entries):
+        cells.extend({"puzzle_id": puzzle_id, **cell} for cell in grid.to_cells())
+        clues.extend(
+            {"puzzle_id": puzzle_id, "number": clue.number, "direction": clue.direction,
+             "text": clue.text, "answer": clue.answer}
+            for clue in puzzle.clues
+        )
+        # Empty stats row up front, so progress saves only ever update it
+        stats.append({"puzzle_id": puzzle_id, "starts": 0, "completions": 0,
+                      "score_total": 0, "solve_time_total": 0})
+    db.execute(insert(puzzle_model.PuzzleCell).execution_options(render_nulls=True), cells)
+    if clues:
+        db.execute(insert(puzzle_model.Clue), clues)
+    db.execute(insert(stats_model.PuzzleStats), stats)
     db.commit()
-    db.refresh(db_puzzle)
     
-    return db_puzzle
+    # Keep the constructor word index current without a rebuild
+    add_answers(clue.answer for puzzle, _, _ in entries for clue in puzzle.clues)
+    # Users who had run out of puzzles are offered these right away
+    candidate_cache.forget_empty()
+    
+    return puzzle_ids
+
+def find_duplicates(db: Session, hashes) -> Dict[str, int]:
+    """Map each content hash that is already stored to the oldest puzzle with it."""
+    hashes = list(set(hashes))
+    found = {}
+    # Chunked to stay under the database's bound-parameter limit
+    for start in range(0, len(hashes), 500):
+        rows = (
+            db.query(puzzle_model.Puzzle.content_hash, puzzle_model.Puzzle.id)
+            .filter(puzzle_model.Puzzle.content_hash.in_(hashes[start:start + 500]))
+            .order_by(puzzle_model.Puzzle.id)
+        )
+        for digest, puzzle_id in rows:
+            found.setdefault(digest, puzzle_id)
+    return found
 
 @router.post("/import")
 async def import_puzzle(
@@ -99,38 +251,234 @@ async def import_puzzle(
     # Read file content
     content = await file.read()
     
-    # Parse based on file type
-    if file.filename.endswith('.puz'):
-        puzzle_data = parse_puz_file(content)
-    elif file.filename.endswith('.json'):
-        puzzle_data = parse_nyt_format(content.decode('utf-8'))
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported file format")
+    puzzle_create = parse_puzzle_file(file.filename, content)
+    grid = puzzle_grid(puzzle_create)
+    
+    # The same puzzle was imported before: point at it instead of storing a copy
+    digest = grid.content_hash(puzzle_create.clues)
+    existing_id = find_duplicates(db, [digest]).get(digest)
+    if existing_id is not None:
+        existing = (
+            db.query(puzzle_model.Puzzle)
+            .options(selectinload(puzzle_model.Puzzle.cells), selectinload(puzzle_model.Puzzle.clues))
+            .filter(puzzle_model.Puzzle.id == existing_id)
+            .first()
+        )
+        return FastJSONResponse({**puzzle_to_dict(existing), "duplicate": True})
     
     # Create puzzle from parsed data
-    puzzle_create = puzzle_schema.PuzzleCreate(**puzzle_data)
-    return create_puzzle(puzzle_create, db, current_user)
+    return insert_puzzle(db, puzzle_create, grid, current_user, digest)
+
+@router.post("/import/stream", response_model=puzzle_schema.StreamImportResponse)
+async def import_puzzle_stream(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_user)
+):
+    """
+    Import a feed of NYT-format puzzles sent as the raw request body, either
+    NDJSON (one puzzle per line) or one JSON array. The body is parsed as it
+    arrives and stored IMPORT_BATCH_SIZE puzzles at a time, so memory stays
+    bounded however large the feed is. Bad puzzles are reported by their
+    position in the feed without stopping the import.
+    """
+    parser = FeedParser(settings.IMPORT_MAX_DOCUMENT_BYTES)
+    result = {"imported": 0, "duplicates": 0, "puzzle_ids": [], "error_count": 0, "errors": [], "stopped": None}
+    batch = []
+    
+    async def flush():
+        await run_in_threadpool(import_feed_batch, db, list(batch), current_user, result)
+        batch.clear()
+    
+    try:
+        async for chunk in request.stream():
+            for document in parser.feed(chunk):
+                batch.append(document)
+                if len(batch) >= settings.IMPORT_BATCH_SIZE:
+                    await flush()
+        batch.extend(parser.close())
+    except ValueError as e:
+        # Malformed beyond recovery: keep what was read so far
+        result["stopped"] = str(e)
+    if batch:
+        await flush()
+    return FastJSONResponse(result)
+
+def import_feed_batch(db: Session, documents, author: user_model.User, result: dict) -> None:
+    """Parse, dedupe and store one batch of feed documents, updating ``result``."""
+    position = result["imported"] + result["duplicates"] + result["error_count"]
+    parsed = []
+    for index, document in enumerate(documents, start=position):
+        try:
+            if isinstance(document, ValueError):
+                raise document
+            if not isinstance(document, dict):
+                raise ValueError("Each puzzle must be a JSON object")
+            puzzle = puzzle_schema.PuzzleCreate(**parse_nyt_data(document))
+            grid = puzzle_grid(puzzle)
+            errors = grid.validate_clues(puzzle.clues)
+            if errors:
+                raise ValueError("Clues do not match the grid: " + "; ".join(errors))
+            parsed.append((puzzle, grid, grid.content_hash(puzzle.clues)))
+        except HTTPException as e:
+            _feed_error(result, index, e.detail)
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            _feed_error(result, index, str(e))
+    
+    # Skip puzzles already stored, and repeats within the feed
+    existing = find_duplicates(db, [digest for _, _, digest in parsed])
+    fresh = []
+    for puzzle, grid, digest in parsed:
+        if digest in existing:
+            result["duplicates"] += 1
+            continue
+        existing[digest] = None
+        fresh.append((puzzle, grid, digest))
+    puzzle_ids = insert_puzzles(db, fresh, author)
+    result["imported"] += len(puzzle_ids)
+    result["puzzle_ids"].extend(puzzle_ids)
+
+def _feed_error(result: dict, index: int, detail: str) -> None:
+    result["error_count"] += 1
+    # Enough to find the bad records without echoing a whole broken feed back
+    if len(result["errors"]) < 100:
+        result["errors"].append({"index": index, "detail": detail})
+
+def parse_puzzle_file(filename: str, content: bytes) -> puzzle_schema.PuzzleCreate:
+    """Parse an uploaded .puz or NYT .json file by its extension; 400 if it can't be read."""
+    if not filename.endswith(('.puz', '.json')):
+        raise HTTPException(status_code=400, detail="Unsupported file format")
+    try:
+        if filename.endswith('.puz'):
+            puzzle_data = parse_puz_file(content)
+        else:
+            puzzle_data = parse_nyt_format(content.decode('utf-8'))
+        return puzzle_schema.PuzzleCreate(**puzzle_data)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid puzzle: {e.errors()[0]['msg']}")
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        # Also covers undecodable bytes, malformed JSON and JSON of the wrong shape
+        raise HTTPException(status_code=400, detail=f"Could not parse {filename}: {e}")
+
+# Searches running in this process; more would starve every other request of the GIL
+_autofill_slots = threading.BoundedSemaphore(settings.AUTOFILL_CONCURRENCY)
+
+@router.post("/autofill", response_model=puzzle_schema.AutofillResponse)
+def autofill_puzzle(
+    request: puzzle_schema.AutofillRequest,
+    db: Session = Depends(get_read_db),
+    current_user: user_model.User = Depends(get_current_user)
+):
+    size = request.grid_size
+    try:
+        grid = Grid.from_cells(request.cells, size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    time_limit = min(request.time_limit, settings.AUTOFILL_MAX_SECONDS)
+    refresh_word_index(db, settings.WORD_INDEX_REFRESH_SECONDS)
+    if not _autofill_slots.acquire(blocking=False):
+        raise HTTPException(status_code=503, detail="Autofill is busy, try again shortly",
+                            headers={"Retry-After": str(math.ceil(settings.AUTOFILL_MAX_SECONDS))})
+    try:
+        result = autofill(grid.solution, size, size, get_word_index(), time_limit=time_limit)
+    finally:
+        _autofill_slots.release()
+    filled = Grid(size, size, result["grid"])
+    
+    cells = filled.to_cells()
+    words = [
+        {"number": number, "direction": direction, "answer": answer}
+        for number, direction, answer in filled.words()
+    ]
+    
+    return {
+        "status": result["status"],
+        "cells": cells,
+        "words": words,
+        "elapsed": result["elapsed"],
+        "nodes": result["nodes"],
+        "backtracks": result["backtracks"]
+    }
+
+def _selected_cells(db: Session, puzzle_id: int, request: puzzle_schema.CheckRequest):
+    index = get_answer_index(db, puzzle_id)
+    if index is None:
+        raise HTTPException(status_code=404, detail="Puzzle not found")
+    try:
+        cells = index.cells_for(request.scope.value, request.row, request.col, request.number, request.direction)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return index, cells
+
+@router.post("/{puzzle_id}/check", response_model=puzzle_schema.CheckResponse)
+def check_answers(
+    puzzle_id: int,
+    request: puzzle_schema.CheckRequest,
+    db: Session = Depends(get_read_db)
+):
+    # Served from the cached answer index; no cell or clue rows are loaded
+    index, cells = _selected_cells(db, puzzle_id, request)
+    results = index.check(cells, request.entries)
+    counts = {"correct": 0, "incorrect": 0, "empty": 0}
+    for result in results.values():
+        counts[result] += 1
+    
+    return {
+        "results": results,
+        **counts,
+        "is_solved": counts["correct"] == len(results)
+    }
+
+@router.post("/{puzzle_id}/reveal", response_model=puzzle_schema.RevealResponse)
+def reveal_answers(
+    puzzle_id: int,
+    request: puzzle_schema.CheckRequest,
+    db: Session = Depends(get_read_db)
+):
+    index, cells = _selected_cells(db, puzzle_id, request)
+    return {"letters": index.reveal(cells)}
+
+@router.get("/{puzzle_id}/stats", response_model=puzzle_schema.PuzzleStats)
+def get_puzzle_stats(
+    puzzle_id: int,
+    db: Session = Depends(get_read_db)
+):
+    # One primary-key lookup on the incrementally maintained stats row
+    stats = db.query(stats_model.PuzzleStats).filter(stats_model.PuzzleStats.puzzle_id == puzzle_id).first()
+    if stats is None:
+        exists = db.query(puzzle_model.Puzzle.id).filter(puzzle_model.Puzzle.id == puzzle_id).first()
+        if not exists:
+            raise HTTPException(status_code=404, detail="Puzzle not found")
+    return stats_summary(puzzle_id, stats)
 
 @router.get("/{puzzle_id}/export/{format}")
 def export_puzzle(
     puzzle_id: int,
     format: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     puzzle = db.query(puzzle_model.Puzzle).filter(puzzle_model.Puzzle.id == puzzle_id).first()
     
     if not puzzle:
         raise HTTPException(status_code=404, detail="Puzzle not found")
     
-    # Prepare puzzle data
+    content, media_type, filename = build_export(puzzle, format)
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+def build_export(puzzle: puzzle_model.Puzzle, format: str):
+    """Render a puzzle as (content, media type, filename) in the "puz" or "nyt" format."""
+    grid = Grid.from_cells(puzzle.cells, puzzle.grid_size)
     puzzle_data = {
         "title": puzzle.title,
         "grid_size": puzzle.grid_size,
         "difficulty": puzzle.difficulty,
         "description": puzzle.description,
-        "cells": [{"row": c.row, "col": c.col, "solution": c.solution, 
-                  "number": c.number, "is_black_square": c.is_black_square} 
-                 for c in puzzle.cells],
+        "cells": grid.to_cells(),
         "clues": [{"number": c.number, "direction": c.direction.value, 
                   "text": c.text, "answer": c.answer} 
                  for c in puzzle.clues]
@@ -147,11 +495,158 @@ def export_puzzle(
     else:
         raise HTTPException(status_code=400, detail="Unsupported export format")
     
-    return Response(
-        content=content,
-        media_type=media_type,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    return content, media_type, filename
+
+@router.patch("/{puzzle_id}", response_model=puzzle_schema.PuzzleUpdateResponse)
+def update_puzzle(
+    puzzle_id: int,
+    changes: puzzle_schema.PuzzleUpdate,
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_user)
+):
+    """
+    Apply a partial edit in one transaction, writing only the cell and clue
+    rows that differ from what is stored. Saved solves keep everything except
+    letters in squares whose solution changed.
+    """
+    puzzle = db.query(puzzle_model.Puzzle).options(
+        selectinload(puzzle_model.Puzzle.cells),
+        selectinload(puzzle_model.Puzzle.clues)
+    ).filter(puzzle_model.Puzzle.id == puzzle_id).first()
+    
+    if not puzzle:
+        raise HTTPException(status_code=404, detail="Puzzle not found")
+    if puzzle.author_id != current_user.id and not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Not authorized to edit this puzzle")
+    
+    summary = {"fields": [], "cells": 0, "clues_added": 0, "clues_updated": 0,
+               "clues_removed": 0, "progress_pruned": 0}
+    
+    for field in ("title", "difficulty", "description"):
+        value = getattr(changes, field)
+        if field in changes.model_fields_set and value != getattr(puzzle, field):
+            if field == "title" and value is None:
+                raise HTTPException(status_code=400, detail="A puzzle needs a title")
+            setattr(puzzle, field, value)
+            summary["fields"].append(field)
+    
+    # New grid: the stored one with the submitted squares overwritten
+    size = puzzle.grid_size
+    old_grid = Grid.from_cells(puzzle.cells, size)
+    squares = list(old_grid.solution)
+    for cell in changes.cells or []:
+        if not (0 <= cell.row < size and 0 <= cell.col < size):
+            raise HTTPException(status_code=400, detail=f"Cell ({cell.row}, {cell.col}) is outside the grid")
+        squares[cell.row * size + cell.col] = BLOCK if cell.is_black_square else (cell.solution or EMPTY).upper()
+    grid = Grid(size, size, "".join(squares))
+    changed_squares = [idx for idx, (old, new) in enumerate(zip(old_grid.solution, grid.solution)) if old != new]
+    
+    incoming = {(clue.number, clue.direction.value): clue for clue in changes.clues or []}
+    errors = grid.validate_clues(incoming.values())
+    if errors:
+        raise HTTPException(status_code=400, detail="Clues do not match the grid: " + "; ".join(errors))
+    
+    # Stored clues follow their squares: a block change may renumber an
+    # entry but keeps its clue, entries that no longer exist lose theirs, and
+    # answers track changed letters
+    slots_by_squares = {(slot.direction, slot.cells): slot for slot in grid.slots}
+    final = {}  # (number, direction) -> (text, answer, existing row or None)
+    for clue in puzzle.clues:
+        old_slot = old_grid.slot(clue.number, clue.direction.value)
+        slot = old_slot and slots_by_squares.get((old_slot.direction, old_slot.cells))
+        if slot is None:
+            continue
+        word = grid.slot_word(slot)
+        final[(slot.number, slot.direction.value)] = (clue.text, clue.answer if EMPTY in word else word, clue)
+    for key, clue in incoming.items():
+        final[key] = (clue.text, clue.answer, final.get(key, (None, None, None))[2])
+    
+    # Write only the rows that differ
+    if changed_squares:
+        target = grid.to_cells()
+        for cell in puzzle.cells:
+            wanted = target[cell.row * size + cell.col]
+            if (cell.solution, cell.number, bool(cell.is_black_square)) != \
+                    (wanted["solution"], wanted["number"], wanted["is_black_square"]):
+                cell.solution = wanted["solution"]
+                cell.number = wanted["number"]
+                cell.is_black_square = wanted["is_black_square"]
+                summary["cells"] += 1
+    
+    kept = set()
+    new_answers = []
+    for (number, direction), (text, answer, row) in final.items():
+        if row is None:
+            db.add(puzzle_model.Clue(puzzle_id=puzzle_id, number=number,
+                                     direction=puzzle_model.Direction(direction), text=text, answer=answer))
+            new_answers.append(answer)
+            summary["clues_added"] += 1
+            continue
+        kept.add(row.id)
+        if (row.number, row.text, row.answer) != (number, text, answer):
+            row.number, row.text, row.answer = number, text, answer
+            new_answers.append(answer)
+            summary["clues_updated"] += 1
+    for clue in puzzle.clues:
+        if clue.id not in kept:
+            db.delete(clue)
+            summary["clues_removed"] += 1
+    
+    if not any(summary.values()):
+        return FastJSONResponse({**puzzle_to_dict(puzzle), "changes": summary})
+    
+    if changed_squares:
+        summary["progress_pruned"] = prune_progress(db, puzzle_id, [grid.position(idx) for idx in changed_squares])
+    puzzle.content_hash = grid.content_hash(
+        [{"number": n, "direction": d, "text": t, "answer": a} for (n, d), (t, a, _) in final.items()]
     )
+    # Cell and clue edits don't touch the puzzle row, so bump it explicitly;
+    # microseconds, so an edit in the same second as the last still changes
+    # the version that bundles and the snapshot compare
+    puzzle.updated_at = datetime.now(timezone.utc)
+    db.commit()
+    
+    # Answer indexes hold the solution only. Other workers' cached indexes and
+    # the bundles notice the new updated_at on their next lookup
+    if changed_squares:
+        answer_cache.invalidate(puzzle_id)
+    add_answers(new_answers)
+    # Answers the edit replaced go on the next lookup, once no clue uses them
+    expire_word_index()
+    
+    db.expire_all()
+    puzzle = db.query(puzzle_model.Puzzle).options(
+        selectinload(puzzle_model.Puzzle.cells),
+        selectinload(puzzle_model.Puzzle.clues)
+    ).filter(puzzle_model.Puzzle.id == puzzle_id).first()
+    return FastJSONResponse({**puzzle_to_dict(puzzle), "changes": summary})
+
+def prune_progress(db: Session, puzzle_id: int, squares) -> int:
+    """
+    Drop the user's letters in the given (row, col) squares from unfinished
+    saved solves; finished ones are left as they were solved. Returns how
+    many saves changed.
+    """
+    keys = {f"{row},{col}" for row, col in squares}
+    rows = db.query(progress_model.UserProgress.id, progress_model.UserProgress.current_state).filter(
+        progress_model.UserProgress.puzzle_id == puzzle_id,
+        progress_model.UserProgress.is_completed.isnot(True)
+    )
+    updates = []
+    for progress_id, state in rows:
+        try:
+            entries = json.loads(state) if state else {}
+        except ValueError:
+            continue
+        if not isinstance(entries, dict) or keys.isdisjoint(entries):
+            continue
+        for key in keys.intersection(entries):
+            del entries[key]
+        updates.append({"id": progress_id, "current_state": json.dumps(entries)})
+    if updates:
+        # Bulk UPDATE by primary key, one executemany
+        db.execute(update(progress_model.UserProgress), updates)
+    return len(updates)
 
 @router.delete("/{puzzle_id}")
 def delete_puzzle(
@@ -159,17 +654,54 @@ def delete_puzzle(
     db: Session = Depends(get_db),
     current_user: user_model.User = Depends(get_current_user)
 ):
-    puzzle = db.query(puzzle_model.Puzzle).filter(puzzle_model.Puzzle.id == puzzle_id).first()
+    author_id = db.query(puzzle_model.Puzzle.author_id).filter(puzzle_model.Puzzle.id == puzzle_id).scalar()
     
-    if not puzzle:
+    if author_id is None:
         raise HTTPException(status_code=404, detail="Puzzle not found")
     
     # Check if user owns the puzzle
-    if puzzle.author_id != current_user.id:
+    if author_id != current_user.id and not is_admin(current_user):
         raise HTTPException(status_code=403, detail="Not authorized to delete this puzzle")
     
-    # Delete the puzzle (cascade should handle cells, clues, and progress)
-    db.delete(puzzle)
-    db.commit()
+    delete_puzzles(db, [puzzle_id])
+    
+    return {"message": "Puzzle deleted successfully"}
+
+@router.post("/bulk-delete", response_model=puzzle_schema.BulkDeleteResponse)
+def bulk_delete_puzzles(
+    request: puzzle_schema.BulkDeleteRequest,
+    db: Session = Depends(get_db),
+    current_user: user_model.User = Depends(get_current_user)
+):
+    """Delete many puzzles at once; admins may delete any, others only their own."""
+    requested = list(dict.fromkeys(request.puzzle_ids))
+    authors = dict(
+        db.query(puzzle_model.Puzzle.id, puzzle_model.Puzzle.author_id)
+        .filter(puzzle_model.Puzzle.id.in_(requested))
+        .all()
+    )
+    admin = is_admin(current_user)
+    allowed = [pid for pid in requested if pid in authors and (admin or authors[pid] == current_user.id)]
+    
+    delete_puzzles(db, allowed)
     
-    return {"message": "Puzzle deleted successfully"}
\ No newline at end of file
+    return {
+        "deleted": allowed,
+        "not_found": [pid for pid in requested if pid not in authors],
+        "forbidden": [pid for pid in requested if pid in authors and pid not in allowed]
+    }
+
+def delete_puzzles(db: Session, puzzle_ids: List[int]) -> None:
+    """
+    Delete puzzles with one statement per chunk of ids. Cells, clues,
+    progress and stats go with them through ON DELETE CASCADE, without
+    being loaded.
+    """
+    for start in range(0, len(puzzle_ids), 500):
+        chunk = puzzle_ids[start:start + 500]
+        db.query(puzzle_model.Puzzle).filter(puzzle_model.Puzzle.id.in_(chunk)).delete(synchronize_session=False)
+    db.commit()
+    # Other workers drop theirs when the lookup finds the puzzle gone
+    for puzzle_id in puzzle_ids:
+        answer_cache.invalidate(puzzle_id)
+    expire_word_index()
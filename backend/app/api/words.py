@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database import get_read_db
+from ..utils.word_index import get_word_index, refresh_word_index, WILDCARDS
+
+router = APIRouter()
+
+@router.get("/match")
+def match_pattern(
+    pattern: str = Query(..., min_length=2, max_length=25),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db)
+):
+    """Find answers/word-list entries matching a pattern like ``C?T`` or ``..ER.``."""
+    pattern = pattern.upper()
+    if not all(ch.isalnum() or ch in WILDCARDS for ch in pattern):
+        raise HTTPException(status_code=400, detail="Pattern may only contain letters, digits and ?/./_ wildcards")
+    
+    # Answers imported through other workers since the last refresh
+    refresh_word_index(db, settings.WORD_INDEX_REFRESH_SECONDS)
+    index = get_word_index()
+    return {
+        "pattern": pattern,
+        "count": index.count(pattern),
+        "results": index.match(pattern, limit=limit, offset=offset)
+    }
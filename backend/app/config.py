@@ -1,12 +1,111 @@
+import os
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, Set
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./crossword.db"
+    # Optional read replica; after a write, a client reads from the primary
+    # for READ_YOUR_WRITES_SECONDS to cover replication lag
+    DATABASE_READ_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = 10.0
     SECRET_KEY: str = "default-secret-key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REDIS_URL: Optional[str] = None
+    # Comma-separated usernames allowed to delete any puzzle
+    ADMIN_USERNAMES: str = ""
+    
+    # Constructor word index: optional word list (one entry per line) and a
+    # snapshot file so the word list's bitsets don't have to be rebuilt on
+    # every start (checksummed; delete it after changing the word list)
+    WORD_LIST_PATH: Optional[str] = None
+    WORD_INDEX_SNAPSHOT: Optional[str] = None
+    # Autofill searches in Python on the request's worker, holding the GIL:
+    # keep it interactive (a timeout returns the best partial fill, which can
+    # be sent back to continue) and run AUTOFILL_CONCURRENCY at once per process
+    AUTOFILL_MAX_SECONDS: float = 2.0
+    AUTOFILL_CONCURRENCY: int = 1
+    # How often a worker picks up answers stored through other workers
+    WORD_INDEX_REFRESH_SECONDS: float = 10.0
+    
+    # Puzzles whose solution/slot index is kept in memory for check/reveal
+    ANSWER_CACHE_SIZE: int = 512
+    # Newest puzzles whose answer index is loaded at startup (before forking
+    # when served by gunicorn with preload, so workers share it)
+    WARM_ANSWER_INDEXES: int = 200
+    
+    # Read-only puzzle snapshot (written by build_snapshot.py) that serves
+    # GET /api/puzzles/{id} from a shared memory map; the file is re-checked
+    # every SNAPSHOT_RELOAD_SECONDS. SNAPSHOT_VERIFY spends one primary-key
+    # lookup per read so edits and deletes after the build are never served
+    PUZZLE_SNAPSHOT_PATH: Optional[str] = None
+    SNAPSHOT_RELOAD_SECONDS: float = 30.0
+    SNAPSHOT_VERIFY: bool = True
+    
+    # "Next puzzle": candidate ids drawn per user and filter, and how long
+    # they are reused (completing a puzzle drops the user's candidates); an
+    # empty draw is kept briefly, and dropped when this process stores puzzles
+    NEXT_PUZZLE_CANDIDATES: int = 20
+    NEXT_PUZZLE_CACHE_SECONDS: float = 300.0
+    NEXT_PUZZLE_EMPTY_CACHE_SECONDS: float = 10.0
+    
+    # Completed saves untouched for this many days are compressed into cold
+    # storage by archive_progress.py
+    ARCHIVE_PROGRESS_AFTER_DAYS: float = 30.0
+    
+    # Streaming feed import: puzzles stored per transaction and the largest
+    # single puzzle document accepted
+    IMPORT_BATCH_SIZE: int = 200
+    IMPORT_MAX_DOCUMENT_BYTES: int = 8 * 1024 * 1024
+    
+    # Offline packs: puzzles per bundle window (by id), built bundles kept in
+    # memory per process, and the newest windows built at startup
+    PUZZLE_BUNDLE_SIZE: int = 50
+    BUNDLE_CACHE_SIZE: int = 64
+    WARM_BUNDLES: int = 2
+    
+    # Request instrumentation: slow-request log threshold (unset disables the
+    # log) and the per-request query count flagged as a likely N+1
+    SLOW_REQUEST_MS: Optional[float] = 1000.0
+    N_PLUS_ONE_THRESHOLD: int = 20
+    # With several worker processes, each writes its metrics to this directory
+    # every METRICS_DUMP_SECONDS and /metrics sums them (gunicorn.conf.py sets
+    # a temporary directory when unset)
+    METRICS_MULTIPROC_DIR: Optional[str] = None
+    METRICS_DUMP_SECONDS: float = 5.0
+    
+    # Background jobs (imports/exports): worker threads per process, queued
+    # jobs accepted before submissions are refused, attempts per job, first
+    # retry delay in seconds (doubling) and how long finished jobs are kept
+    # in Redis when REDIS_URL is set
+    JOB_WORKERS: int = 2
+    JOB_MAX_PENDING: int = 100
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_DELAY: float = 2.0
+    JOB_RESULT_TTL: int = 3600
+    
+    # Accept solve event batches (POST /api/progress/{id}/events) for replay
+    # and analytics; when off the endpoint answers 404
+    SOLVE_EVENT_LOG: bool = True
+    
+    # Rate limiting and admission control per route class (limits are in
+    # middleware/ratelimit.py); buckets are shared through REDIS_URL when set,
+    # in-flight caps are per worker process.
+    # Behind a proxy, trust the last X-Forwarded-For hop as the client IP.
+    # Unset: trusted on Railway or other platforms that assign PORT (their
+    # router sits in front), so clients don't all share the proxy's bucket
+    RATE_LIMIT_ENABLED: bool = True
+    TRUST_FORWARDED_FOR: Optional[bool] = None
+    
+    @property
+    def admin_usernames(self) -> Set[str]:
+        return {name.strip() for name in self.ADMIN_USERNAMES.split(",") if name.strip()}
+    
+    @property
+    def trust_forwarded_for(self) -> bool:
+        if self.TRUST_FORWARDED_FOR is not None:
+            return self.TRUST_FORWARDED_FOR
+        return any(os.environ.get(name) for name in ("RAILWAY_ENVIRONMENT", "RAILWAY_PROJECT_ID", "PORT"))
     
     class Config:
         env_file = ".env"
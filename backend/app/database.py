@@ -1,19 +1,100 @@
-from sqlalchemy import create_engine
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 
 # SQLite specific configuration
-connect_args = {"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+def _connect_args(url: str) -> dict:
+    return {"check_same_thread": False} if "sqlite" in url else {}
+
+connect_args = _connect_args(settings.DATABASE_URL)
 
 engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only endpoints go to a replica when DATABASE_READ_URL is set
+if settings.DATABASE_READ_URL:
+    read_engine = create_engine(settings.DATABASE_READ_URL, connect_args=_connect_args(settings.DATABASE_READ_URL))
+else:
+    read_engine = engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+def _enable_sqlite_foreign_keys(engine) -> None:
+    # SQLite ignores foreign keys, and so ON DELETE CASCADE, unless asked per connection
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def _set_pragma(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+_enable_sqlite_foreign_keys(engine)
+if read_engine is not engine:
+    _enable_sqlite_foreign_keys(read_engine)
+
+# Time until which a client's reads stay on the primary; sent as a cookie and
+# a response header, and accepted back as either (cross-site clients that
+# don't send cookies can echo the header)
+PRIMARY_COOKIE = "crossword_read_primary"
+PRIMARY_HEADER = "X-Read-Primary-Until"
+
 Base = declarative_base()
 
+@event.listens_for(ReadSessionLocal, "before_flush")
+def _reject_writes(session, flush_context, instances):
+    raise RuntimeError("Read-only session: use get_db for endpoints that write")
+
+# Set per request by ReadYourWritesMiddleware; flipped once a primary session commits
+_primary_commits: ContextVar[Optional[List[bool]]] = ContextVar("primary_commits", default=None)
+
+@event.listens_for(SessionLocal, "after_commit")
+def _note_commit(session):
+    committed = _primary_commits.get()
+    if committed is not None:
+        committed[0] = True
+
+def insert_or_ignore(db, model, values: dict) -> bool:
+    """
+    Insert a row unless it would violate a unique constraint, without an
+    error or a race with a concurrent insert. Returns whether it was inserted.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(model).values(**values).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        statement = sqlite.insert(model).values(**values).on_conflict_do_nothing()
+    else:
+        statement = insert(model).values(**values).prefix_with("IGNORE")  # MySQL
+    return db.execute(statement).rowcount == 1
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db(request: Request):
+    """
+    Session for endpoints that only read. Uses the replica, except for clients
+    that wrote recently (see ``PRIMARY_COOKIE``), so they see their own writes
+    despite replication lag.
+    """
+    sticky_until = request.cookies.get(PRIMARY_COOKIE) or request.headers.get(PRIMARY_HEADER)
+    try:
+        sticky = sticky_until is not None and float(sticky_until) > time.time()
+    except ValueError:
+        sticky = False
+    db = SessionLocal() if sticky else ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
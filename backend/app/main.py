@@ -1,12 +1,70 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .api import auth, puzzles, progress
-from .database import engine, Base
+from .api import auth, puzzles, progress, words, jobs
+from .config import settings
+from .database import engine, read_engine, Base, SessionLocal, PRIMARY_HEADER
+from .utils.word_index import build_word_index
+from .utils.jobs import get_job_queue
+from .utils.answer_index import warm_answer_cache
+from .utils.bundles import warm_bundles
+from .utils.snapshot import get_snapshot
+from .middleware import CompressionMiddleware, MetricsMiddleware, MultiprocessMetrics, ReadYourWritesMiddleware, RateLimitMiddleware, create_buckets, instrument_engine, registry
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Crossword Puzzle API", version="1.0.0")
+# Count SQL statements and time per request
+instrument_engine(engine)
+if read_engine is not engine:
+    instrument_engine(read_engine)
+
+_warmed = False
+
+def warm_up() -> None:
+    """
+    Build the word index, hot answer indexes and newest offline bundles. Runs once per process
+    tree: gunicorn (gunicorn.conf.py) calls it in the master before forking,
+    so workers inherit the data copy-on-write and skip it in their lifespan.
+    """
+    global _warmed
+    if _warmed:
+        return
+    db = SessionLocal()
+    try:
+        # Build the constructor word index before serving pattern queries
+        build_word_index(db, settings.WORD_LIST_PATH, settings.WORD_INDEX_SNAPSHOT)
+        warm_answer_cache(db, settings.WARM_ANSWER_INDEXES)
+        warm_bundles(db, settings.WARM_BUNDLES)
+    finally:
+        db.close()
+    # Map the puzzle snapshot before forking so workers share the mapping
+    get_snapshot()
+    _warmed = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_up()
+    
+    # Background import/export workers
+    job_queue = get_job_queue()
+    job_queue.start()
+    yield
+    job_queue.shutdown()
+
+app = FastAPI(title="Crossword Puzzle API", version="1.0.0", lifespan=lifespan)
+
+# Shed bursts per route class before they reach the worker threads; inside
+# CORS so refusals still carry CORS headers and preflights are never limited
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        buckets=create_buckets(settings.REDIS_URL),
+        secret_key=settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+        trust_forwarded_for=settings.trust_forwarded_for
+    )
 
 # Configure CORS
 app.add_middleware(
@@ -20,13 +78,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[PRIMARY_HEADER, "Retry-After"],
+)
+
+# Keep clients on the primary briefly after their own writes
+if settings.DATABASE_READ_URL:
+    app.add_middleware(ReadYourWritesMiddleware, window=settings.READ_YOUR_WRITES_SECONDS)
+
+# Compress responses with brotli (when installed) or gzip
+app.add_middleware(CompressionMiddleware, minimum_size=1000)
+
+# Outermost, so latency includes compression and CORS handling
+app.add_middleware(
+    MetricsMiddleware,
+    slow_request_ms=settings.SLOW_REQUEST_MS,
+    n_plus_one_threshold=settings.N_PLUS_ONE_THRESHOLD
 )
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(puzzles.router, prefix="/api/puzzles", tags=["puzzles"])
 app.include_router(progress.router, prefix="/api/progress", tags=["progress"])
+app.include_router(words.router, prefix="/api/words", tags=["words"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["jobs"])
 
 @app.get("/")
 def read_root():
-    return {"message": "Crossword Puzzle API", "version": "1.0.0"}
\ No newline at end of file
+    return {"message": "Crossword Puzzle API", "version": "1.0.0"}
+
+# Totals across gunicorn workers; None when serving from a single process
+multiprocess_metrics = (
+    MultiprocessMetrics(registry, settings.METRICS_MULTIPROC_DIR, settings.METRICS_DUMP_SECONDS)
+    if settings.METRICS_MULTIPROC_DIR else None
+)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    snapshot = multiprocess_metrics.collect() if multiprocess_metrics else None
+    return PlainTextResponse(registry.render(snapshot), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -0,0 +1,6 @@
+from .compression import CompressionMiddleware
+from .metrics import MetricsMiddleware, MultiprocessMetrics, instrument_engine, registry
+from .replica import ReadYourWritesMiddleware
+from .ratelimit import RateLimitMiddleware, create_buckets
+
+__all__ = ["CompressionMiddleware", "MetricsMiddleware", "MultiprocessMetrics", "ReadYourWritesMiddleware", "RateLimitMiddleware", "create_buckets", "instrument_engine", "registry"]
\ No newline at end of file
@@ -0,0 +1,125 @@
+import gzip
+from typing import Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies larger than this are compressed off the event loop
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, honouring q=0."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if token:
+            accepted[token] = quality
+    wildcard = accepted.get("*", 0.0)
+    if brotli is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+def vary_on_encoding(message: Message) -> bool:
+    """
+    Add ``Vary: Accept-Encoding`` to a response start message unless the app
+    encoded the body itself; returns whether the response can be compressed.
+    """
+    headers = MutableHeaders(raw=message["headers"])
+    if "content-encoding" in headers:
+        return False
+    headers.add_vary_header("Accept-Encoding")
+    return True
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level)
+
+class CompressionMiddleware:
+    """
+    Compress complete responses with brotli or gzip depending on Accept-Encoding.
+
+    Streaming responses and responses that already carry a Content-Encoding
+    are passed through untouched. Every other response, compressed or not,
+    gets ``Vary: Accept-Encoding`` so caches keep the encodings apart.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            async def send_identity(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    vary_on_encoding(message)
+                await send(message)
+
+            await self.app(scope, receive, send_identity)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                if vary_on_encoding(message):
+                    start_message = message
+                else:
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streaming or too small to be worth it
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= THREAD_MINIMUM_SIZE:
+                compressed = await anyio.to_thread.run_sync(
+                    compress, body, encoding, self.gzip_level, self.brotli_quality
+                )
+            else:
+                compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,358 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import fcntl
+except ImportError:  # Windows: no multi-process serving there anyway
+    fcntl = None
+
+logger = logging.getLogger("app.metrics")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+class RequestStats:
+    """SQL activity of the request currently being served."""
+
+    __slots__ = ("queries", "sql_time", "statements", "record_statements")
+
+    def __init__(self, record_statements: bool = False):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.statements: List[Tuple[str, float]] = []
+        self.record_statements = record_statements
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{k}="{str(v)}"'.replace("\n", " ") for k, v in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+class MetricsRegistry:
+    """
+    Process-local counters and histograms rendered in Prometheus text format;
+    see MultiprocessMetrics for totals across gunicorn workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Tuple, float]] = {}
+        self._histograms: Dict[str, Dict[Tuple, Histogram]] = {}
+        self._help: Dict[str, Tuple[str, str]] = {}
+        self._buckets: Dict[str, tuple] = {}
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._help[name] = ("counter", help_text)
+        self._counters.setdefault(name, {})
+
+    def histogram(self, name: str, help_text: str, buckets) -> None:
+        self._help[name] = ("histogram", help_text)
+        self._histograms.setdefault(name, {})
+        self._buckets[name] = tuple(buckets)
+
+    def inc(self, name: str, labels: Dict[str, str] = None, value: float = 1.0) -> None:
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, labels: Dict[str, str] = None) -> None:
+        key = tuple(sorted((labels or {}).items()))
+        with self._lock:
+            series = self._histograms[name]
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram(self._buckets[name])
+            hist.observe(value)
+
+    def clear(self) -> None:
+        """Drop every recorded value, keeping the metric definitions."""
+        with self._lock:
+            for series in self._counters.values():
+                series.clear()
+            for series in self._histograms.values():
+                series.clear()
+
+    def get(self, name: str, labels: Dict[str, str] = None) -> float:
+        key = tuple(sorted((labels or {}).items()))
+        return self._counters.get(name, {}).get(key, 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current values as plain JSON-able data (see ``merge_snapshots``)."""
+        with self._lock:
+            return {
+                "counters": {
+                    name: [[list(key), value] for key, value in series.items()]
+                    for name, series in self._counters.items()
+                },
+                "histograms": {
+                    name: [[list(key), list(hist.counts), hist.total, hist.count] for key, hist in series.items()]
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def render(self, snapshot: Optional[Dict[str, Any]] = None) -> str:
+        """Prometheus text for ``snapshot`` (by default this process's own values)."""
+        if snapshot is None:
+            snapshot = self.snapshot()
+        lines = []
+        for name, (kind, help_text) in self._help.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for key, value in snapshot["counters"].get(name, []):
+                    lines.append(f"{name}{_labels(dict(key))} {value:g}")
+                continue
+            buckets = self._buckets[name]
+            for key, counts, total, count in snapshot["histograms"].get(name, []):
+                labels = dict(key)
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_labels({**labels, 'le': f'{bound:g}'})} {cumulative}")
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {count}")
+                lines.append(f"{name}_sum{_labels(labels)} {total:g}")
+                lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum registry snapshots series by series."""
+    counters: Dict[str, Dict[Tuple, float]] = {}
+    histograms: Dict[str, Dict[Tuple, list]] = {}
+    for snapshot in snapshots:
+        for name, series in snapshot.get("counters", {}).items():
+            merged = counters.setdefault(name, {})
+            for key, value in series:
+                key = tuple(tuple(pair) for pair in key)
+                merged[key] = merged.get(key, 0.0) + value
+        for name, series in snapshot.get("histograms", {}).items():
+            merged = histograms.setdefault(name, {})
+            for key, counts, total, count in series:
+                key = tuple(tuple(pair) for pair in key)
+                entry = merged.get(key)
+                if entry is None:
+                    merged[key] = [list(counts), total, count]
+                else:
+                    entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                    entry[1] += total
+                    entry[2] += count
+    return {
+        "counters": {name: [[key, value] for key, value in series.items()] for name, series in counters.items()},
+        "histograms": {
+            name: [[key, counts, total, count] for key, (counts, total, count) in series.items()]
+            for name, series in histograms.items()
+        },
+    }
+
+class MultiprocessMetrics:
+    """
+    Registry values shared between worker processes through a directory.
+
+    Each worker writes its snapshot to ``<pid>.json`` every ``interval``
+    seconds (and when it exits); a scrape sums every file, so /metrics gives
+    the same totals whichever worker answers. The master folds the file of a
+    worker that exited into ``exited.json`` so recycled workers' counts are
+    kept and counters never go backwards.
+    """
+
+    EXITED = "exited.json"
+
+    def __init__(self, registry: "MetricsRegistry", directory: str, interval: float = 5.0):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _write(self, name: str, snapshot: Dict[str, Any]) -> None:
+        tmp_path = self._path(f".{name}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self._path(name))
+
+    def _read(self, name: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _locked(self, exclusive: bool):
+        """Lock file serializing folds against scrapes, so no file is counted twice or missed."""
+        f = open(self._path(".lock"), "a")
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        return f  # Closing it releases the lock
+
+    def dump(self) -> None:
+        self._write(f"{os.getpid()}.json", self.registry.snapshot())
+
+    def start(self) -> None:
+        """
+        Dump periodically from a daemon thread; call in each worker after
+        forking. Values copied from the master (its warm-up) are dropped first
+        so they aren't counted once per worker.
+        """
+        self.registry.clear()
+
+        def loop():
+            while True:
+                time.sleep(self.interval)
+                try:
+                    self.dump()
+                except OSError as e:
+                    logger.warning("Could not write metrics to %s: %s", self.directory, e)
+
+        threading.Thread(target=loop, name="metrics-dump", daemon=True).start()
+
+    def collect(self) -> Dict[str, Any]:
+        """Sum of every worker's latest snapshot, this process's taken fresh."""
+        own = f"{os.getpid()}.json"
+        with self._locked(exclusive=False):
+            names = [name for name in os.listdir(self.directory) if name.endswith(".json") and name != own]
+            snapshots = [self._read(name) for name in names]
+        return merge_snapshots([self.registry.snapshot()] + [s for s in snapshots if s])
+
+    def retire(self, pid: int) -> None:
+        """Fold an exited worker's last snapshot into exited.json (called by the master)."""
+        with self._locked(exclusive=True):
+            snapshot = self._read(f"{pid}.json")
+            if snapshot is None:
+                return
+            self._write(self.EXITED, merge_snapshots([self._read(self.EXITED) or {}, snapshot]))
+            os.unlink(self._path(f"{pid}.json"))
+
+    def reset(self) -> None:
+        """Drop files left by a previous run (called by the master before forking)."""
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                os.unlink(self._path(name))
+
+registry = MetricsRegistry()
+registry.histogram("http_request_duration_seconds", "Request latency by route", LATENCY_BUCKETS)
+registry.counter("http_requests_total", "Requests by route and status")
+registry.histogram("http_request_sql_queries", "SQL statements issued per request", QUERY_BUCKETS)
+registry.counter("http_request_sql_seconds_total", "Time spent in SQL by route")
+registry.counter("http_request_n_plus_one_total", "Requests exceeding the per-request query threshold")
+registry.counter("http_slow_requests_total", "Requests slower than SLOW_REQUEST_MS")
+registry.counter("sql_queries_total", "All SQL statements, inside or outside requests")
+
+def instrument_engine(engine) -> None:
+    """Count statements and SQL time per request through engine events."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        registry.inc("sql_queries_total")
+        stats = _current.get()
+        if stats is None:
+            return
+        stats.queries += 1
+        stats.sql_time += elapsed
+        if stats.record_statements:
+            stats.statements.append((statement, elapsed))
+
+def _route_label(scope: Scope) -> str:
+    # The route template keeps label cardinality bounded (/api/puzzles/{puzzle_id})
+    path = getattr(scope.get("route"), "path", None)
+    if not path:
+        return "unmatched"
+    # Newer FastAPI keeps include_router prefixes out of route.path
+    included = (scope.get("fastapi") or {}).get("included_router")
+    prefix = getattr(getattr(included, "include_context", None), "prefix", "") or ""
+    if prefix and not path.startswith(prefix):
+        path = prefix + path
+    return path
+
+class MetricsMiddleware:
+    """
+    Record latency, status and SQL activity per route.
+
+    Requests with more than ``n_plus_one_threshold`` statements are flagged
+    as likely N+1 patterns; requests slower than ``slow_request_ms`` are
+    logged together with their statement list.
+    """
+
+    def __init__(self, app: ASGIApp, slow_request_ms: Optional[float] = None, n_plus_one_threshold: int = 20):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(record_statements=self.slow_request_ms is not None or self.n_plus_one_threshold > 0)
+        token = _current.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current.reset(token)
+            self.record(scope, status, time.perf_counter() - start, stats)
+
+    def record(self, scope: Scope, status: int, elapsed: float, stats: RequestStats) -> None:
+        route = _route_label(scope)
+        method = scope["method"]
+        labels = {"method": method, "route": route}
+        registry.observe("http_request_duration_seconds", elapsed, labels)
+        registry.inc("http_requests_total", {**labels, "status": str(status)})
+        registry.observe("http_request_sql_queries", stats.queries, labels)
+        registry.inc("http_request_sql_seconds_total", labels, stats.sql_time)
+
+        if self.n_plus_one_threshold and stats.queries > self.n_plus_one_threshold:
+            registry.inc("http_request_n_plus_one_total", labels)
+            statement, repeats = Counter(s for s, _ in stats.statements).most_common(1)[0]
+            logger.warning(
+                "Possible N+1: %s %s issued %d queries (%d x %s)",
+                method, route, stats.queries, repeats, " ".join(statement.split())[:200]
+            )
+
+        if self.slow_request_ms is not None and elapsed * 1000 > self.slow_request_ms:
+            registry.inc("http_slow_requests_total", labels)
+            logger.warning(
+                "Slow request: %s %s took %.0f ms, %d queries, %.0f ms in SQL\n%s",
+                method, scope["path"], elapsed * 1000, stats.queries, stats.sql_time * 1000,
+                "\n".join(f"  {t * 1000:7.1f} ms  {' '.join(s.split())}" for s, t in stats.statements)
+            )
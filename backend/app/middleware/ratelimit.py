@@ -0,0 +1,233 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import anyio.to_thread
+from jose import JWTError, jwt
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .metrics import registry
+
+try:
+    import redis
+except ImportError:  # redis is optional; buckets then live in-process
+    redis = None
+
+logger = logging.getLogger("app.ratelimit")
+
+registry.counter("http_requests_shed_total", "Requests refused by rate limiting or admission control")
+
+class Limit(NamedTuple):
+    burst: int  # Bucket capacity
+    rate: float  # Tokens added per second
+
+class RouteClass(NamedTuple):
+    per_ip: Optional[Limit] = None
+    per_user: Optional[Limit] = None
+    concurrency: Optional[int] = None  # In-flight requests per worker process
+
+# Expensive routes get tight buckets and a concurrency cap so they can't take
+# over the worker threads; reads only get a generous per-IP ceiling.
+# Buckets are shared by every worker through Redis, but concurrency caps are
+# not: each bounds one worker's own thread pool (40 threads by default), so
+# they are sized per worker and N workers admit up to N times the cap
+ROUTE_CLASSES: Dict[str, RouteClass] = {
+    "auth": RouteClass(per_ip=Limit(10, 10 / 60), concurrency=4),  # bcrypt
+    "import": RouteClass(per_ip=Limit(20, 20 / 60), per_user=Limit(10, 10 / 60), concurrency=4),
+    "compute": RouteClass(per_ip=Limit(40, 2.0), per_user=Limit(20, 1.0), concurrency=8),
+    "write": RouteClass(per_ip=Limit(120, 20.0), per_user=Limit(30, 5.0)),
+    "read": RouteClass(per_ip=Limit(300, 100.0)),
+}
+
+EXEMPT_PATHS = {"/", "/metrics", "/docs", "/redoc", "/openapi.json"}
+IMPORT_PATHS = {"/api/puzzles/import", "/api/puzzles/import/stream", "/api/jobs/import", "/api/puzzles/bulk-delete"}
+
+def route_class(method: str, path: str) -> str:
+    """Route class of a request, from its method and path alone (before routing)."""
+    if method == "POST" and path in ("/api/auth/login", "/api/auth/register"):
+        return "auth"
+    if method == "POST" and (path in IMPORT_PATHS or path.startswith("/api/jobs/export/")):
+        return "import"
+    if path == "/api/puzzles/autofill" or path.startswith("/api/words/") or path == "/api/progress/events/export":
+        return "compute"
+    if method in ("GET", "HEAD"):
+        return "read"
+    return "write"
+
+class MemoryBuckets:
+    """Token buckets in this process; the least recently used keys are dropped past ``max_keys``."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, checks: List[Tuple[str, Limit]]) -> Optional[Tuple[int, float]]:
+        """
+        Take a token from every bucket, or from none of them. Returns None when
+        admitted, else (index of the first empty bucket, seconds until it refills).
+        """
+        now = time.monotonic()
+        with self._lock:
+            levels = []
+            for position, (key, limit) in enumerate(checks):
+                tokens, last = self._buckets.get(key, (limit.burst, now))
+                tokens = min(limit.burst, tokens + (now - last) * limit.rate)
+                if tokens < 1:
+                    return position, (1 - tokens) / limit.rate
+                levels.append(tokens)
+            for (key, _), tokens in zip(checks, levels):
+                self._buckets[key] = (tokens - 1, now)
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return None
+
+# Same all-or-nothing check as MemoryBuckets.acquire, atomically in Redis
+_ACQUIRE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local levels = {}
+for i, key in ipairs(KEYS) do
+    local burst = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    local bucket = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(bucket[1]) or burst
+    local ts = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        return {i, tostring((1 - tokens) / rate)}
+    end
+    levels[i] = tokens
+end
+for i, key in ipairs(KEYS) do
+    local burst = tonumber(ARGV[i * 2])
+    local rate = tonumber(ARGV[i * 2 + 1])
+    redis.call('HSET', key, 'tokens', levels[i] - 1, 'ts', now)
+    redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000) + 1000)
+end
+return {0, '0'}
+"""
+
+class RedisBuckets:
+    """Token buckets shared by every worker through Redis. Fails open if Redis is down."""
+
+    blocking = True  # Network round trip: called off the event loop
+
+    def __init__(self, client, prefix: str = "crossword:ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_ACQUIRE_SCRIPT)
+
+    def acquire(self, checks: List[Tuple[str, Limit]]) -> Optional[Tuple[int, float]]:
+        keys = [self.prefix + key for key, _ in checks]
+        args = [time.time()]
+        for _, limit in checks:
+            args.extend((limit.burst, limit.rate))
+        try:
+            position, wait = self._script(keys=keys, args=args)
+        except redis.RedisError as e:
+            logger.warning("Rate limiting skipped, Redis error: %s", e)
+            return None
+        if not position:
+            return None
+        return int(position) - 1, float(wait)
+
+def create_buckets(redis_url: Optional[str]):
+    if redis_url and redis is not None:
+        try:
+            client = redis.Redis.from_url(redis_url)
+            client.ping()
+            return RedisBuckets(client)
+        except redis.RedisError:
+            logger.warning("Redis unavailable at REDIS_URL; rate limits are per process")
+    return MemoryBuckets()
+
+class RateLimitMiddleware:
+    """
+    Admission control per route class (see ``ROUTE_CLASSES``): token buckets
+    per client IP and per user (the JWT subject, verified but not looked up),
+    and a cap on in-flight requests per process for expensive classes.
+
+    Requests over a rate limit get 429 and requests over a concurrency cap get
+    503, both with Retry-After; each is counted in ``http_requests_shed_total``.
+    """
+
+    def __init__(self, app: ASGIApp, buckets=None, secret_key: str = "", algorithm: str = "HS256",
+                 trust_forwarded_for: bool = False, route_classes: Dict[str, RouteClass] = None):
+        self.app = app
+        self.buckets = buckets or MemoryBuckets()
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.trust_forwarded_for = trust_forwarded_for
+        self.route_classes = route_classes or ROUTE_CLASSES
+        # Only touched on the event loop, so no lock is needed
+        self._in_flight: Dict[str, int] = {name: 0 for name in self.route_classes}
+
+    def client_ip(self, scope: Scope, headers: Headers) -> str:
+        if self.trust_forwarded_for:
+            # The last hop was appended by our own proxy; earlier ones are client-supplied
+            forwarded = headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[-1].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def user_key(self, headers: Headers) -> Optional[str]:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return None
+        try:
+            return jwt.decode(token, self.secret_key, algorithms=[self.algorithm]).get("sub")
+        except JWTError:
+            return None
+
+    def shed(self, name: str, reason: str, status: int, retry_after: float) -> JSONResponse:
+        registry.inc("http_requests_shed_total", {"route_class": name, "reason": reason})
+        detail = "Too many requests" if status == 429 else "Server busy, try again shortly"
+        return JSONResponse({"detail": detail}, status_code=status,
+                            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        name = route_class(scope["method"], scope["path"])
+        limits = self.route_classes[name]
+        headers = Headers(scope=scope)
+        checks, reasons = [], []
+        if limits.per_ip is not None:
+            checks.append((f"{name}:ip:{self.client_ip(scope, headers)}", limits.per_ip))
+            reasons.append("ip")
+        if limits.per_user is not None:
+            user = self.user_key(headers)
+            if user is not None:
+                checks.append((f"{name}:user:{user}", limits.per_user))
+                reasons.append("user")
+        if checks:
+            if self.buckets.blocking:
+                refused = await anyio.to_thread.run_sync(self.buckets.acquire, checks)
+            else:
+                refused = self.buckets.acquire(checks)
+            if refused is not None:
+                position, wait = refused
+                await self.shed(name, f"rate_{reasons[position]}", 429, wait)(scope, receive, send)
+                return
+
+        if limits.concurrency is None:
+            await self.app(scope, receive, send)
+            return
+        if self._in_flight[name] >= limits.concurrency:
+            await self.shed(name, "concurrency", 503, 1)(scope, receive, send)
+            return
+        self._in_flight[name] += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._in_flight[name] -= 1
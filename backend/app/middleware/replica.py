@@ -0,0 +1,43 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..database import PRIMARY_COOKIE, PRIMARY_HEADER, _primary_commits
+
+class ReadYourWritesMiddleware:
+    """
+    Pin a client's reads to the primary for ``window`` seconds after any of
+    its requests commits on the primary, via ``PRIMARY_COOKIE`` and
+    ``PRIMARY_HEADER``.
+    """
+
+    def __init__(self, app: ASGIApp, window: float = 10.0):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in ("GET", "HEAD", "OPTIONS"):
+            await self.app(scope, receive, send)
+            return
+
+        committed = [False]
+        token = _primary_commits.set(committed)
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and committed[0] and message["status"] < 400:
+                until = time.time() + self.window
+                headers = MutableHeaders(scope=message)
+                headers[PRIMARY_HEADER] = f"{until:.0f}"
+                # Lax cookies only come back from same-site pages; the frontend,
+                # on another site, echoes the header (utils/readYourWrites.ts)
+                headers.append(
+                    "Set-Cookie",
+                    f"{PRIMARY_COOKIE}={until:.0f}; Max-Age={int(self.window)}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _primary_commits.reset(token)
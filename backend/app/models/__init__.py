@@ -1,5 +1,7 @@
 from .user import User
 from .puzzle import Puzzle, PuzzleCell, Clue
 from .user_progress import UserProgress
+from .puzzle_stats import PuzzleStats
+from .solve_event import SolveEventChunk
 
-__all__ = ["User", "Puzzle", "PuzzleCell", "Clue", "UserProgress"]
\ No newline at end of file
+__all__ = ["User", "Puzzle", "PuzzleCell", "Clue", "UserProgress", "PuzzleStats", "SolveEventChunk"]
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, Enum, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -10,6 +10,8 @@ class Direction(enum.Enum):
 
 class Puzzle(Base):
     __tablename__ = "puzzles"
+    # Range scans by id within a size/difficulty, for picking the next puzzle
+    __table_args__ = (Index("ix_puzzles_size_difficulty_id", "grid_size", "difficulty", "id"),)
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -17,19 +19,23 @@ class Puzzle(Base):
     grid_size = Column(Integer, nullable=False)  # Store as single value, assuming square grid
     difficulty = Column(String)
     description = Column(Text)
+    content_hash = Column(String(64), index=True)  # Grid + clues digest, for spotting re-imports
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     author = relationship("User", back_populates="created_puzzles")
-    cells = relationship("PuzzleCell", back_populates="puzzle", cascade="all, delete-orphan")
-    clues = relationship("Clue", back_populates="puzzle", cascade="all, delete-orphan")
-    user_progress = relationship("UserProgress", back_populates="puzzle", cascade="all, delete-orphan")
+    # Child rows are removed by ON DELETE CASCADE; passive_deletes keeps the
+    # ORM from loading them just to delete them one by one
+    cells = relationship("PuzzleCell", back_populates="puzzle", cascade="all, delete-orphan", passive_deletes=True)
+    clues = relationship("Clue", back_populates="puzzle", cascade="all, delete-orphan", passive_deletes=True)
+    user_progress = relationship("UserProgress", back_populates="puzzle", cascade="all, delete-orphan", passive_deletes=True)
+    stats = relationship("PuzzleStats", back_populates="puzzle", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
 
 class PuzzleCell(Base):
     __tablename__ = "puzzle_cells"
     
     id = Column(Integer, primary_key=True, index=True)
-    puzzle_id = Column(Integer, ForeignKey("puzzles.id"), nullable=False)
+    puzzle_id = Column(Integer, ForeignKey("puzzles.id", ondelete="CASCADE"), nullable=False, index=True)
     row = Column(Integer, nullable=False)
     col = Column(Integer, nullable=False)
     solution = Column(String(1))  # Single character or empty for black squares
@@ -42,7 +48,7 @@ class Clue(Base):
     __tablename__ = "clues"
     
     id = Column(Integer, primary_key=True, index=True)
-    puzzle_id = Column(Integer, ForeignKey("puzzles.id"), nullable=False)
+    puzzle_id = Column(Integer, ForeignKey("puzzles.id", ondelete="CASCADE"), nullable=False, index=True)
     number = Column(Integer, nullable=False)
     direction = Column(Enum(Direction), nullable=False)
     text = Column(Text, nullable=False)
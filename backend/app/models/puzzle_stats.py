@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, Text
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+class PuzzleStats(Base):
+    __tablename__ = "puzzle_stats"
+    
+    # Maintained incrementally by save_progress (see utils/stats.py)
+    puzzle_id = Column(Integer, ForeignKey("puzzles.id", ondelete="CASCADE"), primary_key=True)
+    starts = Column(Integer, nullable=False, default=0)
+    completions = Column(Integer, nullable=False, default=0)
+    score_total = Column(BigInteger, nullable=False, default=0)
+    solve_time_total = Column(BigInteger, nullable=False, default=0)  # Seconds, over timed completions
+    solve_time_sketch = Column(Text)  # QuantileSketch JSON of completion times
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    puzzle = relationship("Puzzle", back_populates="stats")
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, LargeBinary
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from ..database import Base
+
+class SolveEventChunk(Base):
+    __tablename__ = "solve_event_chunks"
+    
+    # Append-only: a batch of solve events per row, encoded by utils/event_log.py
+    id = Column(Integer, primary_key=True, index=True)
+    progress_id = Column(Integer, ForeignKey("user_progress.id", ondelete="CASCADE"), nullable=False, index=True)
+    event_count = Column(Integer, nullable=False)
+    elapsed_ms = Column(Integer, nullable=False)  # Sum of the event time deltas
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    progress = relationship("UserProgress", back_populates="event_chunks")
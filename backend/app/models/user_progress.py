@@ -1,15 +1,24 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean, Index, LargeBinary
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..database import Base
 
 class UserProgress(Base):
     __tablename__ = "user_progress"
+    __table_args__ = (
+        # One user's progress in puzzle order; covers the "solved by this user" anti-join
+        Index("ix_user_progress_user_puzzle", "user_id", "puzzle_id", "is_completed"),
+        # One save per user and puzzle, so racing first saves can't both insert
+        Index("uq_user_progress_user_puzzle", "user_id", "puzzle_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    puzzle_id = Column(Integer, ForeignKey("puzzles.id"), nullable=False)
+    # Own index: the composite above leads with user_id, and cascaded deletes look rows up by puzzle
+    puzzle_id = Column(Integer, ForeignKey("puzzles.id", ondelete="CASCADE"), nullable=False, index=True)
     current_state = Column(Text)  # JSON string storing the current grid state
+    # Completed saves moved to cold storage: current_state zlib-compressed (see utils.progress_archive)
+    state_archive = Column(LargeBinary)
     completion_percentage = Column(Float, default=0.0)
     completion_time = Column(Integer)  # Time in seconds
     score = Column(Integer, default=0)
@@ -19,4 +28,5 @@ class UserProgress(Base):
     last_played = Column(DateTime(timezone=True), onupdate=func.now())
     
     user = relationship("User", back_populates="progress")
-    puzzle = relationship("Puzzle", back_populates="user_progress")
\ No newline at end of file
+    puzzle = relationship("Puzzle", back_populates="user_progress")
+    event_chunks = relationship("SolveEventChunk", back_populates="progress", cascade="all, delete-orphan", passive_deletes=True)
\ No newline at end of file
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Literal
 
 class ProgressUpdate(BaseModel):
     puzzle_id: int
@@ -23,4 +23,26 @@ class Progress(BaseModel):
     last_played: Optional[datetime]
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class SolveEvent(BaseModel):
+    dt: int = Field(0, ge=0)  # Milliseconds since the previous event
+    action: Literal["letter", "clear", "check", "reveal"]
+    row: Optional[int] = Field(None, ge=0)  # No cell: a whole-puzzle check/reveal
+    col: Optional[int] = Field(None, ge=0)
+    letter: Optional[str] = Field(None, min_length=1, max_length=1)
+
+class SolveEventBatch(BaseModel):
+    events: List[SolveEvent] = Field(..., min_length=1, max_length=1000)
+
+class SolveEventsAppended(BaseModel):
+    progress_id: int
+    appended: int
+
+class ReplayEvent(SolveEvent):
+    t: int  # Milliseconds since the first event
+
+class Replay(BaseModel):
+    progress_id: int
+    puzzle_id: int
+    events: List[ReplayEvent]
@@ -49,5 +49,127 @@ class Puzzle(BaseModel):
     class Config:
         from_attributes = True
 
+class FeedError(BaseModel):
+    index: int  # Position of the puzzle in the feed, from 0
+    detail: str
+
+class StreamImportResponse(BaseModel):
+    imported: int
+    duplicates: int
+    puzzle_ids: List[int]
+    error_count: int
+    errors: List[FeedError]  # The first 100
+    stopped: Optional[str] = None  # Why the feed couldn't be read to the end
+
+class PuzzleUpdate(BaseModel):
+    title: Optional[str] = Field(None, min_length=1)
+    difficulty: Optional[str] = None
+    description: Optional[str] = None
+    cells: Optional[List[PuzzleCell]] = None  # Only the squares to change, matched by row/col
+    clues: Optional[List[Clue]] = None  # Added or replaced, matched by number/direction
+
+class PuzzleChanges(BaseModel):
+    fields: List[str]
+    cells: int  # Cell rows rewritten, including renumbered ones
+    clues_added: int
+    clues_updated: int
+    clues_removed: int  # Entries that no longer exist after a block change
+    progress_pruned: int  # Saved solves that lost letters in changed squares
+
+class PuzzleUpdateResponse(Puzzle):
+    changes: PuzzleChanges
+
 class PuzzleWithProgress(Puzzle):
-    user_progress: Optional[Dict] = None
\ No newline at end of file
+    user_progress: Optional[Dict] = None
+
+class AutofillRequest(BaseModel):
+    grid_size: int = Field(ge=5, le=25)
+    cells: List[PuzzleCell]  # Leave solution empty for squares to fill
+    time_limit: float = Field(2.0, gt=0)  # Seconds, capped by AUTOFILL_MAX_SECONDS
+
+class AutofillWord(BaseModel):
+    number: int
+    direction: Direction
+    answer: str
+
+class AutofillResponse(BaseModel):
+    status: str  # "filled", "timeout" or "unsatisfiable"
+    cells: List[PuzzleCell]
+    words: List[AutofillWord]
+    elapsed: float
+    nodes: int
+    backtracks: int
+
+class CheckScope(str, Enum):
+    SQUARE = "square"
+    WORD = "word"
+    PUZZLE = "puzzle"
+
+class CheckRequest(BaseModel):
+    scope: CheckScope = CheckScope.SQUARE
+    # A square (row/col) for "square", a square or number + direction for "word"
+    row: Optional[int] = None
+    col: Optional[int] = None
+    number: Optional[int] = None
+    direction: Optional[Direction] = None
+    entries: Dict[str, str] = {}  # "row,col" -> letter, same keys as saved progress
+
+class CheckResponse(BaseModel):
+    results: Dict[str, str]  # "row,col" -> "correct", "incorrect" or "empty"
+    correct: int
+    incorrect: int
+    empty: int
+    is_solved: bool
+
+class RevealResponse(BaseModel):
+    letters: Dict[str, str]  # "row,col" -> solution letter
+
+class SolveTimeQuantiles(BaseModel):
+    p25: Optional[float] = None
+    p50: Optional[float] = None
+    p75: Optional[float] = None
+    p90: Optional[float] = None
+    p99: Optional[float] = None
+
+class PuzzleStats(BaseModel):
+    puzzle_id: int
+    starts: int
+    completions: int
+    completion_rate: float
+    average_score: Optional[float] = None
+    average_solve_time: Optional[float] = None  # Seconds
+    solve_time: SolveTimeQuantiles  # Seconds, approximate (within ~2%)
+    timed_completions: int
+
+class BulkDeleteRequest(BaseModel):
+    puzzle_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class BulkDeleteResponse(BaseModel):
+    deleted: List[int]
+    not_found: List[int]
+    forbidden: List[int]
+
+class NextPuzzle(BaseModel):
+    id: int
+    title: str
+    grid_size: int
+    difficulty: Optional[str]
+
+class PuzzleVersion(BaseModel):
+    id: int
+    updated_at: Optional[datetime]  # Last edit, or creation if never edited
+
+class BundleWindow(BaseModel):
+    window: int
+    first_id: int
+    last_id: int
+    count: int
+    updated_at: Optional[datetime]
+    etag: str  # Changes whenever a puzzle in the window is added, edited or deleted
+    url: str
+
+class BundleManifest(BaseModel):
+    version: Optional[datetime]  # Pass back as ?since= to list later changes
+    bundle_size: int
+    windows: List[BundleWindow]
+    changed: Optional[List[PuzzleVersion]] = None  # Only with ?since=
@@ -1,4 +1,4 @@
 from .puz_parser import parse_puz_file, export_to_puz
-from .nyt_parser import parse_nyt_format, export_to_nyt
+from .nyt_parser import parse_nyt_format, parse_nyt_data, export_to_nyt
 
-__all__ = ["parse_puz_file", "export_to_puz", "parse_nyt_format", "export_to_nyt"]
\ No newline at end of file
+__all__ = ["parse_puz_file", "export_to_puz", "parse_nyt_format", "parse_nyt_data", "export_to_nyt"]
\ No newline at end of file
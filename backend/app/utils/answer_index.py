@@ -0,0 +1,168 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+
+from ..config import settings
+from .grid import Grid, Slot, EMPTY
+
+class AnswerIndex:
+    """Solution buffer plus a square -> slots map for one puzzle."""
+
+    __slots__ = ("grid", "cell_slots", "version")
+
+    def __init__(self, grid: Grid, version=None):
+        self.grid = grid
+        # coalesce(updated_at, created_at) when loaded: a cached index built
+        # from an older version (e.g. inherited from the preloading master) is stale
+        self.version = version
+        self.cell_slots: Dict[int, List[Slot]] = {}
+        for slot in grid.slots:
+            for idx in slot.cells:
+                self.cell_slots.setdefault(idx, []).append(slot)
+
+    def key(self, idx: int) -> str:
+        """Square key in the "row,col" form used by saved progress."""
+        row, col = divmod(idx, self.grid.width)
+        return f"{row},{col}"
+
+    def check(self, cells, entries: Dict[str, str]) -> Dict[str, str]:
+        """Mark each square "correct", "incorrect" or "empty" against the user's letters."""
+        solution = self.grid.solution
+        results = {}
+        for idx in cells:
+            key = self.key(idx)
+            letter = (entries.get(key) or "").strip().upper()
+            if not letter:
+                results[key] = "empty"
+            elif solution[idx] == EMPTY or letter == solution[idx]:
+                results[key] = "correct"
+            else:
+                results[key] = "incorrect"
+        return results
+
+    def reveal(self, cells) -> Dict[str, str]:
+        solution = self.grid.solution
+        return {self.key(idx): solution[idx] for idx in cells if solution[idx] != EMPTY}
+
+    def cells_for(self, scope: str, row: Optional[int] = None, col: Optional[int] = None,
+                  number: Optional[int] = None, direction=None) -> Tuple[int, ...]:
+        """Square indices covered by a "square", "word" or "puzzle" scope."""
+        grid = self.grid
+        if scope == "puzzle":
+            return tuple(idx for idx in range(len(grid)) if not grid.is_block(idx))
+        if scope == "word" and number is not None:
+            slot = grid.slot(number, direction)
+            if slot is None:
+                raise ValueError("No such entry in this puzzle")
+            return slot.cells
+        if row is None or col is None or not (0 <= row < grid.height and 0 <= col < grid.width):
+            raise ValueError("A square inside the grid is required")
+        idx = grid.index(row, col)
+        if grid.is_block(idx):
+            raise ValueError("That square is a black square")
+        if scope == "square":
+            return (idx,)
+        if scope == "word":
+            # Word through the selected square, across unless only a down entry exists
+            slots = self.cell_slots.get(idx, [])
+            matching = [s for s in slots if direction is None or s.direction.value == getattr(direction, "value", direction)]
+            if not matching:
+                raise ValueError("No entry runs through that square")
+            return matching[0].cells
+        raise ValueError(f"Unknown scope {scope!r}")
+
+class _AnswerCache:
+    """Small LRU of AnswerIndex objects keyed by puzzle id."""
+
+    def __init__(self, maxsize: int = 512):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[int, AnswerIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, puzzle_id: int) -> Optional[AnswerIndex]:
+        with self._lock:
+            index = self._items.get(puzzle_id)
+            if index is not None:
+                self._items.move_to_end(puzzle_id)
+            return index
+
+    def put(self, puzzle_id: int, index: AnswerIndex) -> None:
+        with self._lock:
+            self._items[puzzle_id] = index
+            self._items.move_to_end(puzzle_id)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def invalidate(self, puzzle_id: int) -> None:
+        with self._lock:
+            self._items.pop(puzzle_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+answer_cache = _AnswerCache(settings.ANSWER_CACHE_SIZE)
+
+def _version_column():
+    from ..models.puzzle import Puzzle
+    return func.coalesce(Puzzle.updated_at, Puzzle.created_at)
+
+def load_answer_index(db, puzzle_id: int, grid_size: int, version=None) -> AnswerIndex:
+    """Build a puzzle's AnswerIndex from plain column tuples, no ORM objects."""
+    from ..models.puzzle import PuzzleCell
+
+    rows = db.query(
+        PuzzleCell.row, PuzzleCell.col, PuzzleCell.solution, PuzzleCell.is_black_square
+    ).filter(PuzzleCell.puzzle_id == puzzle_id).all()
+    cells = [
+        {"row": row, "col": col, "solution": solution, "is_black_square": is_black}
+        for row, col, solution, is_black in rows
+    ]
+    return AnswerIndex(Grid.from_cells(cells, grid_size), version)
+
+def get_answer_index(db, puzzle_id: int) -> Optional[AnswerIndex]:
+    """
+    Cached AnswerIndex for a puzzle, loading it on first use. One primary-key
+    lookup per call confirms the puzzle still exists and hasn't been edited
+    since it was cached, so edits and deletes made through any worker are seen.
+    """
+    from ..models.puzzle import Puzzle
+
+    current = db.query(Puzzle.grid_size, _version_column()).filter(Puzzle.id == puzzle_id).first()
+    if current is None:
+        answer_cache.invalidate(puzzle_id)
+        return None
+    grid_size, version = current
+    index = answer_cache.get(puzzle_id)
+    if index is None or index.version != version:
+        index = load_answer_index(db, puzzle_id, grid_size, version)
+        answer_cache.put(puzzle_id, index)
+    return index
+
+def warm_answer_cache(db, limit: int) -> int:
+    """Load the newest ``limit`` puzzles into the cache with two queries; returns how many."""
+    from ..models.puzzle import Puzzle, PuzzleCell
+
+    if limit <= 0:
+        return 0
+    puzzles = db.query(Puzzle.id, Puzzle.grid_size, _version_column()).order_by(Puzzle.id.desc()).limit(limit).all()
+    sizes = {puzzle_id: grid_size for puzzle_id, grid_size, _ in puzzles}
+    versions = {puzzle_id: version for puzzle_id, _, version in puzzles}
+    if not sizes:
+        return 0
+    cells: Dict[int, list] = {puzzle_id: [] for puzzle_id in sizes}
+    rows = db.query(
+        PuzzleCell.puzzle_id, PuzzleCell.row, PuzzleCell.col, PuzzleCell.solution, PuzzleCell.is_black_square
+    ).filter(PuzzleCell.puzzle_id.in_(list(sizes)))
+    for puzzle_id, row, col, solution, is_black in rows:
+        cells[puzzle_id].append({"row": row, "col": col, "solution": solution, "is_black_square": is_black})
+    # Oldest first, so the newest puzzles end up most recently used
+    for puzzle_id in sorted(sizes):
+        try:
+            answer_cache.put(puzzle_id, AnswerIndex(Grid.from_cells(cells[puzzle_id], sizes[puzzle_id]),
+                                                     versions[puzzle_id]))
+        except ValueError:
+            continue
+    return len(sizes)
@@ -0,0 +1,258 @@
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from .grid import Grid
+from .word_index import WordIndex, iter_bits, popcount
+
+# Characters treated as "not filled yet" in an input grid
+EMPTY_CHARS = {"?", " ", "_", "-"}
+
+# Node budget for the first search attempt; each restart allows 1.5x more
+_FIRST_RESTART = 64
+
+class _Timeout(Exception):
+    pass
+
+class _Restart(Exception):
+    pass
+
+class _Slot:
+    """An unfilled across/down entry; its candidates live as a bitset over its length bucket."""
+
+    __slots__ = ("number", "direction", "cells", "bucket", "crossings", "same_length")
+
+    def __init__(self, number, direction, cells, bucket):
+        self.number = number
+        self.direction = direction
+        self.cells = cells
+        self.bucket = bucket
+        self.crossings = []     # (my position, other slot index, other position)
+        self.same_length = []   # other slots drawing from the same bucket
+
+def _is_single(bits: int) -> bool:
+    return bits & (bits - 1) == 0
+
+# Below this many candidates it is cheaper to read the words than to AND bitsets
+_SCAN_LIMIT = 48
+
+def _letters(slot: _Slot, domain: int, pos: int) -> frozenset:
+    """Letters still possible at ``pos`` given the slot's remaining candidates."""
+    if popcount(domain) <= _SCAN_LIMIT:
+        words = slot.bucket.words
+        return frozenset(words[idx][pos] for idx in iter_bits(domain))
+    return frozenset(ch for ch, bits in slot.bucket.positions[pos].items() if bits & domain)
+
+class _Solver:
+    def __init__(self, slots: List[_Slot], deadline: float, seed: int = 0):
+        self.slots = slots
+        self.deadline = deadline
+        self.rng = None
+        self.seed = seed
+        self.node_limit = None
+        self.attempt_nodes = 0
+        self.restarts = 0
+        self.nodes = 0
+        self.backtracks = 0
+        self.best = None
+        self.best_filled = -1
+        # (slot, position) -> (letters, crossing mask) from the last revision
+        self._support = {}
+
+    def propagate(self, domains: List[int], queue: set) -> bool:
+        """Arc consistency over crossings: drop candidates with no compatible crossing letter."""
+        slots = self.slots
+        support = self._support
+        while queue:
+            i = queue.pop()
+            slot = slots[i]
+            domain = domains[i]
+            for pos, j, other_pos in slot.crossings:
+                letters = _letters(slot, domain, pos)
+                cached = support.get((i, pos))
+                if cached is not None and cached[0] == letters:
+                    allowed = cached[1]
+                else:
+                    allowed = 0
+                    column = slots[j].bucket.positions[other_pos]
+                    for ch in letters:
+                        allowed |= column.get(ch, 0)
+                    support[(i, pos)] = (letters, allowed)
+                narrowed = domains[j] & allowed
+                if narrowed != domains[j]:
+                    if not narrowed:
+                        return False
+                    domains[j] = narrowed
+                    queue.add(j)
+        return True
+
+    def assign(self, domains: List[int], i: int, bit: int) -> Optional[List[int]]:
+        domains = domains[:]
+        chosen = 1 << bit
+        domains[i] = chosen
+        queue = {i}
+        # An entry can't appear twice in the grid
+        for j in self.slots[i].same_length:
+            if domains[j] & chosen:
+                domains[j] &= ~chosen
+                if not domains[j]:
+                    return None
+                queue.add(j)
+        return domains if self.propagate(domains, queue) else None
+
+    def record(self, domains: List[int]) -> None:
+        filled = sum(1 for d in domains if _is_single(d))
+        if filled > self.best_filled:
+            self.best_filled = filled
+            self.best = domains
+
+    def candidates(self, domain: int):
+        """Candidate bits, word-list order first and rotated on restarts.
+
+        The rotation point is skewed towards the front so better-ranked
+        entries are still tried early.
+        """
+        if self.rng is None:
+            return iter_bits(domain)
+        split = int(domain.bit_length() * self.rng.random() ** 3)
+        high = (domain >> split) << split
+        return _chain(iter_bits(high), iter_bits(domain ^ high))
+
+    def run(self, domains: List[int]) -> Optional[List[int]]:
+        """Search with restarts: a heavy-tailed bad start is abandoned instead of exhausted."""
+        self.node_limit = _FIRST_RESTART
+        while True:
+            self.attempt_nodes = 0
+            try:
+                return self.solve(domains)
+            except _Restart:
+                self.restarts += 1
+                self.node_limit = int(self.node_limit * 1.5)
+                self.rng = random.Random(self.seed + self.restarts)
+
+    def solve(self, domains: List[int]) -> Optional[List[int]]:
+        self.nodes += 1
+        self.attempt_nodes += 1
+        if time.monotonic() > self.deadline:
+            raise _Timeout()
+        if self.attempt_nodes > self.node_limit:
+            raise _Restart()
+        self.record(domains)
+
+        # Most-constrained slot first; singletons are already decided
+        choice, choice_count = None, None
+        for i, domain in enumerate(domains):
+            if _is_single(domain):
+                continue
+            count = popcount(domain)
+            if choice_count is None or count < choice_count:
+                choice, choice_count = i, count
+                if count == 2:
+                    break
+
+        if choice is None:
+            # Propagation can settle two same-length slots on one word
+            seen = set()
+            for slot, domain in zip(self.slots, domains):
+                key = (id(slot.bucket), domain)
+                if key in seen:
+                    return None
+                seen.add(key)
+            return domains
+
+        for bit in self.candidates(domains[choice]):
+            narrowed = self.assign(domains, choice, bit)
+            if narrowed is not None:
+                result = self.solve(narrowed)
+                if result is not None:
+                    return result
+            self.backtracks += 1
+        return None
+
+def _chain(*iterables):
+    for iterable in iterables:
+        yield from iterable
+
+def _render(grid: List[str], slots: List[_Slot], domains: List[int]) -> str:
+    cells = list(grid)
+    for slot, domain in zip(slots, domains):
+        if domain and _is_single(domain):
+            word = slot.bucket.words[domain.bit_length() - 1]
+            for idx, ch in zip(slot.cells, word):
+                cells[idx] = ch
+    return "".join(cells)
+
+def autofill(grid: str, width: int, height: int, index: WordIndex, time_limit: float = 5.0, seed: int = 0) -> Dict[str, Any]:
+    """
+    Fill the empty squares of a row-major grid from the word index.
+
+    ``grid`` uses '.' for black squares, '?' (or space/_/-) for empty squares
+    and letters for squares that are already fixed. Returns the status
+    ("filled", "timeout" or "unsatisfiable"), the resulting grid and search stats.
+    """
+    start = time.monotonic()
+    if len(grid) != width * height:
+        raise ValueError("Grid does not match the given dimensions")
+    cells = ["?" if ch in EMPTY_CHARS else ch.upper() for ch in grid]
+    grid = "".join(cells)
+
+    entries = Grid(width, height, grid).slots
+
+    slots: List[_Slot] = []
+    domains: List[int] = []
+    cell_slots: Dict[int, List[tuple]] = {}
+    used = set()
+    for number, direction, indices in entries:
+        pattern = "".join(cells[i] for i in indices)
+        if "?" not in pattern:
+            used.add(pattern)
+            continue
+        bucket = index.bucket(len(indices))
+        domain = bucket.match_bits(pattern) if bucket else 0
+        for pos, idx in enumerate(indices):
+            cell_slots.setdefault(idx, []).append((len(slots), pos))
+        slots.append(_Slot(number, direction, indices, bucket))
+        domains.append(domain)
+
+    def result(status, filled_grid, solver=None):
+        return {
+            "status": status,
+            "grid": filled_grid,
+            "elapsed": time.monotonic() - start,
+            "nodes": solver.nodes if solver else 0,
+            "backtracks": solver.backtracks if solver else 0,
+            "restarts": solver.restarts if solver else 0,
+        }
+
+    if any(not domain for domain in domains):
+        return result("unsatisfiable", grid)
+
+    # Words already in the grid can't be reused by open slots
+    for word in used:
+        bit = index.position(word)
+        if bit is None:
+            continue
+        for i, slot in enumerate(slots):
+            if len(slot.cells) == len(word):
+                domains[i] &= ~(1 << bit)
+
+    for crossing in cell_slots.values():
+        if len(crossing) == 2:
+            (i, pos_i), (j, pos_j) = crossing
+            slots[i].crossings.append((pos_i, j, pos_j))
+            slots[j].crossings.append((pos_j, i, pos_i))
+    for i, slot in enumerate(slots):
+        slot.same_length = [j for j, other in enumerate(slots) if j != i and other.bucket is slot.bucket]
+
+    solver = _Solver(slots, start + time_limit, seed)
+    if not all(domains) or not solver.propagate(domains, set(range(len(slots)))):
+        return result("unsatisfiable", grid, solver)
+
+    try:
+        solution = solver.run(domains)
+    except _Timeout:
+        return result("timeout", _render(cells, slots, solver.best or domains), solver)
+
+    if solution is None:
+        return result("unsatisfiable", grid, solver)
+    return result("filled", _render(cells, slots, solution), solver)
@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+
+from ..config import settings
+from .compact import COMPACT_VERSION, compact_puzzle
+from .serialization import dumps
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Offline packs: puzzles are grouped into fixed windows of consecutive ids
+# (window n holds ids n*size .. n*size+size-1). A window's etag changes when a
+# puzzle in it is added, edited or deleted, so clients compare etags from the
+# manifest and fetch only the windows that changed.
+
+class Bundle:
+    """One window's compact JSON, pre-compressed for every encoding we serve."""
+
+    __slots__ = ("window", "etag", "bodies")
+
+    def __init__(self, window: int, etag: str, body: bytes):
+        self.window = window
+        self.etag = etag
+        # Built once per version, so spend the CPU on the best ratio
+        self.bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=11)
+
+class _BundleCache:
+    """LRU of built bundles keyed by window; a stale etag means a rebuild."""
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[int, Bundle]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, window: int, etag: str) -> Optional[Bundle]:
+        with self._lock:
+            bundle = self._items.get(window)
+            if bundle is None or bundle.etag != etag:
+                return None
+            self._items.move_to_end(window)
+            return bundle
+
+    def put(self, bundle: Bundle) -> None:
+        with self._lock:
+            self._items[bundle.window] = bundle
+            self._items.move_to_end(bundle.window)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+bundle_cache = _BundleCache(settings.BUNDLE_CACHE_SIZE)
+
+def _version_column():
+    from ..models.puzzle import Puzzle
+    return func.coalesce(Puzzle.updated_at, Puzzle.created_at)
+
+def _etag(size: int, count: int, id_sum: int, version: Optional[datetime]) -> str:
+    key = f"{COMPACT_VERSION}:{size}:{count}:{id_sum}:{version.isoformat() if version else ''}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def window_summaries(db, size: int, window: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Id range, puzzle count, newest version and etag of each non-empty window."""
+    from ..models.puzzle import Puzzle
+
+    window_column = (Puzzle.id // size).label("window")
+    query = db.query(
+        window_column,
+        func.count(Puzzle.id),
+        func.min(Puzzle.id),
+        func.max(Puzzle.id),
+        func.sum(Puzzle.id),
+        func.max(_version_column())
+    )
+    if window is not None:
+        query = query.filter(Puzzle.id >= window * size, Puzzle.id < (window + 1) * size)
+    rows = query.group_by(window_column).order_by(window_column).all()
+    return [
+        {
+            "window": number,
+            "first_id": first_id,
+            "last_id": last_id,
+            "count": count,
+            "updated_at": version,
+            "etag": _etag(size, count, id_sum, version)
+        }
+        for number, count, first_id, last_id, id_sum, version in rows
+    ]
+
+def changed_since(db, since: datetime) -> List[Dict[str, Any]]:
+    """Ids and versions of puzzles created or edited at or after ``since``."""
+    from ..models.puzzle import Puzzle
+
+    version = _version_column()
+    rows = db.query(Puzzle.id, version).filter(version >= since).order_by(Puzzle.id).all()
+    return [{"id": puzzle_id, "updated_at": updated_at} for puzzle_id, updated_at in rows]
+
+def build_bundle(db, window: int, size: int, etag: str) -> Bundle:
+    from ..models.puzzle import Puzzle
+
+    puzzles = db.query(Puzzle).options(
+        selectinload(Puzzle.cells),
+        selectinload(Puzzle.clues)
+    ).filter(Puzzle.id >= window * size, Puzzle.id < (window + 1) * size).order_by(Puzzle.id).all()
+    body = dumps({
+        "v": COMPACT_VERSION,
+        "window": window,
+        "etag": etag,
+        "puzzles": [compact_puzzle(p) for p in puzzles]
+    })
+    return Bundle(window, etag, body)
+
+def get_bundle(db, window: int) -> Optional[Bundle]:
+    """The cached bundle for a window, rebuilt if its puzzles changed; None when empty."""
+    size = settings.PUZZLE_BUNDLE_SIZE
+    summaries = window_summaries(db, size, window)
+    if not summaries:
+        return None
+    etag = summaries[0]["etag"]
+    bundle = bundle_cache.get(window, etag)
+    if bundle is None:
+        bundle = build_bundle(db, window, size, etag)
+        bundle_cache.put(bundle)
+    return bundle
+
+def warm_bundles(db, limit: int) -> int:
+    """Build the newest ``limit`` windows ahead of the first request; returns how many."""
+    if limit <= 0:
+        return 0
+    size = settings.PUZZLE_BUNDLE_SIZE
+    summaries = window_summaries(db, size)[-limit:]
+    for summary in summaries:
+        bundle_cache.put(build_bundle(db, summary["window"], size, summary["etag"]))
+    return len(summaries)
@@ -0,0 +1,47 @@
+from typing import Any, Dict, Optional
+
+from .grid import Grid
+
+# Wire format v2: grid as one row-major string instead of per-cell objects
+COMPACT_VERSION = 2
+COMPACT_MEDIA_TYPE = "application/vnd.crossword.v2+json"
+COMPACT_FORMATS = {"compact", "v2", "2"}
+
+def wants_compact(accept: Optional[str], format: Optional[str] = None) -> bool:
+    """True when the client asked for v2 via ?format= or the Accept header."""
+    if format is not None:
+        return format.lower() in COMPACT_FORMATS
+    return bool(accept) and COMPACT_MEDIA_TYPE in accept
+
+def compact_puzzle(puzzle: Any) -> Dict[str, Any]:
+    """
+    Compact representation of a puzzle ORM row (cells and clues loaded).
+
+    ``grid`` is the row-major solution with '.' for black squares,
+    ``numbers`` maps square index to clue number and clues are grouped
+    by direction as [number, text, answer].
+    """
+    grid = Grid.from_cells(puzzle.cells, puzzle.grid_size)
+    numbers = {
+        str(cell.row * puzzle.grid_size + cell.col): cell.number
+        for cell in puzzle.cells if cell.number
+    }
+    clues = {"across": [], "down": []}
+    for clue in sorted(puzzle.clues, key=lambda c: c.number):
+        direction = getattr(clue.direction, "value", clue.direction).lower()
+        clues[direction].append([clue.number, clue.text, clue.answer])
+
+    return {
+        "v": COMPACT_VERSION,
+        "id": puzzle.id,
+        "title": puzzle.title,
+        "author_id": puzzle.author_id,
+        "grid_size": puzzle.grid_size,
+        "difficulty": puzzle.difficulty,
+        "description": puzzle.description,
+        "created_at": puzzle.created_at.isoformat() if puzzle.created_at else None,
+        "updated_at": puzzle.updated_at.isoformat() if puzzle.updated_at else None,
+        "grid": grid.solution,
+        "numbers": numbers,
+        "clues": clues
+    }
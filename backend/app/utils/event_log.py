@@ -0,0 +1,93 @@
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# Solve event log: each chunk is a zlib-compressed run of varint-encoded events
+#
+#   varint delta_ms | byte action | varint row + 1 (0: no cell) | varint col | byte letter
+#
+# col is only present with a cell and the letter only for "letter" events.
+# Timestamps are deltas from the previous event, so a chunk can be decoded on
+# its own and a whole solve is replayed by concatenating its chunks in order.
+EVENT_LOG_VERSION = 1
+
+ACTIONS = ("letter", "clear", "check", "reveal")
+_ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+_LETTER = _ACTION_CODES["letter"]
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+def encode_events(events: Iterable[Dict[str, Any]]) -> Tuple[bytes, int, int]:
+    """
+    Encode events (dicts with dt, action and optional row, col, letter) into
+    a compressed chunk. Returns (data, event count, total milliseconds).
+    """
+    out = bytearray()
+    count = elapsed = 0
+    for event in events:
+        action = _ACTION_CODES.get(event["action"])
+        if action is None:
+            raise ValueError(f"Unknown event action: {event['action']}")
+        dt = int(event.get("dt") or 0)
+        if dt < 0:
+            raise ValueError("Event time deltas can't be negative")
+        _write_varint(out, dt)
+        out.append(action)
+        row = event.get("row")
+        if row is None:
+            out.append(0)
+        else:
+            _write_varint(out, row + 1)
+            _write_varint(out, event["col"])
+        if action == _LETTER:
+            letter = (event.get("letter") or "").upper()
+            if len(letter) != 1 or not ("A" <= letter <= "Z"):
+                raise ValueError("Letter events need a single letter A-Z")
+            if row is None:
+                raise ValueError("Letter events need a cell")
+            out.append(ord(letter))
+        count += 1
+        elapsed += dt
+    return zlib.compress(bytes(out), 6), count, elapsed
+
+def decode_events(data: bytes) -> List[Dict[str, Any]]:
+    """Decode one chunk; ``dt`` is kept as the delta from the previous event."""
+    raw = zlib.decompress(data)
+    events = []
+    pos = 0
+    while pos < len(raw):
+        dt, pos = _read_varint(raw, pos)
+        action = raw[pos]
+        pos += 1
+        event = {"dt": dt, "action": ACTIONS[action]}
+        row, pos = _read_varint(raw, pos)
+        if row:
+            event["row"] = row - 1
+            event["col"], pos = _read_varint(raw, pos)
+        if action == _LETTER:
+            event["letter"] = chr(raw[pos])
+            pos += 1
+        events.append(event)
+    return events
+
+def replay_events(chunks: Iterable[bytes], start: int = 0) -> Iterator[Dict[str, Any]]:
+    """Events of consecutive chunks with ``t``, milliseconds since the solve began."""
+    t = start
+    for data in chunks:
+        for event in decode_events(data):
+            t += event["dt"]
+            event["t"] = t
+            yield event
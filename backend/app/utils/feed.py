@@ -0,0 +1,158 @@
+import codecs
+import json
+import re
+from typing import Any, List, Optional
+
+_WHITESPACE = " \t\r\n"
+
+# Scanning an array item: a whole string (matched in one go, brackets in it
+# included), a bracket, or a quote that opens a string not all here yet
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]"]')
+_SCALAR_END = re.compile(r'[,\]\s]')
+
+class FeedParser:
+    """
+    Incremental parser for a feed of JSON documents: NDJSON (one document
+    per line) or a single JSON array of documents, told apart by the first
+    character. Feed it the body chunk by chunk; each call returns the
+    documents completed so far.
+
+    Memory is bounded by the largest single document, not by the feed. A
+    document split across chunks is decoded once, after a scan that resumes
+    chunk by chunk has found its end, so the work stays linear however
+    finely the body is chunked. A bad NDJSON line comes back as a ValueError
+    in place of its document; a malformed array can't be resynchronised, so
+    it raises ValueError.
+    """
+
+    def __init__(self, max_document_size: int = 8 * 1024 * 1024):
+        self.max_document_size = max_document_size
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._mode = None  # "lines" or "array", once the first character is seen
+        self._expect_comma = False
+        self._closed = False
+        # How far into the buffer's first line or array item was already
+        # scanned, and the item's nesting depth there
+        self._scanned = 0
+        self._depth = 0
+        self._partial = False  # The array item at the buffer's start is incomplete
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[Any]:
+        try:
+            self._buffer += self._decoder.decode(chunk, final)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Feed is not valid UTF-8: {e}")
+        documents: List[Any] = []
+        if self._mode is None:
+            stripped = self._buffer.lstrip(_WHITESPACE)
+            if not stripped:
+                self._buffer = ""
+                return documents
+            if stripped[0] == "[":
+                self._mode = "array"
+                self._buffer = stripped[1:]
+            else:
+                self._mode = "lines"
+        if self._mode == "lines":
+            self._feed_lines(documents, final)
+        else:
+            self._feed_array(documents, final)
+        if len(self._buffer) > self.max_document_size:
+            raise ValueError(f"No complete document within {self.max_document_size} bytes")
+        return documents
+
+    def close(self) -> List[Any]:
+        """Documents left at the end of the body; raises if the feed was cut short."""
+        return self.feed(b"", final=True)
+
+    def _feed_lines(self, documents: List[Any], final: bool) -> None:
+        buffer, start = self._buffer, 0
+        newline = buffer.find("\n", self._scanned)
+        while newline != -1:
+            self._parse_line(buffer[start:newline], documents)
+            start = newline + 1
+            newline = buffer.find("\n", start)
+        if final:
+            self._parse_line(buffer[start:], documents)
+            start = len(buffer)
+        self._buffer = buffer[start:]
+        self._scanned = len(self._buffer)
+
+    @staticmethod
+    def _parse_line(line: str, documents: List[Any]) -> None:
+        line = line.strip(_WHITESPACE)
+        if not line:
+            return
+        try:
+            documents.append(json.loads(line))
+        except ValueError as e:
+            documents.append(ValueError(f"Invalid JSON: {e}"))
+
+    def _item_end(self, buffer: str, start: int) -> Optional[int]:
+        """
+        Index just past the array item starting at ``start``, or None while
+        it is still arriving. Resumes from the previous call's position and
+        depth, so an item spread over many chunks is scanned once.
+        """
+        if buffer[start] not in '{["':
+            match = _SCALAR_END.search(buffer, start)
+            return match.start() if match else None
+        depth = self._depth
+        for match in _TOKEN.finditer(buffer, start + self._scanned):
+            token = match.group()
+            if token == '"':
+                # Rescanned from its opening quote once more has arrived
+                self._scanned, self._depth = match.start() - start, depth
+                return None
+            if token[0] == '"':
+                if depth == 0:
+                    return match.end()
+            elif token in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        self._scanned, self._depth = len(buffer) - start, depth
+        return None
+
+    def _feed_array(self, documents: List[Any], final: bool) -> None:
+        buffer, pos, end = self._buffer, 0, len(self._buffer)
+        while True:
+            while pos < end and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == end:
+                break
+            if self._closed:
+                raise ValueError("Unexpected data after the end of the JSON array")
+            if buffer[pos] == "]":
+                self._closed = True
+                pos += 1
+            elif self._expect_comma:
+                if buffer[pos] != ",":
+                    raise ValueError("Expected ',' between JSON array items")
+                self._expect_comma = False
+                pos += 1
+            else:
+                # An item that didn't decode when it was first seen is only
+                # decoded again once the scanner has found its end; a bare
+                # number might decode before all its digits are here
+                scan = self._partial or buffer[pos] not in '{["'
+                if scan and not final and self._item_end(buffer, pos) is None:
+                    break
+                try:
+                    document, pos = self._json.raw_decode(buffer, pos)
+                except ValueError as e:
+                    if final or self._partial:
+                        raise ValueError(f"Invalid JSON in array: {e}")
+                    # Most likely the rest of the item is still arriving
+                    self._partial = True
+                    continue
+                self._partial, self._scanned, self._depth = False, 0, 0
+                documents.append(document)
+                self._expect_comma = True
+        self._buffer = buffer[pos:]
+        if final and not self._closed:
+            raise ValueError("The JSON array is not closed")
@@ -0,0 +1,297 @@
+import hashlib
+from array import array
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from ..schemas.puzzle import Direction
+
+BLOCK = "."
+EMPTY = "?"
+
+class Slot(NamedTuple):
+    number: int
+    direction: Direction
+    cells: Tuple[int, ...]  # Row-major cell indices
+
+def _field(cell: Any, name: str, default=None):
+    # Cells arrive as dicts (parsers), pydantic schemas or ORM rows
+    if isinstance(cell, dict):
+        return cell.get(name, default)
+    return getattr(cell, name, default)
+
+def _direction(value) -> Direction:
+    if isinstance(value, Direction):
+        return value
+    return Direction(getattr(value, "value", value))
+
+class Grid:
+    """
+    Row-major crossword grid backed by a flat string.
+
+    ``solution`` holds one character per square: a letter, '.' for a black
+    square or '?' for a square without a known letter. Numbering and the
+    across/down slots are derived once and cached.
+    """
+
+    __slots__ = ("width", "height", "solution", "_numbers", "_slots", "_slot_map")
+
+    def __init__(self, width: int, height: int, solution: str):
+        if len(solution) != width * height:
+            raise ValueError("Grid solution does not match its dimensions")
+        self.width = width
+        self.height = height
+        self.solution = solution
+        self._numbers: Optional[array] = None
+        self._slots: Optional[List[Slot]] = None
+        self._slot_map: Optional[Dict[Tuple[int, Direction], Slot]] = None
+
+    @classmethod
+    def from_cells(cls, cells: Iterable[Any], width: int, height: Optional[int] = None) -> "Grid":
+        """Build a grid from per-cell dicts, ``PuzzleCell`` schemas or ORM rows."""
+        height = height or width
+        squares = [EMPTY] * (width * height)
+        for cell in cells:
+            row, col = _field(cell, "row"), _field(cell, "col")
+            if not (0 <= row < height and 0 <= col < width):
+                raise ValueError(f"Cell ({row}, {col}) is outside the grid")
+            if _field(cell, "is_black_square", False):
+                squares[row * width + col] = BLOCK
+            else:
+                squares[row * width + col] = (_field(cell, "solution") or EMPTY).upper()
+        return cls(width, height, "".join(squares))
+
+    def __len__(self) -> int:
+        return len(self.solution)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Grid) and (self.width, self.height, self.solution) == (other.width, other.height, other.solution)
+
+    def __hash__(self) -> int:
+        return hash((self.width, self.height, self.solution))
+
+    def __repr__(self) -> str:
+        return f"Grid({self.width}x{self.height})"
+
+    def index(self, row: int, col: int) -> int:
+        return row * self.width + col
+
+    def position(self, idx: int) -> Tuple[int, int]:
+        return divmod(idx, self.width)
+
+    def is_block(self, idx: int) -> bool:
+        return self.solution[idx] == BLOCK
+
+    def letter(self, row: int, col: int) -> Optional[str]:
+        ch = self.solution[row * self.width + col]
+        return None if ch in (BLOCK, EMPTY) else ch
+
+    def _build(self) -> None:
+        """Number the grid and collect every word of 2+ letters."""
+        solution, width, height = self.solution, self.width, self.height
+        numbers = array("H", bytes(2 * len(solution)))
+        current_number = 1
+
+        for idx, ch in enumerate(solution):
+            if ch == BLOCK:
+                continue
+            row, col = divmod(idx, width)
+
+            # Starts an across word (2+ letters) or a down word (2+ letters)
+            starts_across = (col == 0 or solution[idx - 1] == BLOCK) and \
+                col + 1 < width and solution[idx + 1] != BLOCK
+            starts_down = (row == 0 or solution[idx - width] == BLOCK) and \
+                row + 1 < height and solution[idx + width] != BLOCK
+
+            if starts_across or starts_down:
+                numbers[idx] = current_number
+                current_number += 1
+
+        slots = []
+        for row in range(height):
+            col = 0
+            while col < width:
+                start = row * width + col
+                while col < width and solution[row * width + col] != BLOCK:
+                    col += 1
+                end = row * width + col
+                if end - start > 1:
+                    slots.append(Slot(numbers[start], Direction.ACROSS, tuple(range(start, end))))
+                col += 1
+
+        for col in range(width):
+            row = 0
+            while row < height:
+                start_row = row
+                while row < height and solution[row * width + col] != BLOCK:
+                    row += 1
+                if row - start_row > 1:
+                    cells = tuple(r * width + col for r in range(start_row, row))
+                    slots.append(Slot(numbers[cells[0]], Direction.DOWN, cells))
+                row += 1
+
+        self._numbers = numbers
+        self._slots = slots
+        self._slot_map = {(slot.number, slot.direction): slot for slot in slots}
+
+    @property
+    def numbers(self) -> array:
+        """Clue number per square, 0 where the square is unnumbered."""
+        if self._numbers is None:
+            self._build()
+        return self._numbers
+
+    @property
+    def slots(self) -> List[Slot]:
+        """Across slots in row order, then down slots in column order."""
+        if self._slots is None:
+            self._build()
+        return self._slots
+
+    def number_map(self) -> Dict[Tuple[int, int], int]:
+        return {divmod(idx, self.width): number for idx, number in enumerate(self.numbers) if number}
+
+    def slot(self, number: int, direction) -> Optional[Slot]:
+        if self._slot_map is None:
+            self._build()
+        return self._slot_map.get((number, _direction(direction)))
+
+    def slots_at(self, idx: int) -> List[Slot]:
+        """The across and/or down slots running through a square."""
+        return [slot for slot in self.slots if idx in slot.cells]
+
+    def slot_word(self, slot: Slot) -> str:
+        return "".join(self.solution[idx] for idx in slot.cells)
+
+    def word(self, number: int, direction) -> Optional[str]:
+        """The entry at (number, direction), or None if there is no such slot."""
+        slot = self.slot(number, direction)
+        return self.slot_word(slot) if slot else None
+
+    def words(self) -> List[Tuple[int, Direction, str]]:
+        """(number, direction, answer) for every slot, ordered by number with Across first."""
+        words = [(slot.number, slot.direction, self.slot_word(slot)) for slot in self.slots]
+        words.sort(key=lambda w: (w[0], w[1] == Direction.DOWN))
+        return words
+
+    def validate_clues(self, clues: Iterable[Any]) -> List[str]:
+        """Describe every clue that doesn't agree with the grid; empty when they all do."""
+        errors = []
+        for clue in clues:
+            number = _field(clue, "number")
+            direction = _direction(_field(clue, "direction"))
+            slot = self.slot(number, direction)
+            if slot is None:
+                errors.append(f"{number} {direction.value}: no such entry in the grid")
+                continue
+            word = self.slot_word(slot)
+            answer = "".join((_field(clue, "answer") or "").upper().split())
+            if EMPTY in word or not answer:
+                continue
+            if answer != word:
+                errors.append(f"{number} {direction.value}: answer {answer!r} does not match grid {word!r}")
+        return errors
+
+    def content_hash(self, clues: Iterable[Any]) -> str:
+        """
+        SHA-256 over the grid and clues, independent of title, author and clue
+        order, so the same puzzle re-imported from any source hashes the same.
+        """
+        entries = []
+        for clue in clues:
+            direction = _direction(_field(clue, "direction"))
+            text = " ".join((_field(clue, "text") or "").split())
+            answer = "".join((_field(clue, "answer") or "").upper().split())
+            entries.append(f"{_field(clue, 'number')}|{direction.value}|{answer}|{text}")
+        entries.sort()
+        digest = hashlib.sha256(f"{self.width}x{self.height}\n{self.solution}\n".encode("utf-8"))
+        digest.update("\n".join(entries).encode("utf-8"))
+        return digest.hexdigest()
+
+    def to_cells(self) -> List[Dict[str, Any]]:
+        """Per-square dicts in the shape of ``schemas.puzzle.PuzzleCell``."""
+        numbers = self.numbers
+        cells = []
+        for idx, ch in enumerate(self.solution):
+            row, col = divmod(idx, self.width)
+            is_black = ch == BLOCK
+            cells.append({
+                "row": row,
+                "col": col,
+                "solution": None if is_black or ch == EMPTY else ch,
+                "number": numbers[idx] or None,
+                "is_black_square": is_black
+            })
+        return cells
+
+def random_block_pattern(size: int, rng, min_word: int = 3, max_word: int = 11,
+                         block_ratio: float = 0.17, attempts: int = 200) -> str:
+    """
+    Random square block pattern with 180-degree symmetry.
+
+    Every entry is between ``min_word`` and ``max_word`` letters and the
+    white squares are connected. Returns the solution string with '?' for
+    every white square. ``rng`` is a ``random.Random``.
+    """
+    target = int(size * size * block_ratio)
+    for _ in range(attempts):
+        squares = [EMPTY] * (size * size)
+        placed = 0
+        positions = list(range(size * size))
+        rng.shuffle(positions)
+        done = False
+        for idx in positions:
+            if done:
+                break
+            mirror = size * size - 1 - idx
+            if squares[idx] == BLOCK:
+                continue
+            # Past the target density, only break up entries that are too long
+            if placed >= target and not _in_long_run(squares, size, idx, max_word):
+                continue
+            squares[idx] = squares[mirror] = BLOCK
+            if all(_runs_ok(squares, size, i, min_word) for i in (idx, mirror)):
+                placed += 1 if idx == mirror else 2
+                done = placed >= target and _longest_run(squares, size) <= max_word
+            else:
+                squares[idx] = squares[mirror] = EMPTY
+        pattern = "".join(squares)
+        if _longest_run(squares, size) <= max_word and _connected(pattern, size):
+            return pattern
+    raise ValueError(f"Could not generate a {size}x{size} block pattern")
+
+def _runs(line) -> List[int]:
+    return [len(run) for run in "".join(line).split(BLOCK) if run]
+
+def _runs_ok(squares, size, idx, min_word) -> bool:
+    row, col = divmod(idx, size)
+    lines = (squares[row * size:(row + 1) * size], squares[col::size])
+    return all(length >= min_word for line in lines for length in _runs(line))
+
+def _in_long_run(squares, size, idx, max_word) -> bool:
+    row, col = divmod(idx, size)
+    for line, pos in ((squares[row * size:(row + 1) * size], col), (squares[col::size], row)):
+        start = pos
+        while start > 0 and line[start - 1] != BLOCK:
+            start -= 1
+        end = pos
+        while end < size and line[end] != BLOCK:
+            end += 1
+        if end - start > max_word:
+            return True
+    return False
+
+def _longest_run(squares, size) -> int:
+    lines = [squares[r * size:(r + 1) * size] for r in range(size)] + [squares[c::size] for c in range(size)]
+    return max((length for line in lines for length in _runs(line)), default=0)
+
+def _connected(pattern: str, size: int) -> bool:
+    whites = [i for i, ch in enumerate(pattern) if ch != BLOCK]
+    if not whites:
+        return False
+    seen, stack = {whites[0]}, [whites[0]]
+    while stack:
+        row, col = divmod(stack.pop(), size)
+        for r, c in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1)):
+            idx = r * size + c
+            if 0 <= r < size and 0 <= c < size and pattern[idx] != BLOCK and idx not in seen:
+                seen.add(idx)
+                stack.append(idx)
+    return len(seen) == len(whites)
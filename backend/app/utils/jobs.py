@@ -0,0 +1,386 @@
+import json
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from ..config import settings
+
+try:
+    import redis
+except ImportError:  # redis is optional; jobs then run in-process only
+    redis = None
+
+logger = logging.getLogger("app.jobs")
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = {SUCCEEDED, FAILED, CANCELLED}
+
+class JobCancelled(Exception):
+    """Raised inside a handler once cancellation has been requested."""
+
+class QueueFull(Exception):
+    pass
+
+# Job kind -> handler(payload, ctx), filled in by @job_handler
+_handlers: Dict[str, Callable] = {}
+
+def job_handler(kind: str):
+    def decorator(handler):
+        _handlers[kind] = handler
+        return handler
+    return decorator
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+class JobContext:
+    """Handed to job handlers for progress reports and cancellation checks."""
+
+    def __init__(self, queue: "JobQueue", job: Dict[str, Any]):
+        self.queue = queue
+        self.job = job
+
+    @property
+    def id(self) -> str:
+        return self.job["id"]
+
+    def check_cancelled(self) -> None:
+        if self.queue.store.cancel_requested(self.id):
+            raise JobCancelled()
+
+    def progress(self, fraction: float, message: Optional[str] = None) -> None:
+        """Record progress (0..1) and bail out if the job was cancelled meanwhile."""
+        fields = {"progress": round(min(max(fraction, 0.0), 1.0), 3)}
+        if message is not None:
+            fields["message"] = message
+        self.queue.store.update(self.id, **fields)
+        self.check_cancelled()
+
+    def checkpoint(self, result: Any) -> None:
+        """Save a partial result; a retried attempt sees it as ``ctx.job["result"]``."""
+        self.job["result"] = result
+        self.queue.store.update(self.id, result=result)
+
+class MemoryJobStore:
+    """Job records held in this process; finished jobs beyond ``history`` are dropped."""
+
+    remote = False
+
+    def __init__(self, history: int = 1000):
+        self.history = history
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._payloads: Dict[str, Any] = {}
+        self._cancel = set()
+        self._lock = threading.Lock()
+
+    def create(self, job: Dict[str, Any], payload: Any) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+            self._payloads[job["id"]] = payload
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def payload(self, job_id: str) -> Any:
+        return self._payloads.get(job_id)
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Move a queued job to running; None if it was cancelled or taken."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                return None
+            job.update(status=RUNNING, started_at=_now(), attempts=job["attempts"] + 1)
+            return dict(job)
+
+    def request_cancel(self, job_id: str) -> None:
+        with self._lock:
+            self._cancel.add(job_id)
+
+    def cancel_requested(self, job_id: str) -> bool:
+        return job_id in self._cancel
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] not in FINISHED)
+
+    def finish(self, job_id: str) -> None:
+        with self._lock:
+            # Failed and cancelled jobs keep their payload so they can be retried
+            if self._jobs.get(job_id, {}).get("status") == SUCCEEDED:
+                self._payloads.pop(job_id, None)
+            finished = [key for key, job in self._jobs.items() if job["status"] in FINISHED]
+            for key in finished[:max(0, len(finished) - self.history)]:
+                del self._jobs[key]
+                self._payloads.pop(key, None)
+                self._cancel.discard(key)
+
+    def reopen(self, job_id: str) -> None:
+        with self._lock:
+            self._cancel.discard(job_id)
+
+class RedisJobStore:
+    """
+    Job records, payloads and the work queue in Redis, so any instance's
+    workers can pick up a job and any instance can report on it.
+    """
+
+    remote = True
+
+    def __init__(self, client, prefix: str = "crossword:jobs", ttl: int = 3600):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+
+    def _key(self, job_id: str, part: str = "") -> str:
+        return f"{self.prefix}:{job_id}{part}"
+
+    def create(self, job: Dict[str, Any], payload: Any) -> None:
+        pipe = self.client.pipeline()
+        pipe.hset(self._key(job["id"]), mapping={k: json.dumps(v) for k, v in job.items()})
+        pipe.set(self._key(job["id"], ":payload"), json.dumps(payload))
+        pipe.execute()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self.client.hgetall(self._key(job_id))
+        if not raw:
+            return None
+        return {k.decode(): json.loads(v) for k, v in raw.items()}
+
+    def payload(self, job_id: str) -> Any:
+        raw = self.client.get(self._key(job_id, ":payload"))
+        return json.loads(raw) if raw is not None else None
+
+    def update(self, job_id: str, **fields) -> None:
+        self.client.hset(self._key(job_id), mapping={k: json.dumps(v) for k, v in fields.items()})
+
+    def claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.get(job_id)
+        if job is None or job["status"] != QUEUED or self.cancel_requested(job_id):
+            return None
+        job.update(status=RUNNING, started_at=_now(), attempts=job["attempts"] + 1)
+        self.update(job_id, status=RUNNING, started_at=job["started_at"], attempts=job["attempts"])
+        return job
+
+    def request_cancel(self, job_id: str) -> None:
+        self.client.set(self._key(job_id, ":cancel"), 1, ex=self.ttl)
+
+    def cancel_requested(self, job_id: str) -> bool:
+        return bool(self.client.exists(self._key(job_id, ":cancel")))
+
+    def pending(self) -> int:
+        return self.client.llen(f"{self.prefix}:queue")
+
+    def enqueue(self, job_id: str) -> None:
+        self.client.rpush(f"{self.prefix}:queue", job_id)
+
+    def pop(self, timeout: int = 1) -> Optional[str]:
+        item = self.client.blpop(f"{self.prefix}:queue", timeout=timeout)
+        return item[1].decode() if item else None
+
+    def finish(self, job_id: str) -> None:
+        # Keep the payload until expiry so a failed job can be retried
+        pipe = self.client.pipeline()
+        for part in ("", ":payload", ":cancel"):
+            pipe.expire(self._key(job_id, part), self.ttl)
+        pipe.execute()
+
+    def reopen(self, job_id: str) -> None:
+        pipe = self.client.pipeline()
+        pipe.persist(self._key(job_id))
+        pipe.persist(self._key(job_id, ":payload"))
+        pipe.delete(self._key(job_id, ":cancel"))
+        pipe.execute()
+
+class JobQueue:
+    """
+    Bounded background job runner.
+
+    Handlers are registered per job kind with ``@job_handler`` and called as
+    ``handler(payload, ctx)`` with a JSON-serializable payload; their return
+    value becomes the job's result. Failures are retried with exponential backoff up to
+    ``max_attempts`` times, except ``ValueError`` which marks bad input and
+    fails the job straight away.
+    """
+
+    def __init__(self, store, workers: int = 2, max_pending: int = 100,
+                 max_attempts: int = 3, retry_delay: float = 2.0):
+        self.store = store
+        self.workers = workers
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.handlers = _handlers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._threads = []
+        self._stopping = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is not None or self._threads:
+                return
+            self._stopping.clear()
+            if self.store.remote:
+                for n in range(self.workers):
+                    thread = threading.Thread(target=self._consume, name=f"job-worker-{n}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+            else:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="job-worker")
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._stopping.set()
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=True)
+                self._executor = None
+            threads, self._threads = self._threads, []
+        if wait:
+            for thread in threads:
+                thread.join(timeout=5)
+
+    def submit(self, kind: str, payload: Any, user_id: Optional[int] = None,
+               max_attempts: Optional[int] = None) -> Dict[str, Any]:
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        if self.store.pending() >= self.max_pending:
+            raise QueueFull("Too many jobs are waiting; try again later")
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "user_id": user_id,
+            "status": QUEUED,
+            "progress": 0.0,
+            "message": None,
+            "result": None,
+            "error": None,
+            "attempts": 0,
+            "max_attempts": max_attempts or self.max_attempts,
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        self.store.create(job, payload)
+        self._dispatch(job["id"])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a job; queued jobs stop at once, running ones at their next checkpoint."""
+        job = self.store.get(job_id)
+        if job is None or job["status"] in FINISHED:
+            return job
+        self.store.request_cancel(job_id)
+        if job["status"] == QUEUED:
+            self.store.update(job_id, status=CANCELLED, finished_at=_now())
+            self.store.finish(job_id)
+        return self.store.get(job_id)
+
+    def retry(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Requeue a failed or cancelled job with a fresh attempt budget, keeping any checkpoint."""
+        job = self.store.get(job_id)
+        if job is None or job["status"] not in (FAILED, CANCELLED) or self.store.payload(job_id) is None:
+            return None
+        if self.store.pending() >= self.max_pending:
+            raise QueueFull("Too many jobs are waiting; try again later")
+        self.store.reopen(job_id)
+        self.store.update(job_id, status=QUEUED, progress=0.0, message=None, error=None,
+                          attempts=0, started_at=None, finished_at=None)
+        self._dispatch(job_id)
+        return self.store.get(job_id)
+
+    def _dispatch(self, job_id: str) -> None:
+        if self.store.remote:
+            self.store.enqueue(job_id)
+            return
+        self.start()
+        self._executor.submit(self._run, job_id)
+
+    def _consume(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                job_id = self.store.pop(timeout=1)
+            except Exception:
+                logger.exception("Job queue unavailable")
+                self._stopping.wait(self.retry_delay)
+                continue
+            if job_id:
+                self._run(job_id)
+
+    def _run(self, job_id: str) -> None:
+        job = self.store.claim(job_id)
+        if job is None:
+            return
+        ctx = JobContext(self, job)
+        try:
+            ctx.check_cancelled()
+            result = self.handlers[job["kind"]](self.store.payload(job_id), ctx)
+        except JobCancelled:
+            self._finish(job_id, CANCELLED)
+        except ValueError as e:
+            self._finish(job_id, FAILED, error=str(e))
+        except Exception as e:
+            logger.exception("Job %s (%s) failed on attempt %d", job_id, job["kind"], job["attempts"])
+            if job["attempts"] < job["max_attempts"] and not self._stopping.is_set():
+                delay = self.retry_delay * 2 ** (job["attempts"] - 1)
+                self.store.update(job_id, status=QUEUED, error=str(e),
+                                  message=f"Retrying in {delay:.0f}s")
+                # Wait off the worker pool so a failing job doesn't hold a worker
+                timer = threading.Timer(delay, self._dispatch, (job_id,))
+                timer.daemon = True
+                timer.start()
+            else:
+                self._finish(job_id, FAILED, error=str(e))
+        else:
+            self._finish(job_id, SUCCEEDED, result=result, progress=1.0)
+
+    def _finish(self, job_id: str, status: str, **fields) -> None:
+        self.store.update(job_id, status=status, finished_at=_now(), **fields)
+        self.store.finish(job_id)
+
+def _create_store():
+    if settings.REDIS_URL and redis is not None:
+        try:
+            client = redis.Redis.from_url(settings.REDIS_URL)
+            client.ping()
+            return RedisJobStore(client, ttl=settings.JOB_RESULT_TTL)
+        except Exception:
+            logger.warning("Redis unavailable at REDIS_URL; running jobs in-process")
+    elif settings.REDIS_URL:
+        logger.warning("REDIS_URL is set but the redis package is not installed; running jobs in-process")
+    return MemoryJobStore()
+
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                _job_queue = JobQueue(
+                    _create_store(),
+                    workers=settings.JOB_WORKERS,
+                    max_pending=settings.JOB_MAX_PENDING,
+                    max_attempts=settings.JOB_MAX_ATTEMPTS,
+                    retry_delay=settings.JOB_RETRY_DELAY
+                )
+    return _job_queue
@@ -1,33 +1,32 @@
 import json
 from typing import Dict, List, Any
 from ..schemas.puzzle import Direction
+from .grid import Grid, BLOCK, EMPTY
 
 def parse_nyt_format(json_content: str) -> Dict[str, Any]:
     """Parse NYT JSON format and return puzzle data."""
-    data = json.loads(json_content)
-    
+    return parse_nyt_data(json.loads(json_content))
+
+def parse_nyt_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Puzzle data from an already decoded NYT JSON document."""
+    if not isinstance(data, dict):
+        raise ValueError("A puzzle must be a JSON object")
     grid_size = data.get("size", {}).get("rows", 15)
-    cells = []
+    if not isinstance(grid_size, int) or grid_size < 1:
+        raise ValueError(f"Invalid grid size: {grid_size!r}")
     clues = []
     
-    # Parse grid
-    grid = data.get("grid", [])
-    gridnums = data.get("gridnums", [])
-    for idx, cell_value in enumerate(grid):
-        row = idx // grid_size
-        col = idx % grid_size
-        
-        # Handle both "." and None as black squares
-        is_black = cell_value == "." or cell_value is None
-        grid_num = gridnums[idx] if idx < len(gridnums) and gridnums[idx] > 0 else None
-        
-        cells.append({
-            "row": row,
-            "col": col,
-            "solution": cell_value if not is_black else None,
-            "number": grid_num,
-            "is_black_square": is_black
-        })
+    # Parse grid - handle both "." and None as black squares
+    squares = [BLOCK if value == "." or value is None else (value or EMPTY)
+               for value in data.get("grid", [])[:grid_size * grid_size]]
+    for idx, square in enumerate(squares):
+        # A grid square holds one letter; rebus entries can't be stored
+        if len(square) != 1:
+            row, col = divmod(idx, grid_size)
+            raise ValueError(f"Rebus squares are not supported (row {row + 1}, column {col + 1}: {square!r})")
+    squares.extend(EMPTY * (grid_size * grid_size - len(squares)))
+    grid = Grid(grid_size, grid_size, "".join(squares))
+    cells = grid.to_cells()
     
     # Parse clues - handle both formats
     clues_data = data.get("clues", {})
@@ -78,21 +77,10 @@ def parse_nyt_format(json_content: str) -> Dict[str, Any]:
 
 def export_to_nyt(puzzle_data: Dict[str, Any]) -> str:
     """Export puzzle data to NYT JSON format."""
-    grid = []
-    gridnums = []
-    
     # Build grid and gridnums arrays
-    for row in range(puzzle_data["grid_size"]):
-        for col in range(puzzle_data["grid_size"]):
-            cell = next((c for c in puzzle_data["cells"] 
-                        if c["row"] == row and c["col"] == col), None)
-            if cell:
-                if cell["is_black_square"]:
-                    grid.append(".")
-                    gridnums.append(0)
-                else:
-                    grid.append(cell["solution"] or "")
-                    gridnums.append(cell["number"] or 0)
+    puzzle_grid = Grid.from_cells(puzzle_data["cells"], puzzle_data["grid_size"])
+    grid = ["" if ch == EMPTY else ch for ch in puzzle_grid.solution]
+    gridnums = list(puzzle_grid.numbers)
     
     # Organize clues
     across_clues = []
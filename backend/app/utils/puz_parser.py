@@ -1,6 +1,6 @@
 import struct
 from typing import Dict, List, Any
-from ..schemas.puzzle import Direction
+from .grid import Grid
 
 def decode_puz_string(raw_bytes: bytes) -> str:
     """
@@ -104,107 +104,15 @@ def parse_puz_file(file_content: bytes) -> Dict[str, Any]:
     # Notes/description might be after clues
     clue_strings = strings[3:3 + num_clues] if len(strings) > 3 else []
     
-    # Build grid and find numbered cells
-    cells = []
-    clues = []
-    cell_numbers = {}
-    current_number = 1
-    
-    # First pass: identify numbered cells
-    for row in range(height):
-        for col in range(width):
-            idx = row * width + col
-            cell_char = solution[idx]
-            
-            if cell_char == '.':
-                # Black square
-                cells.append({
-                    "row": row,
-                    "col": col,
-                    "solution": None,
-                    "number": None,
-                    "is_black_square": True
-                })
-            else:
-                # White square - check if it needs a number
-                needs_number = False
-                
-                # Check if it starts an across word (2+ letters)
-                if (col == 0 or solution[(row * width) + col - 1] == '.') and \
-                   col + 1 < width and solution[(row * width) + col + 1] != '.':
-                    needs_number = True
-                
-                # Check if it starts a down word (2+ letters)
-                if (row == 0 or solution[((row - 1) * width) + col] == '.') and \
-                   row + 1 < height and solution[((row + 1) * width) + col] != '.':
-                    needs_number = True
-                
-                cell_number = current_number if needs_number else None
-                if needs_number:
-                    cell_numbers[(row, col)] = current_number
-                    current_number += 1
-                
-                cells.append({
-                    "row": row,
-                    "col": col,
-                    "solution": cell_char,
-                    "number": cell_number,
-                    "is_black_square": False
-                })
-    
-    # Build clues by finding words and matching with clue strings
-    # .puz format stores clues in a specific order: all across clues first (by number), then all down clues (by number)
-    
-    # First, find all words and their positions
-    word_info = []  # List of (number, direction, answer)
-    
-    # Find across words
-    for row in range(height):
-        col = 0
-        while col < width:
-            if solution[row * width + col] != '.':
-                # Found start of potential word
-                word_start_col = col
-                word = ""
-                while col < width and solution[row * width + col] != '.':
-                    word += solution[row * width + col]
-                    col += 1
-                
-                # Only create clue if word is more than 1 letter
-                if len(word) > 1:
-                    cell_number = cell_numbers.get((row, word_start_col))
-                    if cell_number:
-                        word_info.append((cell_number, Direction.ACROSS, word))
-            else:
-                col += 1
-    
-    # Find down words
-    for col in range(width):
-        row = 0
-        while row < height:
-            if solution[row * width + col] != '.':
-                # Found start of potential word
-                word_start_row = row
-                word = ""
-                while row < height and solution[row * width + col] != '.':
-                    word += solution[row * width + col]
-                    row += 1
-                
-                # Only create clue if word is more than 1 letter
-                if len(word) > 1:
-                    cell_number = cell_numbers.get((word_start_row, col))
-                    if cell_number:
-                        word_info.append((cell_number, Direction.DOWN, word))
-            else:
-                row += 1
+    # Build grid, numbering and words from the solution string
+    grid = Grid(width, height, solution[:grid_size])
+    cells = grid.to_cells()
     
     # .puz format orders clues numerically, with Across before Down when numbers are the same
     # This is the key insight from the .puz format specification
     
-    # Create a combined list and sort by number, then by direction (Across before Down)
-    all_words = [(num, dir, ans) for num, dir, ans in word_info]
-    # Sort by number first, then by direction (ACROSS comes before DOWN when numbers match)
-    all_words.sort(key=lambda x: (x[0], x[1] == Direction.DOWN))
+    # Grid.words() is sorted by number first, then by direction (ACROSS comes before DOWN when numbers match)
+    all_words = grid.words()
     
     # Build clues by matching with clue strings in the correct .puz order
     clues = []
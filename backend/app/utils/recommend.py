@@ -0,0 +1,127 @@
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, exists, func
+
+from ..config import settings
+
+# "Next puzzle": a few candidate ids per (user, size, difficulty) are drawn
+# from the catalog and cached, and each request picks one of them at random
+# after re-checking it with a single indexed lookup. Drawing starts at a
+# random id and walks the (grid_size, difficulty, id) index, so nothing ever
+# sorts the catalog by RANDOM().
+
+class _CandidateCache:
+    """Per-user candidate ids by filter, LRU over users, each entry with a TTL."""
+
+    def __init__(self, max_users: int = 10000):
+        self.max_users = max_users
+        self._users: "OrderedDict[int, Dict[Tuple, Tuple[float, List[int]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, key: Tuple) -> Optional[List[int]]:
+        with self._lock:
+            entries = self._users.get(user_id)
+            if entries is None or key not in entries:
+                return None
+            expires, ids = entries[key]
+            if expires < time.monotonic():
+                del entries[key]
+                return None
+            self._users.move_to_end(user_id)
+            return ids
+
+    def put(self, user_id: int, key: Tuple, ids: List[int], ttl: float) -> None:
+        with self._lock:
+            self._users.setdefault(user_id, {})[key] = (time.monotonic() + ttl, ids)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def discard(self, user_id: int, key: Tuple, puzzle_id: int) -> None:
+        with self._lock:
+            entry = self._users.get(user_id, {}).get(key)
+            if entry is not None and puzzle_id in entry[1]:
+                entry[1].remove(puzzle_id)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def forget_empty(self) -> None:
+        """Drop every "nothing matched" entry, e.g. once new puzzles are stored."""
+        with self._lock:
+            for entries in self._users.values():
+                for key in [key for key, (_, ids) in entries.items() if not ids]:
+                    del entries[key]
+
+candidate_cache = _CandidateCache()
+
+def _unsolved(user_id: int):
+    """NOT EXISTS anti-join: the user has no completed progress on the puzzle."""
+    from ..models.puzzle import Puzzle
+    from ..models.user_progress import UserProgress
+
+    return ~exists().where(and_(
+        UserProgress.user_id == user_id,
+        UserProgress.puzzle_id == Puzzle.id,
+        UserProgress.is_completed.is_(True)
+    ))
+
+def _filtered(query, size: Optional[int], difficulty: Optional[str]):
+    from ..models.puzzle import Puzzle
+
+    if size is not None:
+        query = query.filter(Puzzle.grid_size == size)
+    if difficulty is not None:
+        query = query.filter(Puzzle.difficulty == difficulty)
+    return query
+
+def draw_candidates(db, user_id: int, size: Optional[int], difficulty: Optional[str], count: int) -> List[int]:
+    """Up to ``count`` unsolved puzzle ids, read in id order from a random starting id."""
+    from ..models.puzzle import Puzzle
+
+    low, high = db.query(func.min(Puzzle.id), func.max(Puzzle.id)).one()
+    if low is None:
+        return []
+    pivot = random.randint(low, high)
+    base = _filtered(db.query(Puzzle.id), size, difficulty).filter(_unsolved(user_id))
+    ids = [row[0] for row in base.filter(Puzzle.id >= pivot).order_by(Puzzle.id).limit(count)]
+    if len(ids) < count:
+        # Wrap around to the start of the catalog
+        ids += [row[0] for row in base.filter(Puzzle.id < pivot).order_by(Puzzle.id).limit(count - len(ids))]
+    return ids
+
+def next_puzzle(db, user_id: int, size: Optional[int] = None, difficulty: Optional[str] = None,
+                exclude: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """A random unsolved puzzle matching the filters, or None when there is none."""
+    from ..models.puzzle import Puzzle
+
+    key = (size, difficulty)
+    cached = candidate_cache.get(user_id, key)
+    if cached == []:
+        return None  # Nothing matched when last drawn
+    # Cached candidates first; if none of them is still valid, draw afresh once
+    for ids in (cached, None):
+        if ids is None:
+            ids = draw_candidates(db, user_id, size, difficulty, settings.NEXT_PUZZLE_CANDIDATES)
+            # An empty draw saves rescanning the catalog, but puzzles stored
+            # through other workers must show up soon
+            ttl = settings.NEXT_PUZZLE_CACHE_SECONDS if ids else settings.NEXT_PUZZLE_EMPTY_CACHE_SECONDS
+            candidate_cache.put(user_id, key, ids, ttl)
+        choices = [puzzle_id for puzzle_id in ids if puzzle_id != exclude]
+        random.shuffle(choices)
+        for puzzle_id in choices:
+            # Cached ids may have been solved (on another worker) or deleted since
+            row = db.query(Puzzle.id, Puzzle.title, Puzzle.grid_size, Puzzle.difficulty).filter(
+                Puzzle.id == puzzle_id, _unsolved(user_id)
+            ).first()
+            if row is not None:
+                return {"id": row.id, "title": row.title, "grid_size": row.grid_size, "difficulty": row.difficulty}
+            candidate_cache.discard(user_id, key, puzzle_id)
+        if cached is None:
+            break  # Just drawn: nothing better to find
+    return None
@@ -0,0 +1,93 @@
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+
+from starlette.responses import Response
+
+from .progress_archive import stored_state
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
+def _default(obj: Any):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    value = getattr(obj, "value", None)  # Enums
+    if value is not None:
+        return value
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def dumps(data: Any) -> bytes:
+    """Encode trusted data straight to JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+class FastJSONResponse(Response):
+    """
+    JSON response for data that came from our own database.
+
+    Returning it from an endpoint skips FastAPI's response_model validation;
+    the response_model is still used for the OpenAPI docs.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+def cell_to_dict(cell: Any) -> Dict[str, Any]:
+    return {
+        "row": cell.row,
+        "col": cell.col,
+        "solution": cell.solution,
+        "number": cell.number,
+        "is_black_square": bool(cell.is_black_square)
+    }
+
+def clue_to_dict(clue: Any) -> Dict[str, Any]:
+    return {
+        "number": clue.number,
+        "direction": getattr(clue.direction, "value", clue.direction),
+        "text": clue.text,
+        "answer": clue.answer
+    }
+
+def puzzle_to_dict(puzzle: Any) -> Dict[str, Any]:
+    """``schemas.puzzle.Puzzle``-shaped dict from an ORM row with cells and clues loaded."""
+    return {
+        "id": puzzle.id,
+        "title": puzzle.title,
+        "author_id": puzzle.author_id,
+        "grid_size": puzzle.grid_size,
+        "difficulty": puzzle.difficulty,
+        "description": puzzle.description,
+        "created_at": _isoformat(puzzle.created_at),
+        "updated_at": _isoformat(puzzle.updated_at),
+        "cells": [cell_to_dict(cell) for cell in puzzle.cells],
+        "clues": [clue_to_dict(clue) for clue in puzzle.clues]
+    }
+
+def puzzles_to_list(puzzles: List[Any]) -> List[Dict[str, Any]]:
+    return [puzzle_to_dict(puzzle) for puzzle in puzzles]
+
+def progress_to_dict(progress: Any) -> Dict[str, Any]:
+    """``schemas.progress.Progress``-shaped dict from a UserProgress row."""
+    return {
+        "id": progress.id,
+        "user_id": progress.user_id,
+        "puzzle_id": progress.puzzle_id,
+        "current_state": stored_state(progress),
+        "completion_percentage": progress.completion_percentage,
+        "completion_time": progress.completion_time,
+        "score": progress.score,
+        "is_completed": bool(progress.is_completed),
+        "started_at": _isoformat(progress.started_at),
+        "completed_at": _isoformat(progress.completed_at),
+        "last_played": _isoformat(progress.last_played)
+    }
@@ -0,0 +1,83 @@
+import json
+import math
+from typing import Dict, Optional
+
+class QuantileSketch:
+    """
+    Streaming quantile sketch over positive values (DDSketch-style).
+
+    Values fall into logarithmic buckets, so every quantile is within
+    ``relative_accuracy`` of the true value whatever the distribution, in
+    space that grows with the log of the value range rather than the count.
+    Sketches merge by adding bucket counts, and serialize to a small JSON text.
+    """
+
+    __slots__ = ("relative_accuracy", "max_buckets", "buckets", "count", "zeros", "_log_gamma")
+
+    def __init__(self, relative_accuracy: float = 0.02, max_buckets: int = 512):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.zeros = 0  # values <= 0 can't be bucketed logarithmically
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(gamma)
+
+    def add(self, value: float, count: int = 1) -> None:
+        self.count += count
+        if value <= 0:
+            self.zeros += count
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def _collapse(self) -> None:
+        # Fold the lowest buckets together; only the smallest quantiles lose accuracy
+        keys = sorted(self.buckets)
+        excess = keys[:len(keys) - self.max_buckets + 1]
+        folded = sum(self.buckets.pop(key) for key in excess)
+        self.buckets[excess[-1]] = folded
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        self.count += other.count
+        self.zeros += other.zeros
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate value at quantile ``q`` (0..1), or None when empty."""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(k-1), gamma^k] in relative terms
+                return 2 * math.exp(key * self._log_gamma) / (1 + math.exp(self._log_gamma))
+        return 2 * math.exp(max(self.buckets) * self._log_gamma) / (1 + math.exp(self._log_gamma))
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "a": self.relative_accuracy,
+            "n": self.count,
+            "z": self.zeros,
+            "b": [[key, count] for key, count in sorted(self.buckets.items())]
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text: Optional[str]) -> "QuantileSketch":
+        if not text:
+            return cls()
+        data = json.loads(text)
+        sketch = cls(relative_accuracy=data["a"])
+        sketch.count = data["n"]
+        sketch.zeros = data["z"]
+        sketch.buckets = {key: count for key, count in data["b"]}
+        return sketch
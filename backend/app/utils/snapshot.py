@@ -0,0 +1,187 @@
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+
+from ..config import settings
+from .compact import compact_puzzle
+from .serialization import dumps, puzzle_to_dict
+
+logger = logging.getLogger("app.snapshot")
+
+# Snapshot file layout (little-endian):
+#
+#   header   magic, format version, puzzle count, build time (unix seconds)
+#   ids      count x uint32, ascending, so lookups bisect the mapped file
+#   entries  count x (version, full offset, full length, compact offset, compact length)
+#   blobs    pre-serialized JSON: the GET /api/puzzles/{id} body and the compact v2 body
+#
+# ``version`` is the puzzle's updated_at (or created_at) in microseconds, so
+# an edit made after the build is noticed and served from the database.
+MAGIC = b"XWSNAP\x00\x00"
+SNAPSHOT_FORMAT = 1
+_HEADER = struct.Struct("<8sIId")
+_ENTRY = struct.Struct("<qQIQI")
+_EPOCH = datetime(1970, 1, 1)
+
+def version_stamp(value: Optional[datetime]) -> int:
+    """Microseconds since the epoch (UTC) of a naive or aware timestamp; 0 for None."""
+    if value is None:
+        return 0
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+def build_snapshot(db, path: str, batch_size: int = 500) -> int:
+    """
+    Write every puzzle to a new snapshot at ``path`` and swap it in
+    atomically; readers holding the old file keep their mapping. Returns the
+    number of puzzles written.
+    """
+    from ..models.puzzle import Puzzle
+
+    ids = [puzzle_id for (puzzle_id,) in db.query(Puzzle.id).order_by(Puzzle.id)]
+    count = len(ids)
+    blobs_start = _HEADER.size + 4 * count + _ENTRY.size * count
+    entries = []
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.seek(blobs_start)
+        offset = blobs_start
+        for start in range(0, count, batch_size):
+            chunk = ids[start:start + batch_size]
+            puzzles = db.query(Puzzle).options(
+                selectinload(Puzzle.cells),
+                selectinload(Puzzle.clues)
+            ).filter(Puzzle.id.in_(chunk)).order_by(Puzzle.id).all()
+            found = {p.id: p for p in puzzles}
+            for puzzle_id in chunk:
+                puzzle = found.get(puzzle_id)
+                if puzzle is None:
+                    # Deleted mid-build: an empty entry makes readers fall back
+                    entries.append((0, 0, 0, 0, 0))
+                    continue
+                full = dumps({**puzzle_to_dict(puzzle), "user_progress": None})
+                compact = dumps(compact_puzzle(puzzle))
+                f.write(full)
+                f.write(compact)
+                entries.append((version_stamp(puzzle.updated_at or puzzle.created_at),
+                                offset, len(full), offset + len(full), len(compact)))
+                offset += len(full) + len(compact)
+            db.expunge_all()  # Keep memory flat over a large table
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, SNAPSHOT_FORMAT, count, time.time()))
+        f.write(struct.pack(f"<{count}I", *ids))
+        for entry in entries:
+            f.write(_ENTRY.pack(*entry))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+class Snapshot:
+    """
+    A memory-mapped snapshot file. Bodies are returned as memoryview slices
+    of the mapping, so serving one copies nothing in Python, and every
+    worker reads the same pages from the OS page cache.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.stat = os.fstat(f.fileno())
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if len(view) < _HEADER.size:
+            raise ValueError(f"{path} is not a puzzle snapshot (format {SNAPSHOT_FORMAT})")
+        magic, fmt, self.count, self.built_at = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or fmt != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a puzzle snapshot (format {SNAPSHOT_FORMAT})")
+        if len(view) < _HEADER.size + (4 + _ENTRY.size) * self.count:
+            raise ValueError(f"{path} is truncated")
+        self._view = view
+        self._ids = view[_HEADER.size:_HEADER.size + 4 * self.count].cast("I")
+        self._entries_start = _HEADER.size + 4 * self.count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def entry(self, puzzle_id: int):
+        """(version, full offset, full length, compact offset, compact length), or None."""
+        position = bisect_left(self._ids, puzzle_id)
+        if position == self.count or self._ids[position] != puzzle_id:
+            return None
+        entry = _ENTRY.unpack_from(self._view, self._entries_start + position * _ENTRY.size)
+        return entry if entry[2] else None
+
+    def get(self, puzzle_id: int, compact: bool = False, db=None) -> Optional[memoryview]:
+        """
+        The stored body for a puzzle, or None if it isn't in the snapshot.
+        With ``db``, one primary-key lookup confirms the puzzle still exists
+        and hasn't been edited since the build.
+        """
+        entry = self.entry(puzzle_id)
+        if entry is None:
+            return None
+        version, full_offset, full_length, compact_offset, compact_length = entry
+        if db is not None:
+            from ..models.puzzle import Puzzle
+
+            current = db.query(func.coalesce(Puzzle.updated_at, Puzzle.created_at)).filter(
+                Puzzle.id == puzzle_id
+            ).first()
+            if current is None or version_stamp(current[0]) != version:
+                return None
+        if compact:
+            return self._view[compact_offset:compact_offset + compact_length]
+        return self._view[full_offset:full_offset + full_length]
+
+class _SnapshotHolder:
+    """The current Snapshot for PUZZLE_SNAPSHOT_PATH, reopened when the file is replaced."""
+
+    def __init__(self, check_interval: float = 30.0):
+        self.check_interval = check_interval
+        self.snapshot: Optional[Snapshot] = None
+        self._path: Optional[str] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, path: Optional[str]) -> Optional[Snapshot]:
+        if not path:
+            return None
+        now = time.monotonic()
+        if path == self._path and now - self._checked < self.check_interval:
+            return self.snapshot
+        with self._lock:
+            if path == self._path and now - self._checked < self.check_interval:
+                return self.snapshot
+            self._checked = now
+            self._path = path
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self.snapshot = None
+                return None
+            current = self.snapshot
+            if current is None or (current.stat.st_ino, current.stat.st_mtime_ns) != (stat.st_ino, stat.st_mtime_ns):
+                # The old mapping is never closed: bodies still being sent hold views of it
+                try:
+                    self.snapshot = Snapshot(path)
+                    logger.info("Loaded puzzle snapshot %s (%d puzzles)", path, len(self.snapshot))
+                except (OSError, ValueError) as e:
+                    logger.warning("Ignoring puzzle snapshot %s: %s", path, e)
+                    self.snapshot = None
+            return self.snapshot
+
+_holder = _SnapshotHolder()
+
+def get_snapshot() -> Optional[Snapshot]:
+    _holder.check_interval = settings.SNAPSHOT_RELOAD_SECONDS
+    return _holder.get(settings.PUZZLE_SNAPSHOT_PATH)
@@ -0,0 +1,124 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import insert, text, update
+
+from ..database import insert_or_ignore
+from .sketch import QuantileSketch
+
+# Solve-time quantiles reported by the stats endpoint
+QUANTILES = {"p25": 0.25, "p50": 0.5, "p75": 0.75, "p90": 0.9, "p99": 0.99}
+
+def _insert_missing(db, puzzle_id: int) -> None:
+    """Create a zero stats row unless one exists, without racing a concurrent insert."""
+    from ..models.puzzle_stats import PuzzleStats
+
+    insert_or_ignore(db, PuzzleStats, {"puzzle_id": puzzle_id, "starts": 0, "completions": 0,
+                                       "score_total": 0, "solve_time_total": 0})
+
+def _locked_sketch(db, puzzle_id: int) -> Optional[str]:
+    from ..models.puzzle_stats import PuzzleStats
+
+    # Row lock so concurrent completions don't lose sketch updates (no-op on SQLite)
+    query = db.query(PuzzleStats.solve_time_sketch).filter(PuzzleStats.puzzle_id == puzzle_id).with_for_update()
+    row = query.first()
+    if row is None:
+        _insert_missing(db, puzzle_id)
+        row = query.first()
+    return row[0]
+
+def record_progress(db, puzzle_id: int, started: bool, completed: bool,
+                    score: Optional[int] = None, completion_time: Optional[int] = None) -> None:
+    """
+    Apply one progress save to the puzzle's stats in the caller's transaction.
+
+    ``started`` is true for a user's first save on the puzzle and
+    ``completed`` for the save that first marks it complete. Counters are
+    bumped in one UPDATE; only a timed completion, whose sketch is merged
+    here, reads and locks the row first.
+    """
+    from ..models.puzzle_stats import PuzzleStats
+
+    if not started and not completed:
+        return
+    values = {}
+    if started:
+        values["starts"] = PuzzleStats.starts + 1
+    if completed:
+        values["completions"] = PuzzleStats.completions + 1
+        values["score_total"] = PuzzleStats.score_total + (score or 0)
+        if completion_time:
+            sketch = QuantileSketch.from_json(_locked_sketch(db, puzzle_id))
+            sketch.add(completion_time)
+            values["solve_time_sketch"] = sketch.to_json()
+            values["solve_time_total"] = PuzzleStats.solve_time_total + completion_time
+    statement = update(PuzzleStats).where(PuzzleStats.puzzle_id == puzzle_id).values(**values)
+    if db.execute(statement.execution_options(synchronize_session=False)).rowcount == 0:
+        # Puzzles from before the stats table may have no row yet; two first
+        # saves can get here together, so insert-or-skip and then update
+        _insert_missing(db, puzzle_id)
+        db.execute(statement.execution_options(synchronize_session=False))
+
+def stats_summary(puzzle_id: int, stats) -> Dict[str, Any]:
+    """Response dict for a PuzzleStats row (or None for a puzzle nobody has opened)."""
+    starts = stats.starts if stats else 0
+    completions = stats.completions if stats else 0
+    sketch = QuantileSketch.from_json(stats.solve_time_sketch if stats else None)
+    quantiles = {name: sketch.quantile(q) for name, q in QUANTILES.items()}
+    return {
+        "puzzle_id": puzzle_id,
+        "starts": starts,
+        "completions": completions,
+        "completion_rate": completions / starts if starts else 0.0,
+        "average_score": stats.score_total / completions if completions else None,
+        "average_solve_time": stats.solve_time_total / sketch.count if sketch.count else None,
+        "solve_time": {name: round(value, 1) if value is not None else None for name, value in quantiles.items()},
+        "timed_completions": sketch.count
+    }
+
+def rebuild_stats(db, batch_size: int = 10000) -> int:
+    """
+    Recompute every puzzle's stats from user_progress in one streaming pass
+    and replace the table's contents, with a row for every puzzle, in one
+    transaction that holds off concurrent stats updates. Returns the number
+    of puzzles.
+    """
+    from ..models.puzzle import Puzzle
+    from ..models.puzzle_stats import PuzzleStats
+    from ..models.user_progress import UserProgress
+
+    # Saves that change stats wait until the rebuilt rows are committed and
+    # then apply on top; anything committed before is in the pass below.
+    # SQLite has no table locks, but the DELETE takes its database write lock
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE puzzle_stats IN EXCLUSIVE MODE"))
+    db.query(PuzzleStats).delete()
+
+    totals: Dict[int, list] = {}
+    rows = db.query(
+        UserProgress.puzzle_id, UserProgress.is_completed, UserProgress.score, UserProgress.completion_time
+    ).execution_options(yield_per=batch_size)
+    for puzzle_id, is_completed, score, completion_time in rows:
+        entry = totals.get(puzzle_id)
+        if entry is None:
+            entry = totals[puzzle_id] = [0, 0, 0, 0, QuantileSketch()]
+        entry[0] += 1
+        if is_completed:
+            entry[1] += 1
+            entry[2] += score or 0
+            if completion_time:
+                entry[3] += completion_time
+                entry[4].add(completion_time)
+
+    # Puzzles nobody has opened still get a zero row
+    for (puzzle_id,) in db.query(Puzzle.id).execution_options(yield_per=batch_size):
+        totals.setdefault(puzzle_id, [0, 0, 0, 0, QuantileSketch()])
+
+    values = [
+        {"puzzle_id": puzzle_id, "starts": starts, "completions": completions, "score_total": score_total,
+         "solve_time_total": time_total, "solve_time_sketch": sketch.to_json() if sketch.count else None}
+        for puzzle_id, (starts, completions, score_total, time_total, sketch) in totals.items()
+    ]
+    for start in range(0, len(values), batch_size):
+        db.execute(insert(PuzzleStats), values[start:start + batch_size])
+    db.commit()
+    return len(values)
@@ -0,0 +1,348 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, or_, select
+
+# Characters accepted as "any letter" in a pattern
+WILDCARDS = {"?", ".", "_"}
+
+# Snapshot file: MAGIC, the format, the payload's length and its SHA-256,
+# then the payload: a JSON manifest of the words and letters per length
+# (prefixed by its size) followed by the raw bitsets it lists. Nothing in
+# it is executed on load, and a file that fails the checksum is rejected.
+SNAPSHOT_MAGIC = b"XWWORDS\x00"
+SNAPSHOT_VERSION = 2
+_SNAPSHOT_HEADER = struct.Struct("<8sIQ32s")
+_MANIFEST_SIZE = struct.Struct("<Q")
+
+def normalize_word(word: str) -> str:
+    """Uppercase a word and drop spaces/punctuation so answers match word-list entries."""
+    if not word:
+        return ""
+    return "".join(ch for ch in word.upper() if ch.isalnum())
+
+def popcount(bits: int) -> int:
+    """Number of set bits (int.bit_count on Python 3.10+)."""
+    return bits.bit_count() if hasattr(bits, "bit_count") else bin(bits).count("1")
+
+def iter_bits(bits: int):
+    """Yield the positions of the set bits in an int, lowest first."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+class _LengthBucket:
+    """All words of one length plus a bitset per (position, letter).
+
+    Bit i of ``positions[p][ch]`` is set when ``words[i][p] == ch``, so a
+    pattern query is an AND of one bitset per fixed letter.
+    """
+
+    __slots__ = ("length", "words", "positions", "all_bits")
+
+    def __init__(self, length: int):
+        self.length = length
+        self.words: List[str] = []
+        self.positions: List[Dict[str, int]] = [{} for _ in range(length)]
+        self.all_bits = 0
+
+    def extend(self, words: List[str]) -> None:
+        # Build the new bits in bytearrays and fold them in with one big-int OR
+        # per (position, letter); OR-ing bit by bit would copy the int per word.
+        base = len(self.words)
+        total = base + len(words)
+        size = (total + 7) // 8
+        columns: List[Dict[str, bytearray]] = [{} for _ in range(self.length)]
+        for offset, word in enumerate(words, base):
+            byte, mask = offset >> 3, 1 << (offset & 7)
+            for pos, ch in enumerate(word):
+                buf = columns[pos].get(ch)
+                if buf is None:
+                    buf = columns[pos][ch] = bytearray(size)
+                buf[byte] |= mask
+        self.words.extend(words)
+        for pos, column in enumerate(columns):
+            existing = self.positions[pos]
+            for ch, buf in column.items():
+                existing[ch] = existing.get(ch, 0) | int.from_bytes(buf, "little")
+        # Only the new bits: discarded words stay cleared
+        self.all_bits |= ((1 << len(words)) - 1) << base
+
+    def match_bits(self, pattern: str) -> int:
+        bits = self.all_bits
+        for pos, ch in enumerate(pattern):
+            if ch in WILDCARDS:
+                continue
+            bits &= self.positions[pos].get(ch, 0)
+            if not bits:
+                break
+        return bits
+
+class WordIndex:
+    """In-memory pattern-match index over answers and word-list entries."""
+
+    def __init__(self):
+        self._buckets: Dict[int, _LengthBucket] = {}
+        # word -> its bit position within the bucket for its length
+        self._known: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._known)
+
+    def __contains__(self, word: str) -> bool:
+        return normalize_word(word) in self._known
+
+    def position(self, word: str) -> Optional[int]:
+        """Bit position of a word within its length bucket, if indexed."""
+        return self._known.get(normalize_word(word))
+
+    def add(self, word: str) -> bool:
+        """Add a single word, returning False if it was already indexed."""
+        return self.add_many([word]) == 1
+
+    def add_many(self, words: Iterable[str]) -> int:
+        """Add words incrementally and return how many were new."""
+        by_length: Dict[int, List[str]] = {}
+        with self._lock:
+            for word in words:
+                word = normalize_word(word)
+                if len(word) < 2 or word in self._known:
+                    continue
+                new_words = by_length.setdefault(len(word), [])
+                bucket = self._buckets.get(len(word))
+                self._known[word] = (len(bucket.words) if bucket else 0) + len(new_words)
+                new_words.append(word)
+            for length, new_words in by_length.items():
+                bucket = self._buckets.get(length)
+                if bucket is None:
+                    bucket = self._buckets[length] = _LengthBucket(length)
+                bucket.extend(new_words)
+        return sum(len(new_words) for new_words in by_length.values())
+
+    def discard_many(self, words: Iterable[str]) -> int:
+        """Stop matching words and return how many were indexed.
+
+        A discarded word keeps its bit position (it is only cleared from
+        ``all_bits``), so nothing is rebuilt; adding it back appends it anew.
+        """
+        removed = 0
+        with self._lock:
+            for word in words:
+                word = normalize_word(word)
+                position = self._known.pop(word, None)
+                if position is None:
+                    continue
+                self._buckets[len(word)].all_bits &= ~(1 << position)
+                removed += 1
+        return removed
+
+    def bucket(self, length: int) -> Optional[_LengthBucket]:
+        return self._buckets.get(length)
+
+    def lengths(self) -> List[int]:
+        return sorted(self._buckets)
+
+    def count(self, pattern: str) -> int:
+        """Count words matching a pattern without materializing them."""
+        pattern = pattern.upper()
+        bucket = self._buckets.get(len(pattern))
+        if bucket is None:
+            return 0
+        return popcount(bucket.match_bits(pattern))
+
+    def match(self, pattern: str, limit: Optional[int] = 100, offset: int = 0) -> List[str]:
+        """Return words matching ``pattern`` where ``?``, ``.`` or ``_`` match any letter."""
+        pattern = pattern.upper()
+        bucket = self._buckets.get(len(pattern))
+        if bucket is None:
+            return []
+        results = []
+        for i, idx in enumerate(iter_bits(bucket.match_bits(pattern))):
+            if i < offset:
+                continue
+            if limit is not None and len(results) >= limit:
+                break
+            results.append(bucket.words[idx])
+        return results
+
+    def save(self, path: str) -> None:
+        """Write a snapshot that can be reloaded without rebuilding the bitsets."""
+        manifest, bitsets = [], []
+        with self._lock:
+            for length, bucket in sorted(self._buckets.items()):
+                size = (len(bucket.words) + 7) // 8
+                letters = [sorted(column) for column in bucket.positions]
+                manifest.append({"length": length, "words": list(bucket.words), "letters": letters})
+                bitsets.append(bucket.all_bits.to_bytes(size, "little"))
+                for column, keys in zip(bucket.positions, letters):
+                    bitsets.extend(column[ch].to_bytes(size, "little") for ch in keys)
+        head = json.dumps(manifest, separators=(",", ":")).encode("utf-8")
+        payload = b"".join([_MANIFEST_SIZE.pack(len(head)), head] + bitsets)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(payload), hashlib.sha256(payload).digest()))
+            f.write(payload)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "WordIndex":
+        """Load a snapshot written by ``save``; raises ValueError if it isn't one or is damaged."""
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < _SNAPSHOT_HEADER.size:
+            raise ValueError(f"{path} is not a word index snapshot")
+        magic, fmt, size, digest = _SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or fmt != SNAPSHOT_VERSION:
+            raise ValueError(f"{path} is not a word index snapshot (format {SNAPSHOT_VERSION})")
+        payload = memoryview(data)[_SNAPSHOT_HEADER.size:]
+        if len(payload) != size or hashlib.sha256(payload).digest() != digest:
+            raise ValueError(f"{path} is truncated or corrupt")
+
+        (head_size,) = _MANIFEST_SIZE.unpack_from(payload)
+        offset = _MANIFEST_SIZE.size + head_size
+        manifest = json.loads(bytes(payload[_MANIFEST_SIZE.size:offset]))
+        index = cls()
+        for entry in manifest:
+            bucket = _LengthBucket(entry["length"])
+            bucket.words = entry["words"]
+            size = (len(bucket.words) + 7) // 8
+            live = bytes(payload[offset:offset + size])
+            bucket.all_bits = int.from_bytes(live, "little")
+            offset += size
+            for pos, keys in enumerate(entry["letters"]):
+                for ch in keys:
+                    bucket.positions[pos][ch] = int.from_bytes(payload[offset:offset + size], "little")
+                    offset += size
+            index._buckets[bucket.length] = bucket
+            index._known.update(
+                (word, i) for i, word in enumerate(bucket.words) if live[i >> 3] >> (i & 7) & 1
+            )
+        if offset != len(payload):
+            raise ValueError(f"{path} is truncated or corrupt")
+        return index
+
+def load_word_list(path: str) -> Iterable[str]:
+    """Read a word list with one entry per line.
+
+    Lines in the common ``WORD;SCORE`` scored-list format keep only the word.
+    """
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            yield line.split(";", 1)[0]
+
+# Shared index used by the API; populated at startup by build_word_index()
+_word_index = WordIndex()
+
+def build_word_index(db, word_list_path: Optional[str] = None, snapshot_path: Optional[str] = None) -> WordIndex:
+    """Populate the shared index from a snapshot or the word list, then every clue answer."""
+    global _word_index
+    from ..models.puzzle import Clue
+
+    index = None
+    if snapshot_path:
+        try:
+            index = WordIndex.load(snapshot_path)
+        except (OSError, ValueError):
+            index = None
+
+    # The snapshot holds the word list only; answers come from the database,
+    # so answers of deleted or edited clues don't outlive a restart
+    if index is None:
+        index = WordIndex()
+        if word_list_path:
+            index.add_many(load_word_list(word_list_path))
+        if snapshot_path:
+            try:
+                index.save(snapshot_path)
+            except OSError:
+                pass
+
+    started = datetime.now(timezone.utc)
+    last_clue_id = db.query(func.max(Clue.id)).scalar() or 0
+    clue_count = db.query(func.count(Clue.id)).scalar()
+    answers = db.query(Clue.answer).yield_per(5000)
+    _answer_words.clear()
+    _add_answers(index, (answer for (answer,) in answers))
+
+    _word_index = index
+    _sync.update(clue_id=last_clue_id, clues=clue_count, since=started, checked=time.monotonic())
+    return index
+
+def get_word_index() -> WordIndex:
+    return _word_index
+
+# Words indexed only because some clue has them as its answer (not in the
+# word list); these are dropped again once no clue uses them
+_answer_words: Set[str] = set()
+
+def _add_answers(index: WordIndex, answers: Iterable[str]) -> int:
+    fresh = set()
+    for answer in answers:
+        word = normalize_word(answer)
+        if len(word) >= 2 and word not in index._known:
+            fresh.add(word)
+    _answer_words.update(fresh)
+    return index.add_many(fresh)
+
+def add_answers(answers: Iterable[str]) -> int:
+    """Index answers this worker just stored; returns how many words were new."""
+    return _add_answers(_word_index, answers)
+
+def expire_word_index() -> None:
+    """Have the next lookup refresh, e.g. after this worker removed clues."""
+    _sync["checked"] = 0.0
+
+# How far the shared index has read the clues table. Each worker adds the
+# answers it stores itself, and picks up other workers' by refreshing
+_sync = {"clue_id": 0, "clues": 0, "since": datetime.now(timezone.utc), "checked": 0.0}
+_sync_lock = threading.Lock()
+
+def refresh_word_index(db, interval: float) -> int:
+    """
+    Catch up with clues stored (by any process) since the index was built or
+    last refreshed: new clue rows are added, and when puzzles were edited or
+    clues deleted since, answers no clue uses any more are dropped. Runs at
+    most once per ``interval`` seconds; returns how many words were new.
+    """
+    from ..models.puzzle import Clue, Puzzle
+
+    if time.monotonic() - _sync["checked"] < interval:
+        return 0
+    with _sync_lock:
+        if time.monotonic() - _sync["checked"] < interval:
+            return 0
+        started = datetime.now(timezone.utc)
+        clue_count = db.query(func.count(Clue.id)).scalar()
+        # Edits stamp updated_at before committing; a second of overlap covers that gap
+        edited = db.query(
+            select(Puzzle.id).where(Puzzle.updated_at >= _sync["since"] - timedelta(seconds=1)).exists()
+        ).scalar()
+        rows = db.query(Clue.id, Clue.answer).filter(Clue.id > _sync["clue_id"]).all()
+        added = _add_answers(_word_index, (answer for _, answer in rows))
+        clue_id = max((clue_id for clue_id, _ in rows), default=0)
+
+        # Fewer clues than counted plus the new ones means some were deleted
+        # (with their puzzle, or by an edit); reread the answers still in use
+        if edited or clue_count != _sync["clues"] + len(rows):
+            in_use = {normalize_word(answer) for (answer,) in db.query(Clue.answer).distinct()}
+            added += _add_answers(_word_index, in_use)
+            unused = _answer_words - in_use
+            _word_index.discard_many(unused)
+            _answer_words.difference_update(unused)
+
+        _sync.update(
+            clue_id=max(_sync["clue_id"], clue_id), clues=clue_count,
+            since=started, checked=time.monotonic()
+        )
+    return added
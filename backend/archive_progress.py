@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Move completed progress rows to cold storage.
+
+The current_state JSON of saves completed more than --days ago is compressed
+into user_progress.state_archive and the text column is cleared; the API
+decompresses it when such a save is read. Safe to run repeatedly (e.g. from
+cron): rows already archived are skipped.
+
+The space freed inside the table is reused by new rows right away; on
+PostgreSQL a VACUUM (or VACUUM FULL / pg_repack to shrink the file) follows.
+
+Usage:
+    python archive_progress.py [--days 30] [--batch-size 1000] [--dry-run]
+"""
+
+import argparse
+import sys
+import time
+sys.path.append('.')
+
+from app.config import settings
+from app.database import SessionLocal, engine, Base
+from app.utils.progress_archive import archive_completed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=float, default=settings.ARCHIVE_PROGRESS_AFTER_DAYS,
+                        help="archive saves completed at least this many days ago")
+    parser.add_argument("--batch-size", type=int, default=1000, help="rows compressed per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="report the savings without writing")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        totals = archive_completed(db, args.days, args.batch_size, args.dry_run)
+    finally:
+        db.close()
+    before, after = totals["bytes_before"], totals["bytes_after"]
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"{verb} {totals['rows']} completed saves in {time.perf_counter() - start:.1f}s: "
+          f"{before} -> {after} bytes of state, {before - after} reclaimed"
+          + (f" ({100 * (before - after) / before:.0f}%)" if before else ""))
+
+if __name__ == "__main__":
+    main()
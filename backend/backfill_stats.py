@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Rebuild the puzzle_stats table from user_progress.
+
+Stats are normally maintained as progress is saved; run this after deploying
+the stats table, after bulk loads that bypass the API, or to repair drift.
+
+Usage:
+    python backfill_stats.py [--batch-size 10000]
+"""
+
+import argparse
+import sys
+import time
+sys.path.append('.')
+
+from app.database import SessionLocal, engine, Base
+from app.utils.stats import rebuild_stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=10000, help="progress rows fetched per round trip")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        count = rebuild_stats(db, args.batch_size)
+    finally:
+        db.close()
+    print(f"Rebuilt stats for {count} puzzles in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the autofill engine on empty grids from 5x5 to 25x25.
+
+Usage:
+    python benchmarks/bench_autofill.py --word-list words.txt
+    python benchmarks/bench_autofill.py --word-list words.txt --sizes 15 21 --runs 5 --json results.json
+
+Without --word-list the index is built from the clue answers in the database.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.utils.autofill import autofill
+from app.utils.grid import random_block_pattern
+from app.utils.word_index import WordIndex, load_word_list
+
+def load_index(word_list):
+    if word_list:
+        index = WordIndex()
+        index.add_many(load_word_list(word_list))
+        return index
+    from app.database import SessionLocal
+    from app.utils.word_index import build_word_index
+    db = SessionLocal()
+    try:
+        return build_word_index(db)
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--word-list", help="word list, one entry per line")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 7, 9, 11, 13, 15, 17, 19, 21, 23, 25])
+    parser.add_argument("--runs", type=int, default=3, help="patterns per size")
+    parser.add_argument("--time-limit", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = load_index(args.word_list)
+    print(f"Indexed {len(index)} words in {time.perf_counter() - start:.2f}s")
+
+    rng = random.Random(args.seed)
+    results = []
+    print(f"{'size':>5} {'filled':>7} {'timeout':>8} {'median s':>9} {'max s':>7} {'nodes':>8}")
+    for size in args.sizes:
+        runs = []
+        for _ in range(args.runs):
+            pattern = random_block_pattern(size, rng)
+            runs.append(autofill(pattern, size, size, index, time_limit=args.time_limit))
+        elapsed = [r["elapsed"] for r in runs]
+        row = {
+            "size": size,
+            "runs": len(runs),
+            "filled": sum(r["status"] == "filled" for r in runs),
+            "timeout": sum(r["status"] == "timeout" for r in runs),
+            "unsatisfiable": sum(r["status"] == "unsatisfiable" for r in runs),
+            "median_seconds": statistics.median(elapsed),
+            "max_seconds": max(elapsed),
+            "median_nodes": statistics.median(r["nodes"] for r in runs),
+        }
+        results.append(row)
+        print(f"{size:>5} {row['filled']:>7} {row['timeout']:>8} {row['median_seconds']:>9.3f} "
+              f"{row['max_seconds']:>7.3f} {row['median_nodes']:>8.0f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"word_count": len(index), "time_limit": args.time_limit, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
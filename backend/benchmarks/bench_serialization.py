@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Compare the response_model serialization path with the FastJSONResponse path.
+
+Builds puzzles in a throwaway SQLite database, loads them the way
+get_puzzles does and times both encoders over the same ORM rows.
+
+Usage:
+    python benchmarks/bench_serialization.py --puzzles 50 --size 25
+"""
+
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+def timed(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--puzzles", type=int, default=50)
+    parser.add_argument("--size", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from sqlalchemy.orm import selectinload
+    from typing import List
+
+    from app.database import Base, SessionLocal, engine
+    from app.models import User, Puzzle, PuzzleCell, Clue
+    from app.schemas import puzzle as puzzle_schema
+    from app.utils.grid import Grid
+    from app.utils.serialization import dumps, puzzles_to_list, orjson
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    rng = random.Random(1)
+    user = User(username="bench", email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    size = args.size
+    for n in range(args.puzzles):
+        solution = "".join("." if rng.random() < 0.15 else rng.choice(string.ascii_uppercase) for _ in range(size * size))
+        grid = Grid(size, size, solution)
+        puzzle = Puzzle(title=f"Bench {n}", author_id=user.id, grid_size=size)
+        db.add(puzzle)
+        db.flush()
+        db.add_all(PuzzleCell(puzzle_id=puzzle.id, **cell) for cell in grid.to_cells())
+        db.add_all(Clue(puzzle_id=puzzle.id, number=number, direction=direction,
+                        text=f"Clue for {answer}", answer=answer)
+                   for number, direction, answer in grid.words())
+    db.commit()
+
+    puzzles = db.query(Puzzle).options(selectinload(Puzzle.cells), selectinload(Puzzle.clues)).all()
+    adapter = TypeAdapter(List[puzzle_schema.Puzzle])
+
+    def response_model_path():
+        # What FastAPI does for response_model=List[Puzzle]: validate, dump, encode
+        validated = adapter.validate_python(puzzles, from_attributes=True)
+        content = jsonable_encoder(adapter.dump_python(validated, mode="json"))
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def fast_path():
+        return dumps(puzzles_to_list(puzzles))
+
+    slow_time, slow_body = timed(response_model_path, args.repeat)
+    fast_time, fast_body = timed(fast_path, args.repeat)
+    assert json.loads(slow_body) == json.loads(fast_body), "serializers disagree"
+
+    encoder = "orjson" if orjson is not None else "json"
+    print(f"{args.puzzles} puzzles of {size}x{size}, {len(fast_body) / 1024:.0f} KB of JSON")
+    print(f"response_model + json   {slow_time * 1000:8.1f} ms")
+    print(f"dicts + {encoder:<15} {fast_time * 1000:8.1f} ms   ({slow_time / fast_time:.1f}x faster)")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Load-test the API and report throughput and latency percentiles per endpoint.
+
+Runs in-process against the FastAPI app on a throwaway SQLite database by
+default (with rate limiting off, since every simulated user shares one
+client IP), or against a running server with --url. Requests refused by the
+server's rate limiter (429) or admission control (503) are counted
+separately from other errors. Requires httpx.
+
+Usage:
+    python benchmarks/loadtest.py
+    python benchmarks/loadtest.py --scenarios browse open autosave --duration 20 --concurrency 32
+    python benchmarks/loadtest.py --url http://localhost:8000 --json results.json
+    python benchmarks/loadtest.py --json new.json --compare old.json
+
+Scenarios:
+    browse    GET  /api/puzzles/
+    open      GET  /api/puzzles/{id}
+    autosave  POST /api/progress/ bursts from many users
+    login     POST /api/auth/login storm
+    import    POST /api/puzzles/import of the sample files
+    mixed     weighted mix of all of the above
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+SAMPLES_DIR = BACKEND_DIR.parent / "samples"
+sys.path.append(str(BACKEND_DIR))
+
+PASSWORD = "loadtest-password"
+
+MIXED_WEIGHTS = {"browse": 20, "open": 50, "autosave": 25, "login": 4, "import": 1}
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+class Recorder:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.shed = {}  # name -> {429: count, 503: count}
+
+    def record(self, name, elapsed, ok, status=None):
+        self.latencies.setdefault(name, []).append(elapsed)
+        if status in (429, 503):
+            counts = self.shed.setdefault(name, {429: 0, 503: 0})
+            counts[status] += 1
+        elif not ok:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self, wall_time):
+        endpoints = {}
+        for name, values in sorted(self.latencies.items()):
+            values.sort()
+            endpoints[name] = {
+                "requests": len(values),
+                "errors": self.errors.get(name, 0),
+                "rate_limited": self.shed.get(name, {}).get(429, 0),
+                "overloaded": self.shed.get(name, {}).get(503, 0),
+                "throughput_rps": len(values) / wall_time if wall_time else 0.0,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+                "max_ms": values[-1] * 1000,
+            }
+        return endpoints
+
+class LoadTest:
+    def __init__(self, client, args):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.recorder = Recorder()
+        self.users = []        # (username, auth headers)
+        self.puzzle_ids = []
+        self.samples = [p for p in sorted(SAMPLES_DIR.iterdir()) if p.suffix in (".puz", ".json")]
+
+    async def request(self, name, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except Exception:
+            response, ok = None, False
+        status = response.status_code if response is not None else None
+        self.recorder.record(name, time.perf_counter() - start, ok, status)
+        return response
+
+    async def setup_request(self, method, url, **kwargs):
+        """Setup call that waits out 429/503 refusals from a rate-limited server."""
+        while True:
+            response = await self.client.request(method, url, **kwargs)
+            if response.status_code not in (429, 503):
+                return response
+            wait = float(response.headers.get("Retry-After", 1))
+            print(f"setup: {url} refused ({response.status_code}), retrying in {wait:.0f}s", file=sys.stderr)
+            await asyncio.sleep(wait)
+
+    async def setup(self):
+        run_id = f"{int(time.time())}{self.rng.randrange(10000)}"
+        for n in range(self.args.users):
+            username = f"load{run_id}_{n}"
+            await self.setup_request("POST", "/api/auth/register", json={
+                "username": username, "email": f"{username}@example.com", "password": PASSWORD
+            })
+            response = await self.setup_request("POST", "/api/auth/login",
+                                                data={"username": username, "password": PASSWORD})
+            if response.status_code != 200:
+                raise SystemExit(f"Login for {username} failed: {response.status_code} {response.text}")
+            token = response.json()["access_token"]
+            self.users.append((username, {"Authorization": f"Bearer {token}"}))
+
+        _, headers = self.users[0]
+        for sample in self.samples:
+            await self.import_file(sample, headers)
+
+        response = await self.setup_request("GET", "/api/puzzles/", params={"limit": 1000})
+        self.puzzle_ids = [p["id"] for p in response.json()]
+        if not self.puzzle_ids:
+            raise SystemExit("No puzzles available to load-test against")
+
+    async def import_file(self, path, headers, name=None):
+        with open(path, "rb") as f:
+            content = f.read()
+        files = {"file": (path.name, content)}
+        if name:
+            return await self.request(name, "POST", "/api/puzzles/import", files=files, headers=headers)
+        return await self.setup_request("POST", "/api/puzzles/import", files=files, headers=headers)
+
+    async def browse(self):
+        await self.request("GET /api/puzzles/", "GET", "/api/puzzles/", params={"limit": 20})
+
+    async def open(self):
+        puzzle_id = self.rng.choice(self.puzzle_ids)
+        await self.request("GET /api/puzzles/{id}", "GET", f"/api/puzzles/{puzzle_id}")
+
+    async def autosave(self):
+        _, headers = self.rng.choice(self.users)
+        puzzle_id = self.rng.choice(self.puzzle_ids)
+        filled = self.rng.randrange(1, 60)
+        state = {f"{i // 15},{i % 15}": self.rng.choice("ABCDE") for i in range(filled)}
+        # Autosave fires in bursts while a solver types
+        for _ in range(self.rng.randrange(1, 4)):
+            await self.request("POST /api/progress/", "POST", "/api/progress/", headers=headers, json={
+                "puzzle_id": puzzle_id, "current_state": state, "completion_percentage": min(filled, 99)
+            })
+
+    async def login(self):
+        username, _ = self.rng.choice(self.users)
+        await self.request("POST /api/auth/login", "POST", "/api/auth/login",
+                           data={"username": username, "password": PASSWORD})
+
+    async def import_puzzle(self):
+        _, headers = self.rng.choice(self.users)
+        await self.import_file(self.rng.choice(self.samples), headers, name="POST /api/puzzles/import")
+
+    def pick(self, scenarios):
+        actions = {
+            "browse": self.browse, "open": self.open, "autosave": self.autosave,
+            "login": self.login, "import": self.import_puzzle,
+        }
+        if "mixed" in scenarios:
+            names = list(MIXED_WEIGHTS)
+            return actions[self.rng.choices(names, weights=[MIXED_WEIGHTS[n] for n in names])[0]]
+        return actions[self.rng.choice(scenarios)]
+
+    async def worker(self, deadline, remaining):
+        while time.perf_counter() < deadline:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            await self.pick(self.args.scenarios)()
+
+    async def run(self):
+        await self.setup()
+        remaining = [self.args.requests] if self.args.requests else None
+        start = time.perf_counter()
+        deadline = start + self.args.duration
+        await asyncio.gather(*(self.worker(deadline, remaining) for _ in range(self.args.concurrency)))
+        return self.recorder.summary(time.perf_counter() - start), time.perf_counter() - start
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def run_in_process(args):
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=60) as client:
+            return await LoadTest(client, args).run()
+
+async def run_remote(args):
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+        return await LoadTest(client, args).run()
+
+def print_report(endpoints, wall_time, baseline=None):
+    print(f"\n{'endpoint':<28} {'reqs':>7} {'err':>5} {'429':>5} {'503':>5} {'rps':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, row in endpoints.items():
+        line = (f"{name:<28} {row['requests']:>7} {row['errors']:>5} {row.get('rate_limited', 0):>5} "
+                f"{row.get('overloaded', 0):>5} {row['throughput_rps']:>8.1f} "
+                f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}")
+        old = (baseline or {}).get(name)
+        if old and old["p95_ms"]:
+            line += f"   p95 {(row['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100:+.0f}%"
+        print(line)
+    total = sum(row["requests"] for row in endpoints.values())
+    print(f"\n{total} requests in {wall_time:.1f}s ({total / wall_time:.1f} req/s)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="base URL of a running server; in-process when omitted")
+    parser.add_argument("--scenarios", nargs="+", default=["mixed"],
+                        choices=["browse", "open", "autosave", "login", "import", "mixed"])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, help="stop after this many scenario iterations")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write machine-readable results to this file")
+    parser.add_argument("--compare", help="previous --json output to diff p95 against")
+    args = parser.parse_args()
+
+    if args.url:
+        endpoints, wall_time = asyncio.run(run_remote(args))
+    else:
+        # Fresh SQLite database so runs are comparable across commits
+        db_path = os.path.join(tempfile.mkdtemp(), "loadtest.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+        # All simulated users come from one in-process client address
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+        endpoints, wall_time = asyncio.run(run_in_process(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["endpoints"]
+    print_report(endpoints, wall_time, baseline)
+
+    if args.json:
+        result = {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "target": args.url or "in-process",
+            "scenarios": args.scenarios,
+            "concurrency": args.concurrency,
+            "duration_seconds": wall_time,
+            "endpoints": endpoints,
+        }
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
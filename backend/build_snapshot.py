@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Write every puzzle to the read-only snapshot served by GET /api/puzzles/{id}.
+
+The new file replaces the old one atomically; running servers pick it up
+within SNAPSHOT_RELOAD_SECONDS. Rebuild after publishing a batch of puzzles
+(puzzles added since the last build are read from the database meanwhile).
+
+Usage:
+    python build_snapshot.py [--path puzzles.snapshot] [--batch-size 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+sys.path.append('.')
+
+from app.config import settings
+from app.database import SessionLocal, engine, Base
+from app.utils.snapshot import build_snapshot
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", default=settings.PUZZLE_SNAPSHOT_PATH,
+                        help="snapshot file (default: PUZZLE_SNAPSHOT_PATH)")
+    parser.add_argument("--batch-size", type=int, default=500, help="puzzles loaded per query")
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("set PUZZLE_SNAPSHOT_PATH or pass --path")
+
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        count = build_snapshot(db, args.path, args.batch_size)
+    finally:
+        db.close()
+    size = os.path.getsize(args.path)
+    print(f"Wrote {count} puzzles ({size / 1024 / 1024:.1f} MB) to {args.path} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
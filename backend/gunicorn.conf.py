@@ -0,0 +1,75 @@
+# Production serving: gunicorn -c gunicorn.conf.py app.main:app
+#
+# The app is imported once in the master (preload_app) and warmed before the
+# workers fork, so code, the word index and hot answer indexes are shared
+# copy-on-write. Workers are recycled after MAX_REQUESTS (+ jitter) requests.
+#
+# Signals: HUP re-reads this file and replaces workers gracefully; for new
+# code with preload, send USR2 (start a new master) then QUIT to the old one.
+import multiprocessing
+import os
+import tempfile
+
+try:
+    import uvicorn_worker  # noqa: F401
+    worker_class = "uvicorn_worker.UvicornWorker"
+except ImportError:  # older setups: uvicorn's bundled (deprecated) worker
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+from app.config import settings
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+# Background jobs, rate-limit buckets and admission counts live in process
+# memory unless REDIS_URL is set, so several workers need Redis: without it
+# a job polled on another worker is a 404 and every limit is multiplied
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() if settings.REDIS_URL else 1))
+if workers > 1 and not settings.REDIS_URL:
+    raise RuntimeError(f"WEB_CONCURRENCY={workers} needs REDIS_URL for shared job and rate-limit state; "
+                       "set REDIS_URL or use WEB_CONCURRENCY=1")
+preload_app = True
+
+# Each worker has its own metrics registry; they are summed through files in
+# this directory (set before the app is loaded)
+if workers > 1 and not settings.METRICS_MULTIPROC_DIR:
+    settings.METRICS_MULTIPROC_DIR = tempfile.mkdtemp(prefix="crossword-metrics-")
+
+max_requests = int(os.environ.get("MAX_REQUESTS", "5000"))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", str(max_requests // 10)))
+timeout = int(os.environ.get("WORKER_TIMEOUT", "60"))
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+keepalive = 5
+
+def when_ready(server):
+    # Master, after the app is imported and before any worker forks
+    from app.main import warm_up, multiprocess_metrics
+    from app.database import engine, read_engine
+
+    warm_up()
+    if multiprocess_metrics:
+        multiprocess_metrics.reset()
+    # Connections opened for the warm-up must not be shared with the children
+    engine.dispose()
+    read_engine.dispose()
+
+def post_fork(server, worker):
+    from app.database import engine, read_engine
+    from app.main import multiprocess_metrics
+
+    # Drop any pooled connections inherited from the master without closing them
+    engine.dispose(close=False)
+    read_engine.dispose(close=False)
+
+    if multiprocess_metrics:
+        multiprocess_metrics.start()
+
+def worker_exit(server, worker):
+    # Last snapshot, so requests since the previous dump are still counted
+    from app.main import multiprocess_metrics
+    if multiprocess_metrics:
+        multiprocess_metrics.dump()
+
+def child_exit(server, worker):
+    # Master: keep a recycled worker's counts without keeping its file
+    from app.main import multiprocess_metrics
+    if multiprocess_metrics:
+        multiprocess_metrics.retire(worker.pid)
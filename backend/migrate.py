@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Bring the database schema up to date; run before starting the server.
+
+The baseline schema has always been created by the app itself
+(Base.metadata.create_all), so a database may have no alembic version yet:
+
+  - empty database: every table is created at the current schema and
+    stamped as head
+  - tables but no alembic version (made by create_all, from this or an
+    older release): stamped as the newest revision whose changes are
+    already in the schema, then upgraded
+  - otherwise: alembic upgrade head
+
+Usage:
+    python migrate.py
+"""
+
+import argparse
+import logging
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+
+from app.database import Base, engine
+from app.models import *  # noqa: F401,F403 - every table on Base.metadata
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+# First revision: the schema create_all produced before migrations were used
+BASELINE_REVISION = "6c72db46d69f"
+
+def _has_column(table, column):
+    return lambda inspector: (inspector.has_table(table)
+                              and column in {c["name"] for c in inspector.get_columns(table)})
+
+def _has_index(table, index):
+    return lambda inspector: (inspector.has_table(table)
+                              and index in {i["name"] for i in inspector.get_indexes(table)})
+
+def _cascades(table):
+    return lambda inspector: any(
+        (fk["options"].get("ondelete") or "").upper() == "CASCADE"
+        for fk in inspector.get_foreign_keys(table) if fk["referred_table"] == "puzzles"
+    )
+
+# Each later revision, oldest first, with a check for whether create_all
+# already produced its changes. Add an entry with every new migration.
+REVISION_MARKERS = [
+    ("3f9a1c2b7d45", _has_column("puzzles", "content_hash")),
+    ("8b2e4d61c0a9", lambda inspector: inspector.has_table("puzzle_stats")),
+    ("c41d7e9a2f38", _cascades("puzzle_cells")),
+    ("e7a3b5c90d12", lambda inspector: inspector.has_table("solve_event_chunks")),
+    ("f2c8d4a61b37", _has_index("user_progress", "ix_user_progress_user_puzzle")),
+    ("a9d3e6f1c274", _has_column("user_progress", "state_archive")),
+    ("d5b81f3e9a60", _has_index("puzzle_cells", "ix_puzzle_cells_puzzle_id")),
+    ("b7e2c9d4f813", _has_index("user_progress", "uq_user_progress_user_puzzle")),
+]
+
+def detect_revision(inspector) -> str:
+    """The newest revision an unversioned schema already matches."""
+    revision = BASELINE_REVISION
+    for candidate, present in REVISION_MARKERS:
+        if not present(inspector):
+            break
+        revision = candidate
+    return revision
+
+def migrate() -> str:
+    """Create or upgrade the schema; returns what was done."""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.attributes["configure_logger"] = False
+    inspector = inspect(engine)
+    if not inspector.has_table("alembic_version"):
+        if not inspector.has_table("puzzles"):
+            Base.metadata.create_all(bind=engine)
+            command.stamp(config, "head")
+            return "created"
+        command.stamp(config, detect_revision(inspector))
+    command.upgrade(config, "head")
+    return "upgraded"
+
+def main():
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)-5.5s [%(name)s] %(message)s")
+    print(f"Database schema {migrate()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic dataset for scale testing.
+
+Creates users, puzzles of mixed sizes with valid numbering and clues, and
+UserProgress rows with a realistic completion mix, using bulk inserts.
+Progress rows can be generated by several worker processes in parallel
+(best on Postgres; SQLite serializes writers).
+
+Usage:
+    python seed_data.py --users 10000 --puzzles 5000 --progress 1000000 --workers 4
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from multiprocessing import Pool
+
+sys.path.append('.')
+
+from sqlalchemy import create_engine, func, insert, select
+
+from app.config import settings
+from app.database import Base, SessionLocal, engine
+from app.models import User, Puzzle, PuzzleCell, Clue, UserProgress, PuzzleStats
+from app.utils.grid import Grid, random_block_pattern, EMPTY
+from app.utils.stats import rebuild_stats
+
+# English letter frequencies, so grids look roughly like text
+LETTERS = "ETAOINSHRDLCUMWFGYPBVKJXQZ"
+LETTER_WEIGHTS = [12.7, 9.1, 8.2, 7.5, 7.0, 6.7, 6.3, 6.1, 6.0, 4.3, 4.0, 2.8, 2.8, 2.4,
+                  2.4, 2.2, 2.0, 2.0, 1.9, 1.5, 1.0, 0.8, 0.2, 0.2, 0.1, 0.1]
+
+DIFFICULTIES = ["Easy", "Medium", "Hard", None]
+
+# Share of started puzzles that end up completed
+COMPLETION_RATE = 0.55
+
+# Bcrypt is slow by design; every seeded user shares one hash of this password
+SEED_PASSWORD = "password"
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def seed_users(db, count, batch_size, run_id):
+    from app.api.auth import get_password_hash
+
+    hashed = get_password_hash(SEED_PASSWORD)
+    rows = [
+        {"username": f"seed{run_id}_{n}", "email": f"seed{run_id}_{n}@example.com", "hashed_password": hashed}
+        for n in range(count)
+    ]
+    ids = []
+    for batch in chunked(rows, batch_size):
+        ids.extend(db.scalars(insert(User).returning(User.id, sort_by_parameter_order=True), batch))
+    db.commit()
+    return ids
+
+def make_puzzle(size, rng):
+    pattern = random_block_pattern(size, rng)
+    letters = iter(rng.choices(LETTERS, weights=LETTER_WEIGHTS, k=pattern.count(EMPTY)))
+    return Grid(size, size, "".join(next(letters) if ch == EMPTY else ch for ch in pattern))
+
+def seed_puzzles(db, count, author_ids, sizes, batch_size, rng, run_id):
+    """Insert puzzles plus their cells and clues; returns [(id, size, white square keys, solution)]."""
+    puzzles = []
+    for batch_start in range(0, count, batch_size):
+        batch = []
+        for n in range(batch_start, min(count, batch_start + batch_size)):
+            size = rng.choice(sizes)
+            grid = make_puzzle(size, rng)
+            batch.append((grid, {
+                "title": f"Seed puzzle {run_id}-{n}",
+                "author_id": rng.choice(author_ids),
+                "grid_size": size,
+                "difficulty": rng.choice(DIFFICULTIES),
+                "description": "Generated by seed_data.py",
+            }))
+
+        batch_clues = []
+        for grid, row in batch:
+            puzzle_clues = [
+                {"number": number, "direction": direction.value,
+                 "text": f"Seed clue {number} {direction.value.lower()}", "answer": answer}
+                for number, direction, answer in grid.words()
+            ]
+            row["content_hash"] = grid.content_hash(puzzle_clues)
+            batch_clues.append(puzzle_clues)
+
+        ids = list(db.scalars(insert(Puzzle).returning(Puzzle.id, sort_by_parameter_order=True),
+                              [row for _, row in batch]))
+        cells, clues = [], []
+        for puzzle_id, (grid, _), puzzle_clues in zip(ids, batch, batch_clues):
+            cells.extend({"puzzle_id": puzzle_id, **cell} for cell in grid.to_cells())
+            clues.extend({"puzzle_id": puzzle_id, **clue} for clue in puzzle_clues)
+            squares = [grid.position(idx) for idx in range(len(grid)) if not grid.is_block(idx)]
+            puzzles.append((puzzle_id, grid.width, [f"{r},{c}" for r, c in squares], grid.solution))
+        db.execute(insert(PuzzleCell).execution_options(render_nulls=True), cells)
+        db.execute(insert(Clue), clues)
+        db.commit()
+        print(f"  puzzles: {len(puzzles)}/{count}")
+    return puzzles
+
+def progress_plan(user_ids, total, puzzle_count, rng):
+    """Rows per user following a long-tailed distribution (a few heavy solvers)."""
+    weights = [1.0 / math.pow(rank + 1, 0.8) for rank in range(len(user_ids))]
+    total = min(total, len(user_ids) * puzzle_count)
+    counts = [0] * len(user_ids)
+    planned = 0
+    # A user can't start more puzzles than exist; spread what's left over the rest
+    while planned < total:
+        open_users = [i for i, count in enumerate(counts) if count < puzzle_count]
+        scale = (total - planned) / sum(weights[i] for i in open_users)
+        for i in open_users:
+            extra = min(puzzle_count - counts[i], max(1, int(weights[i] * scale)), total - planned)
+            counts[i] += extra
+            planned += extra
+            if planned >= total:
+                break
+    plan = list(zip(user_ids, counts))
+    rng.shuffle(plan)
+    return plan
+
+def progress_row(user_id, puzzle, rng, with_state):
+    puzzle_id, size, squares, solution = puzzle
+    completed = rng.random() < COMPLETION_RATE
+    percentage = 100.0 if completed else round(rng.uniform(1, 99), 1)
+    row = {
+        "user_id": user_id,
+        "puzzle_id": puzzle_id,
+        "completion_percentage": percentage,
+        "is_completed": completed,
+        "score": rng.randrange(50, 1000) if completed else 0,
+        "completion_time": None,
+        "completed_at": None,
+        "current_state": None,
+    }
+    if completed:
+        # Log-normal solve times, scaled with grid area (a 15x15 takes ~15 min)
+        row["completion_time"] = int(rng.lognormvariate(math.log(900 * (size * size) / 225), 0.6))
+        row["completed_at"] = datetime.now(timezone.utc) - timedelta(days=rng.expovariate(1 / 60))
+    if with_state:
+        filled = squares if completed else rng.sample(squares, int(len(squares) * percentage / 100))
+        row["current_state"] = json.dumps({
+            key: solution[int(key.split(",")[0]) * size + int(key.split(",")[1])] for key in filled
+        })
+    return row
+
+def _seed_progress_worker(job):
+    """Insert one slice of the progress plan on the worker's own engine."""
+    plan, puzzles, batch_size, seed, with_state = job
+    rng = random.Random(seed)
+    connect_args = {"check_same_thread": False, "timeout": 60} if "sqlite" in settings.DATABASE_URL else {}
+    worker_engine = create_engine(settings.DATABASE_URL, connect_args=connect_args)
+    inserted = 0
+    rows = []
+    with worker_engine.begin() as conn:
+        for user_id, count in plan:
+            for puzzle in rng.sample(puzzles, count):
+                rows.append(progress_row(user_id, puzzle, rng, with_state))
+                if len(rows) >= batch_size:
+                    conn.execute(insert(UserProgress), rows)
+                    inserted += len(rows)
+                    rows = []
+        if rows:
+            conn.execute(insert(UserProgress), rows)
+            inserted += len(rows)
+    worker_engine.dispose()
+    return inserted
+
+def seed_progress(plan, puzzles, workers, batch_size, seed, with_state):
+    slices = [plan[i::workers] for i in range(workers)]
+    jobs = [(s, puzzles, batch_size, seed + i, with_state) for i, s in enumerate(slices) if s]
+    if workers == 1:
+        return sum(_seed_progress_worker(job) for job in jobs)
+    # Fresh connections in every child; don't share the parent's pool
+    engine.dispose()
+    with Pool(workers) as pool:
+        return sum(pool.map(_seed_progress_worker, jobs))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--puzzles", type=int, default=500)
+    parser.add_argument("--progress", type=int, default=100000, help="approximate number of UserProgress rows")
+    parser.add_argument("--min-size", type=int, default=5)
+    parser.add_argument("--max-size", type=int, default=25)
+    parser.add_argument("--workers", type=int, default=1, help="processes inserting progress rows")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--no-state", action="store_true", help="leave current_state empty")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(args.seed)
+    sizes = list(range(args.min_size, args.max_size + 1))
+    run_id = f"{int(time.time()) % 100000}"
+    db = SessionLocal()
+    start = time.perf_counter()
+
+    try:
+        user_ids = seed_users(db, args.users, args.batch_size, run_id)
+        print(f"Created {len(user_ids)} users in {time.perf_counter() - start:.1f}s")
+
+        puzzles = seed_puzzles(db, args.puzzles, user_ids, sizes, max(1, args.batch_size // 500), rng, run_id)
+        print(f"Created {len(puzzles)} puzzles in {time.perf_counter() - start:.1f}s")
+    finally:
+        db.close()
+
+    plan = progress_plan(user_ids, args.progress, len(puzzles), rng)
+    inserted = seed_progress(plan, puzzles, max(1, args.workers), args.batch_size, args.seed, not args.no_state)
+    print(f"Created {inserted} progress rows in {time.perf_counter() - start:.1f}s")
+
+    # Bulk inserts bypass save_progress, so build the per-puzzle stats here
+    with SessionLocal() as db:
+        rebuild_stats(db, args.batch_size)
+
+    with SessionLocal() as db:
+        totals = {model.__tablename__: db.scalar(select(func.count()).select_from(model))
+                  for model in (User, Puzzle, PuzzleCell, Clue, UserProgress, PuzzleStats)}
+    print("Table sizes: " + ", ".join(f"{name}={count}" for name, count in totals.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import itertools
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Settings are read when the app is imported: point it at a throwaway database
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(tempfile.mkdtemp()) / 'test.db'}"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ.pop("PUZZLE_SNAPSHOT_PATH", None)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+_usernames = (f"user{n}" for n in itertools.count())
+_serials = itertools.count()
+
+# Letters A..Y in row order: a block-free 5x5 grid
+ROWS = ["ABCDE", "FGHIJ", "KLMNO", "PQRST", "UVWXY"]
+
+@pytest.fixture(scope="session")
+def client():
+    return TestClient(app)
+
+@pytest.fixture
+def make_user(client):
+    """Register a fresh user and return their auth headers."""
+    def make():
+        username = next(_usernames)
+        client.post("/api/auth/register", json={
+            "username": username, "email": f"{username}@example.com", "password": "password"
+        })
+        response = client.post("/api/auth/login", data={"username": username, "password": "password"})
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return make
+
+def puzzle_document(title="Test puzzle", difficulty=None) -> bytes:
+    """NYT-style JSON for a 5x5 puzzle of ``ROWS`` with a clue for every entry."""
+    columns = ["".join(row[col] for row in ROWS) for col in range(5)]
+    # Imports dedupe on content, so each puzzle gets its own note clue
+    return json.dumps({
+        "title": title,
+        "difficulty": difficulty,
+        "size": {"rows": 5, "cols": 5},
+        "grid": list("".join(ROWS)),
+        "clues": {
+            "across": [f"{n}. Across {n}" for n in (1, 6, 7, 8, 9)],
+            "down": [f"{n}. Down {n}" for n in (1, 2, 3, 4)] + [f"5. Down 5 #{next(_serials)}"],
+        },
+        "answers": {"across": ROWS, "down": columns},
+    }).encode()
+
+@pytest.fixture
+def make_puzzle(client):
+    """Import a puzzle_document(); returns the import response's JSON."""
+    def make(headers, title="Test puzzle", difficulty=None):
+        response = client.post("/api/puzzles/import", headers=headers,
+                               files={"file": ("puzzle.json", puzzle_document(title, difficulty))})
+        assert response.status_code == 200
+        return response.json()
+    return make
@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+from app.api import puzzles
+from app.config import settings
+from app.utils.autofill import autofill
+from app.utils.word_index import WordIndex
+from .conftest import ROWS
+
+COLUMNS = ["".join(row[col] for row in ROWS) for col in range(5)]
+
+@pytest.fixture
+def index():
+    words = WordIndex()
+    words.add_many(ROWS + COLUMNS + ["ABXYZ", "QQQQQ"])
+    return words
+
+def test_fills_from_the_word_index(index):
+    result = autofill("ABCDE" + "?" * 20, 5, 5, index)
+    assert result["status"] == "filled"
+    assert result["grid"] == "".join(ROWS)
+
+def test_blocks_and_shorter_slots(index):
+    index.add_many(["AB", "FG", "AF", "BG"])
+    result = autofill("??...??...." + "." * 14, 5, 5, index)
+    assert result["status"] == "filled"
+    assert result["grid"][:2] + result["grid"][5:7] == "ABFG"
+
+def test_no_solution(index):
+    # No down word starts with Q
+    result = autofill("QQQQQ" + "?" * 20, 5, 5, index)
+    assert result["status"] == "unsatisfiable"
+    assert result["grid"] == "QQQQQ" + "?" * 20
+
+def test_timeout_returns_the_partial_fill(index):
+    result = autofill("A" + "?" * 24, 5, 5, index, time_limit=0)
+    assert result["status"] == "timeout"
+    assert result["grid"].startswith("A")
+    assert len(result["grid"]) == 25
+
+def test_mismatched_grid_is_rejected(index):
+    with pytest.raises(ValueError):
+        autofill("?" * 24, 5, 5, index)
+
+def request_cells(rows):
+    return [{"row": r, "col": c, "solution": None if ch == "?" else ch, "is_black_square": ch == "."}
+            for r, row in enumerate(rows) for c, ch in enumerate(row)]
+
+def test_endpoint_fills_from_stored_answers(client, make_user, make_puzzle, monkeypatch):
+    user = make_user()
+    make_puzzle(user)
+    monkeypatch.setattr(settings, "WORD_INDEX_REFRESH_SECONDS", 0)
+    response = client.post("/api/puzzles/autofill", headers=user, json={
+        "grid_size": 5, "cells": request_cells(["ABCDE"] + ["?????"] * 4), "time_limit": 60
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "filled"
+    assert ["".join(cell["solution"] for cell in body["cells"][r * 5:r * 5 + 5]) for r in range(5)] == ROWS
+    assert {(word["number"], word["direction"], word["answer"]) for word in body["words"]} >= {(1, "ACROSS", "ABCDE")}
+    # Capped by AUTOFILL_MAX_SECONDS
+    assert body["elapsed"] < settings.AUTOFILL_MAX_SECONDS + 1
+
+def test_endpoint_refuses_when_busy(client, make_user, monkeypatch):
+    busy = threading.BoundedSemaphore(1)
+    busy.acquire()
+    monkeypatch.setattr(puzzles, "_autofill_slots", busy)
+    response = client.post("/api/puzzles/autofill", headers=make_user(), json={
+        "grid_size": 5, "cells": request_cells(["?????"] * 5)
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
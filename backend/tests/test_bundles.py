@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from app.config import settings
+from app.database import SessionLocal
+from app.utils.bundles import bundle_cache, warm_bundles
+
+@pytest.fixture(autouse=True)
+def small_windows(monkeypatch):
+    monkeypatch.setattr(settings, "PUZZLE_BUNDLE_SIZE", 4)
+    bundle_cache.clear()
+    yield
+    bundle_cache.clear()
+
+def manifest(client, **params):
+    response = client.get("/api/puzzles/manifest", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+def window_of(body, puzzle_id):
+    return next(w for w in body["windows"] if w["first_id"] <= puzzle_id <= w["last_id"])
+
+def test_bundle_holds_its_window_and_supports_conditional_requests(client, make_user, make_puzzle):
+    puzzle_id = make_puzzle(make_user(), title="Bundled")["id"]
+    body = manifest(client)
+    assert body["bundle_size"] == 4
+    window = window_of(body, puzzle_id)
+    assert window["window"] == puzzle_id // 4
+    assert window["url"] == f"/api/puzzles/bundles/{puzzle_id // 4}"
+
+    response = client.get(window["url"], headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{window["etag"]}"'
+    assert "content-encoding" not in response.headers
+    bundle = response.json()
+    assert bundle["etag"] == window["etag"]
+    ids = [puzzle["id"] for puzzle in bundle["puzzles"]]
+    assert puzzle_id in ids and len(ids) == window["count"]
+
+    # Pre-compressed bodies, and 304 for a copy the client already has
+    packed = client.get(window["url"], headers={"Accept-Encoding": "gzip"})
+    assert packed.headers["content-encoding"] == "gzip"
+    assert json.loads(packed.content) == bundle
+    assert client.get(window["url"], headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+def test_edits_and_deletes_change_the_etag(client, make_user, make_puzzle):
+    author = make_user()
+    first, second = (make_puzzle(author)["id"] for _ in range(2))
+    before = manifest(client)
+    etags = {puzzle_id: window_of(before, puzzle_id)["etag"] for puzzle_id in (first, second)}
+    client.get(window_of(before, first)["url"])
+
+    assert client.patch(f"/api/puzzles/{first}", headers=author, json={"title": "Renamed"}).status_code == 200
+    after = manifest(client, since=before["version"])
+    assert window_of(after, first)["etag"] != etags[first]
+    assert first in [change["id"] for change in after["changed"]]
+    bundle = client.get(window_of(after, first)["url"], headers={"If-None-Match": f'"{etags[first]}"'})
+    assert bundle.status_code == 200 and bundle.json()["etag"] == window_of(after, first)["etag"]
+
+    assert client.delete(f"/api/puzzles/{second}", headers=author).status_code == 200
+    windows = {w["window"]: w for w in manifest(client)["windows"]}
+    old = window_of(before, second)
+    assert old["window"] not in windows or windows[old["window"]]["etag"] != old["etag"]
+
+def test_empty_window_and_warmed_bundles(client):
+    assert client.get("/api/puzzles/bundles/999999").status_code == 404
+    db = SessionLocal()
+    try:
+        assert warm_bundles(db, 2) == min(2, len(manifest(client)["windows"]))
+    finally:
+        db.close()
+    newest = manifest(client)["windows"][-1]
+    assert bundle_cache.get(newest["window"], newest["etag"]) is not None
@@ -0,0 +1,83 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.puzzle import Puzzle, PuzzleCell
+from app.utils.answer_index import answer_cache, warm_answer_cache
+from .conftest import ROWS
+
+@pytest.fixture
+def puzzle_id(make_user, make_puzzle):
+    return make_puzzle(make_user(), title="Check test")["id"]
+
+def check(client, puzzle_id, **request):
+    return client.post(f"/api/puzzles/{puzzle_id}/check", json=request)
+
+def reveal(client, puzzle_id, **request):
+    return client.post(f"/api/puzzles/{puzzle_id}/reveal", json=request)
+
+def test_check_square_and_word(client, puzzle_id):
+    body = check(client, puzzle_id, scope="square", row=1, col=2, entries={"1,2": "h"}).json()
+    assert body["results"] == {"1,2": "correct"}
+    assert check(client, puzzle_id, row=1, col=2, entries={"1,2": "X"}).json()["results"] == {"1,2": "incorrect"}
+
+    # 1-Down is the first column; only the letters given are judged
+    body = check(client, puzzle_id, scope="word", number=1, direction="DOWN",
+                 entries={"0,0": "A", "1,0": "Z", "3,0": " "}).json()
+    assert body["results"] == {"0,0": "correct", "1,0": "incorrect", "2,0": "empty",
+                               "3,0": "empty", "4,0": "empty"}
+    assert (body["correct"], body["incorrect"], body["empty"], body["is_solved"]) == (1, 1, 3, False)
+
+    # A square picks its across entry unless a direction is given
+    across = check(client, puzzle_id, scope="word", row=2, col=3).json()["results"]
+    down = check(client, puzzle_id, scope="word", row=2, col=3, direction="DOWN").json()["results"]
+    assert sorted(across) == [f"2,{col}" for col in range(5)]
+    assert sorted(down) == [f"{row},3" for row in range(5)]
+
+def test_check_whole_puzzle(client, puzzle_id):
+    entries = {f"{r},{c}": ROWS[r][c] for r in range(5) for c in range(5)}
+    body = check(client, puzzle_id, scope="puzzle", entries=entries).json()
+    assert body["is_solved"] and body["correct"] == 25
+    entries["4,4"] = "Q"
+    assert not check(client, puzzle_id, scope="puzzle", entries=entries).json()["is_solved"]
+
+def test_reveal(client, puzzle_id):
+    assert reveal(client, puzzle_id, row=3, col=1).json() == {"letters": {"3,1": "Q"}}
+    assert reveal(client, puzzle_id, scope="word", number=6, direction="ACROSS").json()["letters"] == \
+        {f"1,{col}": ROWS[1][col] for col in range(5)}
+    assert len(reveal(client, puzzle_id, scope="puzzle").json()["letters"]) == 25
+
+@pytest.mark.parametrize("request_body", [
+    {"scope": "square"},
+    {"scope": "square", "row": 5, "col": 0},
+    {"scope": "word", "number": 99, "direction": "ACROSS"},
+])
+def test_bad_selections_are_rejected(client, puzzle_id, request_body):
+    assert check(client, puzzle_id, **request_body).status_code == 400
+    assert reveal(client, puzzle_id, **request_body).status_code == 400
+
+def test_unknown_puzzle(client):
+    assert reveal(client, 10 ** 9, row=0, col=0).status_code == 404
+
+def test_cached_index_follows_edits_from_other_workers(client, puzzle_id):
+    db = SessionLocal()
+    try:
+        assert warm_answer_cache(db, 5) >= 1
+        assert answer_cache.get(puzzle_id) is not None
+        assert reveal(client, puzzle_id, row=0, col=0).json() == {"letters": {"0,0": "A"}}
+
+        # An edit elsewhere changes the letter and bumps the version
+        db.query(PuzzleCell).filter(PuzzleCell.puzzle_id == puzzle_id, PuzzleCell.row == 0,
+                                    PuzzleCell.col == 0).update({"solution": "Z"})
+        db.get(Puzzle, puzzle_id).updated_at = datetime.now(timezone.utc)
+        db.commit()
+        assert reveal(client, puzzle_id, row=0, col=0).json() == {"letters": {"0,0": "Z"}}
+
+        # A deleted puzzle is dropped from the cache
+        db.delete(db.get(Puzzle, puzzle_id))
+        db.commit()
+        assert reveal(client, puzzle_id, row=0, col=0).status_code == 404
+        assert answer_cache.get(puzzle_id) is None
+    finally:
+        db.close()
@@ -0,0 +1,72 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import CompressionMiddleware, brotli, negotiate_encoding
+
+BIG = "crossword " * 500
+
+@pytest.fixture
+def compressed():
+    app = FastAPI()
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse(BIG)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/encoded")
+    def encoded():
+        return Response(gzip.compress(BIG.encode()), media_type="text/plain",
+                        headers={"Content-Encoding": "gzip", "Vary": "Accept-Language"})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([BIG, BIG]), media_type="text/plain")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1000)
+    return TestClient(app)
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("*;q=0.5") == ("br" if brotli else "gzip")
+    assert negotiate_encoding("br;q=0, gzip;q=0.1") == "gzip"
+    assert negotiate_encoding("gzip;q=junk") is None
+
+def test_large_response_is_compressed(compressed):
+    response = compressed.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(BIG)
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.text == BIG
+
+@pytest.mark.skipif(brotli is None, reason="brotli not installed")
+def test_brotli_is_preferred(compressed):
+    response = compressed.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.text == BIG
+
+@pytest.mark.parametrize("path, accept", [
+    ("/big", "identity"),
+    ("/small", "gzip"),
+    ("/stream", "gzip"),
+])
+def test_uncompressed_responses_still_vary(compressed, path, accept):
+    # A cache must not hand these to a client that would have got them compressed, or vice versa
+    response = compressed.get(path, headers={"Accept-Encoding": accept})
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+
+def test_pre_encoded_response_is_untouched(compressed):
+    for accept in ("gzip", "identity"):
+        response = compressed.get("/encoded", headers={"Accept-Encoding": accept})
+        assert response.headers["vary"] == "Accept-Language"
+        assert response.headers["content-encoding"] == "gzip"
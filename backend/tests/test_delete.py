@@ -0,0 +1,63 @@
+from sqlalchemy import inspect, text
+
+from app.database import SessionLocal, engine
+from app.models.puzzle import Clue, PuzzleCell
+from app.models.puzzle_stats import PuzzleStats
+from app.models.solve_event import SolveEventChunk
+from app.models.user_progress import UserProgress
+
+CHILDREN = [PuzzleCell, Clue, UserProgress, PuzzleStats]
+
+def child_counts(puzzle_id):
+    db = SessionLocal()
+    try:
+        counts = {model.__tablename__: db.query(model).filter(model.puzzle_id == puzzle_id).count()
+                  for model in CHILDREN}
+        counts["solve_event_chunks"] = db.query(SolveEventChunk).join(UserProgress).filter(
+            UserProgress.puzzle_id == puzzle_id
+        ).count()
+        return counts
+    finally:
+        db.close()
+
+def test_delete_cascades_to_every_child_table(client, make_user, make_puzzle):
+    author, solver = make_user(), make_user()
+    puzzle_id = make_puzzle(author)["id"]
+    kept_id = make_puzzle(author)["id"]
+    for target in (puzzle_id, kept_id):
+        assert client.post("/api/progress/", headers=solver, json={
+            "puzzle_id": target, "current_state": {"0,0": "A"}, "completion_percentage": 4
+        }).status_code == 200
+        assert client.post(f"/api/progress/{target}/events", headers=solver, json={
+            "events": [{"dt": 0, "action": "letter", "row": 0, "col": 0, "letter": "A"}]
+        }).status_code == 201
+    assert all(child_counts(puzzle_id).values())
+
+    assert client.delete(f"/api/puzzles/{puzzle_id}", headers=author).status_code == 200
+    assert client.get(f"/api/puzzles/{puzzle_id}").status_code == 404
+    assert not any(child_counts(puzzle_id).values())
+    # The other puzzle's rows are untouched
+    assert all(child_counts(kept_id).values())
+
+def test_only_the_author_may_delete(client, make_user, make_puzzle):
+    puzzle_id = make_puzzle(make_user())["id"]
+    assert client.delete(f"/api/puzzles/{puzzle_id}", headers=make_user()).status_code == 403
+    assert client.delete("/api/puzzles/999999", headers=make_user()).status_code == 404
+
+def test_bulk_delete_reports_each_id(client, make_user, make_puzzle):
+    author, other = make_user(), make_user()
+    mine, theirs = make_puzzle(author)["id"], make_puzzle(other)["id"]
+    response = client.post("/api/puzzles/bulk-delete", headers=author,
+                           json={"puzzle_ids": [mine, theirs, 999999]})
+    assert response.json() == {"deleted": [mine], "not_found": [999999], "forbidden": [theirs]}
+    assert not any(child_counts(mine).values())
+    assert child_counts(theirs)["puzzle_cells"] == 25
+
+def test_child_lookups_by_puzzle_use_an_index():
+    inspector = inspect(engine)
+    with engine.connect() as connection:
+        for model in (PuzzleCell, Clue, UserProgress):
+            table = model.__tablename__
+            assert f"ix_{table}_puzzle_id" in {index["name"] for index in inspector.get_indexes(table)}
+            plan = connection.execute(text(f"EXPLAIN QUERY PLAN SELECT id FROM {table} WHERE puzzle_id = 1")).all()
+            assert "SCAN" not in plan[0][-1]
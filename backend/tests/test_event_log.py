@@ -0,0 +1,42 @@
+import pytest
+
+from app.utils.event_log import decode_events, encode_events, replay_events
+
+EVENTS = [
+    {"dt": 0, "action": "letter", "row": 0, "col": 0, "letter": "A"},
+    {"dt": 150, "action": "letter", "row": 0, "col": 1, "letter": "b"},
+    {"dt": 90000, "action": "clear", "row": 14, "col": 200},
+    {"dt": 5, "action": "check"},
+    {"dt": 300, "action": "reveal", "row": 3, "col": 4},
+]
+
+def test_round_trip():
+    data, count, elapsed = encode_events(EVENTS)
+    assert (count, elapsed) == (5, 90455)
+    decoded = decode_events(data)
+    assert decoded[1] == {"dt": 150, "action": "letter", "row": 0, "col": 1, "letter": "B"}
+    assert decoded[2] == {"dt": 90000, "action": "clear", "row": 14, "col": 200}
+    assert decoded[3] == {"dt": 5, "action": "check"}
+    assert [e["action"] for e in decoded] == [e["action"] for e in EVENTS]
+
+def test_empty_chunk():
+    data, count, elapsed = encode_events([])
+    assert (count, elapsed) == (0, 0)
+    assert decode_events(data) == []
+
+def test_replay_accumulates_time_across_chunks():
+    first, _, _ = encode_events(EVENTS[:2])
+    second, _, _ = encode_events(EVENTS[2:])
+    times = [event["t"] for event in replay_events([first, second], start=1000)]
+    assert times == [1000, 1150, 91150, 91155, 91455]
+
+@pytest.mark.parametrize("event", [
+    {"dt": 0, "action": "erase", "row": 0, "col": 0},
+    {"dt": -1, "action": "clear", "row": 0, "col": 0},
+    {"dt": 0, "action": "letter", "row": 0, "col": 0, "letter": "AB"},
+    {"dt": 0, "action": "letter", "row": 0, "col": 0, "letter": "1"},
+    {"dt": 0, "action": "letter", "letter": "A"},
+])
+def test_invalid_events(event):
+    with pytest.raises(ValueError):
+        encode_events([event])
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from app.utils.feed import FeedParser
+
+DOCUMENTS = [{"title": "One", "grid": ["A", "."]}, {"title": "Twö ✓", "n": [1, 2, {"x": "]"}]}, {}]
+
+def parse(body: bytes, chunk_size: int, max_document_size: int = 1 << 20):
+    parser = FeedParser(max_document_size)
+    documents = []
+    for start in range(0, len(body), chunk_size):
+        documents.extend(parser.feed(body[start:start + chunk_size]))
+    documents.extend(parser.close())
+    return documents
+
+NDJSON = "\n".join(json.dumps(d, ensure_ascii=False) for d in DOCUMENTS).encode("utf-8")
+ARRAY = (" [\n" + ",\n ".join(json.dumps(d, ensure_ascii=False) for d in DOCUMENTS) + "\n] \n").encode("utf-8")
+
+@pytest.mark.parametrize("body", [NDJSON, NDJSON + b"\n\n", ARRAY], ids=["ndjson", "ndjson-trailing", "array"])
+def test_every_chunk_boundary(body):
+    # Splits land inside strings, multi-byte characters and between tokens
+    for chunk_size in range(1, 40):
+        assert parse(body, chunk_size) == DOCUMENTS
+
+def test_empty_feeds():
+    assert parse(b"", 8) == []
+    assert parse(b"[]", 1) == []
+    assert parse(b"  \n ", 1) == []
+
+def test_bad_ndjson_line_is_reported_in_place():
+    documents = parse(b'{"a": 1}\n{"a": \n{"a": 3}\n', 4)
+    assert documents[0] == {"a": 1}
+    assert isinstance(documents[1], ValueError)
+    assert documents[2] == {"a": 3}
+
+@pytest.mark.parametrize("body, message", [
+    (b'[{"a": 1} {"a": 2}]', "Expected ','"),
+    (b'[{"a": 1}, {"a": }]', "Invalid JSON in array"),
+    (b'[{"a": 1}', "not closed"),
+    (b'[{"a": 1}] {"b": 2}', "after the end"),
+])
+def test_malformed_array(body, message):
+    with pytest.raises(ValueError, match=message):
+        parse(body, 3)
+
+def test_document_size_limit():
+    with pytest.raises(ValueError, match="No complete document"):
+        parse(b'[{"a": "' + b"x" * 200 + b'"}]', 16, max_document_size=64)
+
+def test_invalid_utf8():
+    with pytest.raises(ValueError, match="UTF-8"):
+        parse(b'{"a": "\xff"}\n', 4)
+
+TRICKY = [{"s": 'quote " backslash \\ brackets ]} {[ "'}, "a string item", 12345, -1.5e3, True, None, [[1], [2, [3]]]]
+
+@pytest.mark.parametrize("separator", [",", " ,\n"])
+def test_escapes_strings_and_scalars_at_every_boundary(separator):
+    body = ("[" + separator.join(json.dumps(d) for d in TRICKY) + "]").encode()
+    for chunk_size in range(1, 30):
+        assert parse(body, chunk_size) == TRICKY
+
+def test_large_document_is_decoded_once():
+    puzzle = {"title": "Big", "clues": [{"text": f'Clue "{n}" \\ ]', "answer": "X" * 20} for n in range(2000)]}
+    body = ("[" + json.dumps(puzzle) + "," + json.dumps(puzzle) + "]").encode()
+    parser = FeedParser()
+    decode = parser._json.raw_decode
+    calls = []
+
+    def counted(buffer, pos):
+        calls.append(len(buffer) - pos)
+        return decode(buffer, pos)
+
+    parser._json.raw_decode = counted
+    documents = []
+    for start in range(0, len(body), 64):
+        documents.extend(parser.feed(body[start:start + 64]))
+    documents.extend(parser.close())
+    assert documents == [puzzle, puzzle]
+    # A first try when each document starts, then one decode once it has all arrived
+    assert len(calls) == 4
+    assert sum(calls) < 3 * len(body)
@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+READ_WORKERS = "import runpy; print(runpy.run_path('gunicorn.conf.py')['workers'])"
+
+def load(**env):
+    environ = {key: value for key, value in os.environ.items() if key not in ("REDIS_URL", "WEB_CONCURRENCY")}
+    environ.update(env)
+    return subprocess.run([sys.executable, "-c", READ_WORKERS], cwd=BACKEND_DIR, env=environ,
+                          capture_output=True, text=True)
+
+def test_single_worker_without_redis():
+    result = load()
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "1"
+
+def test_one_worker_per_core_with_redis():
+    result = load(REDIS_URL="redis://localhost:6379/0")
+    assert result.stdout.strip() == str(os.cpu_count())
+
+def test_several_workers_without_redis_are_refused():
+    result = load(WEB_CONCURRENCY="4")
+    assert result.returncode != 0
+    assert "needs REDIS_URL" in result.stderr
+    assert load(WEB_CONCURRENCY="4", REDIS_URL="redis://localhost:6379/0").stdout.strip() == "4"
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from .conftest import ROWS, puzzle_document
+
+def upload(client, headers, filename, content):
+    return client.post("/api/puzzles/import", headers=headers, files={"file": (filename, content)})
+
+def document(**changes):
+    data = json.loads(puzzle_document())
+    data.update(changes)
+    return json.dumps(data).encode()
+
+def test_import_and_duplicate(client, make_user):
+    user = make_user()
+    content = puzzle_document("Imported")
+    first = upload(client, user, "puzzle.json", content)
+    assert first.status_code == 200
+    body = first.json()
+    assert body["title"] == "Imported"
+    stored = client.get(f"/api/puzzles/{body['id']}").json()
+    assert "".join(cell["solution"] for cell in stored["cells"]) == "".join(ROWS)
+
+    again = upload(client, make_user(), "again.json", content)
+    assert again.status_code == 200
+    assert again.json()["duplicate"] is True
+    assert again.json()["id"] == body["id"]
+
+@pytest.mark.parametrize("filename, content, detail", [
+    ("rebus.json", document(grid=["AB"] + list("".join(ROWS))[1:]), "Rebus squares are not supported (row 1, column 1"),
+    ("list.json", b"[]", "must be a JSON object"),
+    ("shape.json", document(size=[5, 5]), "Could not parse shape.json"),
+    ("clues.json", document(clues={"across": [1, 2]}), "Could not parse clues.json"),
+    ("size.json", document(size={"rows": "5"}), "Invalid grid size"),
+    ("broken.json", b"{not json", "Could not parse broken.json"),
+    ("latin1.json", "{\"title\": \"Café\"}".encode("latin-1"), "Could not parse latin1.json"),
+    ("short.puz", b"\x00" * 10, "too small"),
+    ("notes.txt", b"hello", "Unsupported file format"),
+    ("tiny.json", document(size={"rows": 3}, grid=list("ABCDEFGHI")), "Invalid puzzle"),
+])
+def test_unreadable_uploads_are_rejected(client, make_user, filename, content, detail):
+    response = upload(client, make_user(), filename, content)
+    assert response.status_code == 400
+    assert detail in response.json()["detail"]
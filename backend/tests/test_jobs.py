@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.jobs import (
+    CANCELLED, FAILED, FINISHED, QUEUED, SUCCEEDED, JobQueue, MemoryJobStore, QueueFull, job_handler
+)
+from .conftest import puzzle_document
+
+# Handlers for the queue tests; the registry is global, so the kinds are test-only
+gate = threading.Event()
+calls = {"flaky": 0, "bad": 0}
+
+@job_handler("test-echo")
+def echo(payload, ctx):
+    ctx.progress(0.5, "Halfway")
+    return {"echo": payload}
+
+@job_handler("test-flaky")
+def flaky(payload, ctx):
+    calls["flaky"] += 1
+    done = (ctx.job["result"] or {}).get("done", 0)
+    ctx.checkpoint({"done": done + 1})
+    if calls["flaky"] < 3:
+        raise RuntimeError("transient")
+    return {"done": done + 1}
+
+@job_handler("test-bad")
+def bad(payload, ctx):
+    calls["bad"] += 1
+    if calls["bad"] == 1:
+        raise ValueError("bad input")
+    return "fixed"
+
+@job_handler("test-wait")
+def wait(payload, ctx):
+    while not gate.wait(0.01):
+        ctx.check_cancelled()
+    return "released"
+
+@pytest.fixture
+def queue():
+    gate.clear()
+    calls.update(flaky=0, bad=0)
+    jobs = JobQueue(MemoryJobStore(), workers=1, max_pending=2, max_attempts=3, retry_delay=0.01)
+    yield jobs
+    gate.set()
+    jobs.shutdown()
+
+def wait_for(get, job_id, statuses=FINISHED, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {job['status']}")
+
+def test_job_runs_to_success(queue):
+    job = queue.submit("test-echo", {"n": 1}, user_id=7)
+    assert job["status"] == QUEUED
+    job = wait_for(queue.get, job["id"])
+    assert job["status"] == SUCCEEDED
+    assert job["result"] == {"echo": {"n": 1}}
+    assert job["progress"] == 1.0 and job["message"] == "Halfway"
+    assert job["attempts"] == 1 and job["user_id"] == 7
+    assert job["started_at"] and job["finished_at"]
+
+def test_failures_are_retried_from_the_checkpoint(queue):
+    job = wait_for(queue.get, queue.submit("test-flaky", {})["id"])
+    assert job["status"] == SUCCEEDED
+    assert job["attempts"] == 3
+    # Each attempt resumed from the previous one's checkpoint
+    assert job["result"] == {"done": 3}
+
+def test_bad_input_fails_at_once_and_can_be_retried(queue):
+    job = wait_for(queue.get, queue.submit("test-bad", {})["id"])
+    assert job["status"] == FAILED
+    assert job["error"] == "bad input" and job["attempts"] == 1
+
+    job = queue.retry(job["id"])
+    assert job["status"] == QUEUED and job["error"] is None
+    job = wait_for(queue.get, job["id"])
+    assert job["status"] == SUCCEEDED and job["result"] == "fixed"
+    # Only failed or cancelled jobs are retried
+    assert queue.retry(job["id"]) is None
+
+def test_cancel_queued_and_running_jobs(queue):
+    running = queue.submit("test-wait", {})
+    wait_for(queue.get, running["id"], {"running"})
+    waiting = queue.submit("test-wait", {})
+
+    # A queued job is cancelled straight away and never starts
+    assert queue.cancel(waiting["id"])["status"] == CANCELLED
+    # A running one stops at its next check
+    queue.cancel(running["id"])
+    assert wait_for(queue.get, running["id"])["status"] == CANCELLED
+    assert queue.get(waiting["id"])["attempts"] == 0
+
+    # Cancelled jobs keep their payload for a retry
+    gate.set()
+    assert queue.retry(running["id"])["status"] == QUEUED
+    assert wait_for(queue.get, running["id"])["result"] == "released"
+
+def test_submit_refuses_unknown_kinds_and_a_full_queue(queue):
+    with pytest.raises(ValueError):
+        queue.submit("no-such-kind", None)
+    queue.submit("test-wait", {})
+    queue.submit("test-wait", {})
+    with pytest.raises(QueueFull):
+        queue.submit("test-wait", {})
+
+def poll(client, headers, job_id):
+    return wait_for(lambda i: client.get(f"/api/jobs/{i}", headers=headers).json(), job_id)
+
+def test_import_and_export_jobs(client, make_user):
+    user, other = make_user(), make_user()
+    document = puzzle_document("Job import")
+    files = [("files", ("a.json", document)), ("files", ("b.json", document)),
+             ("files", ("c.json", b"{not json"))]
+    response = client.post("/api/jobs/import", headers=user, files=files)
+    assert response.status_code == 202
+    job = poll(client, user, response.json()["id"])
+    assert job["status"] == SUCCEEDED
+    result = job["result"]
+    assert len(result["puzzle_ids"]) == 1
+    assert result["duplicates"] == [{"filename": "b.json", "puzzle_id": result["puzzle_ids"][0]}]
+    assert [error["filename"] for error in result["errors"]] == ["c.json"]
+    # Jobs are private to their submitter
+    assert client.get(f"/api/jobs/{job['id']}", headers=other).status_code == 404
+
+    response = client.post(f"/api/jobs/export/{result['puzzle_ids'][0]}/nyt", headers=user)
+    assert response.status_code == 202
+    job = poll(client, user, response.json()["id"])
+    assert job["status"] == SUCCEEDED
+    assert "content" not in job["result"]
+    download = client.get(job["download_url"], headers=user)
+    assert download.status_code == 200
+    assert download.json()["title"] == "Job import"
+    assert client.post(f"/api/jobs/{job['id']}/retry", headers=user).status_code == 409
+
+def test_import_of_only_bad_files_fails(client, make_user):
+    user = make_user()
+    response = client.post("/api/jobs/import", headers=user, files=[("files", ("bad.json", b"{not json"))])
+    job = poll(client, user, response.json()["id"])
+    assert job["status"] == FAILED
+    assert job["error"].startswith("bad.json:")
+    assert client.post("/api/jobs/import", headers=user,
+                       files=[("files", ("notes.txt", b"x"))]).status_code == 400
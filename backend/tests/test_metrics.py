@@ -0,0 +1,133 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.middleware.metrics import (
+    MetricsMiddleware, MetricsRegistry, MultiprocessMetrics, instrument_engine, merge_snapshots, registry
+)
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    instrument_engine(engine)
+    return engine
+
+@pytest.fixture
+def measured(engine):
+    """TestClient for an app issuing ``?queries=`` statements, with the given middleware options."""
+    def make(slow_request_ms=None, n_plus_one_threshold=5):
+        app = FastAPI()
+
+        @app.get("/items/{item_id}")
+        def item(item_id: int, queries: int = 1):
+            with engine.connect() as conn:
+                for _ in range(queries):
+                    conn.execute(text("SELECT 1"))
+            return {"id": item_id}
+
+        app.add_middleware(MetricsMiddleware, slow_request_ms=slow_request_ms,
+                           n_plus_one_threshold=n_plus_one_threshold)
+        return TestClient(app)
+    return make
+
+def histogram(name, labels):
+    key = sorted(labels.items())
+    for series_key, counts, total, count in registry.snapshot()["histograms"][name]:
+        if sorted(map(tuple, series_key)) == key:
+            return counts, total, count
+    return None, 0.0, 0
+
+def test_requests_are_counted_by_route_template(measured):
+    client = measured()
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    before = registry.get("http_requests_total", {**labels, "status": "200"})
+    _, queries_before, count_before = histogram("http_request_sql_queries", labels)
+
+    assert client.get("/items/1?queries=3").status_code == 200
+    assert client.get("/items/2?queries=2").status_code == 200
+    assert client.get("/nowhere").status_code == 404
+
+    assert registry.get("http_requests_total", {**labels, "status": "200"}) == before + 2
+    assert registry.get("http_requests_total", {"method": "GET", "route": "unmatched", "status": "404"}) >= 1
+    _, queries, count = histogram("http_request_sql_queries", labels)
+    assert (queries - queries_before, count - count_before) == (5, 2)
+
+def test_n_plus_one_and_slow_requests_are_flagged(measured, caplog):
+    labels = {"method": "GET", "route": "/items/{item_id}"}
+    client = measured()
+    before = registry.get("http_request_n_plus_one_total", labels)
+    with caplog.at_level(logging.WARNING, logger="app.metrics"):
+        client.get("/items/1?queries=4")
+        client.get("/items/1?queries=7")
+    assert registry.get("http_request_n_plus_one_total", labels) == before + 1
+    assert "Possible N+1: GET /items/{item_id} issued 7 queries (7 x SELECT 1)" in caplog.text
+
+    slow_before = registry.get("http_slow_requests_total", labels)
+    with caplog.at_level(logging.WARNING, logger="app.metrics"):
+        measured(slow_request_ms=0, n_plus_one_threshold=0).get("/items/3?queries=2")
+    assert registry.get("http_slow_requests_total", labels) == slow_before + 1
+    assert "Slow request: GET /items/3" in caplog.text
+
+def test_render_prometheus_text():
+    metrics = MetricsRegistry()
+    metrics.counter("jobs_total", "Jobs run")
+    metrics.histogram("job_seconds", "Job time", (1, 5))
+    metrics.inc("jobs_total", {"kind": "import"}, 2)
+    for value in (0.5, 3, 9):
+        metrics.observe("job_seconds", value, {"kind": "import"})
+    assert metrics.render().splitlines() == [
+        "# HELP jobs_total Jobs run",
+        "# TYPE jobs_total counter",
+        'jobs_total{kind="import"} 2',
+        "# HELP job_seconds Job time",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{kind="import",le="1"} 1',
+        'job_seconds_bucket{kind="import",le="5"} 2',
+        'job_seconds_bucket{kind="import",le="+Inf"} 3',
+        'job_seconds_sum{kind="import"} 12.5',
+        'job_seconds_count{kind="import"} 3',
+    ]
+
+def worker_registry(count):
+    metrics = MetricsRegistry()
+    metrics.counter("jobs_total", "Jobs run")
+    metrics.histogram("job_seconds", "Job time", (1, 5))
+    metrics.inc("jobs_total", {"kind": "import"}, count)
+    metrics.observe("job_seconds", count, {"kind": "import"})
+    return metrics
+
+def test_multiprocess_totals_survive_recycled_workers(tmp_path):
+    own = worker_registry(1)
+    shared = MultiprocessMetrics(own, str(tmp_path))
+    # Files other workers wrote, one of which then exits
+    shared._write("101.json", worker_registry(10).snapshot())
+    shared._write("102.json", worker_registry(100).snapshot())
+
+    def total():
+        snapshot = shared.collect()
+        counters = dict((tuple(map(tuple, key)), value) for key, value in snapshot["counters"]["jobs_total"])
+        return counters[(("kind", "import"),)]
+
+    assert total() == 111
+    shared.retire(101)
+    assert not (tmp_path / "101.json").exists()
+    assert total() == 111
+    shared.retire(101)  # Already folded
+    assert total() == 111
+
+    merged = merge_snapshots([worker_registry(2).snapshot(), worker_registry(3).snapshot()])
+    _, counts, total_seconds, count = merged["histograms"]["job_seconds"][0]
+    assert (counts, total_seconds, count) == ([0, 2, 0], 5, 2)
+
+    shared.reset()
+    assert not list(tmp_path.glob("*.json"))
+
+def test_metrics_endpoint(client):
+    client.get("/api/puzzles/")
+    body = client.get("/metrics").text
+    assert "# TYPE http_requests_total counter" in body
+    assert 'http_requests_total{method="GET",route="/api/puzzles/",status="200"}' in body
@@ -0,0 +1,53 @@
+import itertools
+import time
+
+import pytest
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.puzzle import Puzzle
+
+_levels = (f"level-{n}" for n in itertools.count())
+
+@pytest.fixture
+def level():
+    """A difficulty no other test's puzzles have."""
+    return next(_levels)
+
+def next_id(client, headers, level):
+    response = client.get("/api/puzzles/next", headers=headers, params={"difficulty": level})
+    return response.json()["id"] if response.status_code == 200 else None
+
+def test_offers_unsolved_puzzles_only(client, make_user, make_puzzle, level):
+    user = make_user()
+    ids = {make_puzzle(make_user(), difficulty=level)["id"] for _ in range(3)}
+    offered = next_id(client, user, level)
+    assert offered in ids
+    client.post("/api/progress/", headers=user, json={
+        "puzzle_id": offered, "current_state": {}, "completion_percentage": 100
+    })
+    assert {next_id(client, user, level) for _ in range(10)} <= ids - {offered}
+
+def test_new_puzzles_are_offered_after_running_out(client, make_user, make_puzzle, level):
+    user = make_user()
+    assert next_id(client, user, level) is None
+    puzzle_id = make_puzzle(make_user(), difficulty=level)["id"]
+    assert next_id(client, user, level) == puzzle_id
+
+def test_empty_draws_expire(client, make_user, make_puzzle, level, monkeypatch):
+    monkeypatch.setattr(settings, "NEXT_PUZZLE_EMPTY_CACHE_SECONDS", 0.2)
+    user = make_user()
+    author = make_puzzle(make_user())["author_id"]
+    assert next_id(client, user, level) is None
+    # Stored by another worker: this one's cache isn't told
+    db = SessionLocal()
+    try:
+        puzzle = Puzzle(title="Elsewhere", author_id=author, grid_size=5, difficulty=level)
+        db.add(puzzle)
+        db.commit()
+        puzzle_id = puzzle.id
+    finally:
+        db.close()
+    assert next_id(client, user, level) is None
+    time.sleep(0.25)
+    assert next_id(client, user, level) == puzzle_id
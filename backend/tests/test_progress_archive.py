@@ -0,0 +1,96 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.user_progress import UserProgress
+from app.utils import progress_archive
+from app.utils.progress_archive import archive_completed, decompress_state
+
+SOLVED = {"0,0": "A", "0,1": "B", "4,4": "Y"}
+
+@pytest.fixture
+def solved(client, make_user, make_puzzle):
+    """A user's completed save, finished 60 days ago; returns (headers, puzzle id, progress id)."""
+    solver = make_user()
+    puzzle_id = make_puzzle(make_user())["id"]
+    response = client.post("/api/progress/", headers=solver, json={
+        "puzzle_id": puzzle_id, "current_state": SOLVED, "completion_percentage": 100, "completion_time": 90
+    })
+    progress_id = response.json()["id"]
+    db = SessionLocal()
+    try:
+        db.get(UserProgress, progress_id).completed_at = datetime.now(timezone.utc) - timedelta(days=60)
+        db.commit()
+    finally:
+        db.close()
+    return solver, puzzle_id, progress_id
+
+def load(progress_id):
+    db = SessionLocal()
+    try:
+        return db.get(UserProgress, progress_id)
+    finally:
+        db.close()
+
+def archive(**kwargs):
+    db = SessionLocal()
+    try:
+        return archive_completed(db, 30, **kwargs)
+    finally:
+        db.close()
+
+def test_archive_and_restore_round_trip(client, solved):
+    solver, puzzle_id, progress_id = solved
+    before = load(progress_id)
+
+    totals = archive()
+    assert totals["rows"] >= 1
+    row = load(progress_id)
+    assert row.current_state is None
+    assert json.loads(decompress_state(row.state_archive)) == SOLVED
+    assert row.last_played == before.last_played
+    # Served decompressed, and skipped by the next run
+    assert json.loads(client.get(f"/api/progress/{puzzle_id}", headers=solver).json()["current_state"]) == SOLVED
+    assert archive()["rows"] == 0
+
+    # Saving again brings the state back to the hot tier
+    replay = dict(SOLVED, **{"2,2": "M"})
+    client.post("/api/progress/", headers=solver, json={
+        "puzzle_id": puzzle_id, "current_state": replay, "completion_percentage": 100
+    })
+    row = load(progress_id)
+    assert (json.loads(row.current_state), row.state_archive) == (replay, None)
+
+def test_dry_run_writes_nothing(solved):
+    _, _, progress_id = solved
+    assert archive(dry_run=True)["rows"] >= 1
+    assert load(progress_id).state_archive is None
+
+def test_save_between_read_and_write_is_kept(client, solved, monkeypatch):
+    solver, puzzle_id, progress_id = solved
+    read_state, newer = dict(SOLVED, **{"3,3": "S"}), dict(SOLVED, **{"1,1": "G"})
+    db = SessionLocal()
+    try:
+        # A state no other test's row has, to recognise this row below
+        db.get(UserProgress, progress_id).current_state = json.dumps(read_state)
+        db.commit()
+    finally:
+        db.close()
+    compress = progress_archive.compress_state
+
+    def save_then_compress(state):
+        # A save that commits after the archiver read the row
+        if json.loads(state) == read_state:
+            client.post("/api/progress/", headers=solver, json={
+                "puzzle_id": puzzle_id, "current_state": newer, "completion_percentage": 100
+            })
+        return compress(state)
+
+    monkeypatch.setattr(progress_archive, "compress_state", save_then_compress)
+    # One row per transaction, so SQLite isn't holding a write lock from earlier rows
+    archive(batch_size=1)
+    row = load(progress_id)
+    assert json.loads(row.current_state) == newer
+    assert row.state_archive is None
@@ -0,0 +1,116 @@
+import json
+
+import pytest
+
+from app.api.puzzles import prune_progress
+from app.database import SessionLocal
+from app.models.user_progress import UserProgress
+from .conftest import ROWS
+
+@pytest.fixture
+def author(make_user):
+    return make_user()
+
+@pytest.fixture
+def puzzle(make_puzzle, author):
+    return make_puzzle(author, title="Patch test")
+
+def clues_by_key(body):
+    return {(clue["number"], clue["direction"]): clue for clue in body["clues"]}
+
+def save(client, headers, puzzle_id, state, percentage):
+    response = client.post("/api/progress/", headers=headers, json={
+        "puzzle_id": puzzle_id, "current_state": state, "completion_percentage": percentage
+    })
+    assert response.status_code == 200
+
+def saved_state(client, headers, puzzle_id):
+    return json.loads(client.get(f"/api/progress/{puzzle_id}", headers=headers).json()["current_state"])
+
+def test_clue_text_only(client, author, puzzle):
+    response = client.patch(f"/api/puzzles/{puzzle['id']}", headers=author, json={
+        "clues": [{"number": 6, "direction": "ACROSS", "text": "Reworded", "answer": "FGHIJ"}]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["changes"] == {"fields": [], "cells": 0, "clues_added": 0, "clues_updated": 1,
+                               "clues_removed": 0, "progress_pruned": 0}
+    assert clues_by_key(body)[(6, "ACROSS")]["text"] == "Reworded"
+
+def test_no_op_patch_changes_nothing(client, author, puzzle):
+    response = client.patch(f"/api/puzzles/{puzzle['id']}", headers=author, json={"title": "Patch test"})
+    assert not any(response.json()["changes"].values())
+
+def test_letter_change_updates_answers_and_prunes_unfinished_progress(client, author, make_user, puzzle):
+    puzzle_id = puzzle["id"]
+    solver, finisher = make_user(), make_user()
+    save(client, solver, puzzle_id, {"0,0": "A", "0,1": "B", "4,4": "Y"}, 40)
+    finished = {f"{r},{c}": ROWS[r][c] for r in range(5) for c in range(5)}
+    save(client, finisher, puzzle_id, finished, 100)
+    # Cache the answer index before the edit
+    assert client.post(f"/api/puzzles/{puzzle_id}/reveal", json={"scope": "square", "row": 0, "col": 0}).json() \
+        == {"letters": {"0,0": "A"}}
+
+    response = client.patch(f"/api/puzzles/{puzzle_id}", headers=author, json={
+        "cells": [{"row": 0, "col": 0, "solution": "Z", "is_black_square": False}]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["changes"]["cells"] == 1
+    assert body["changes"]["progress_pruned"] == 1
+    clues = clues_by_key(body)
+    assert clues[(1, "ACROSS")]["answer"] == "ZBCDE"
+    assert clues[(1, "DOWN")]["answer"] == "ZFKPU"
+    assert clues[(1, "ACROSS")]["text"] == "Across 1"
+
+    assert saved_state(client, solver, puzzle_id) == {"0,1": "B", "4,4": "Y"}
+    assert saved_state(client, finisher, puzzle_id) == finished
+    assert client.post(f"/api/puzzles/{puzzle_id}/reveal", json={"scope": "square", "row": 0, "col": 0}).json() \
+        == {"letters": {"0,0": "Z"}}
+
+def test_block_change_renumbers_and_keeps_clues_with_their_squares(client, author, puzzle):
+    response = client.patch(f"/api/puzzles/{puzzle['id']}", headers=author, json={
+        "cells": [{"row": 0, "col": 2, "is_black_square": True}]
+    })
+    assert response.status_code == 200
+    body = response.json()
+    clues = clues_by_key(body)
+    # 6A (row 1) and 4D/5D (columns 3, 4) keep their squares under new numbers
+    assert clues[(5, "ACROSS")]["text"] == "Across 6"
+    assert clues[(3, "DOWN")]["text"] == "Down 4"
+    assert clues[(4, "DOWN")]["text"].startswith("Down 5 #")
+    assert clues[(1, "DOWN")]["text"] == "Down 1"
+    # Row 0 across and column 2 down no longer exist as they were
+    assert body["changes"]["clues_removed"] == 2
+    assert "Across 1" not in {clue["text"] for clue in body["clues"]}
+    assert "Down 3" not in {clue["text"] for clue in body["clues"]}
+    numbers = {(cell["row"], cell["col"]): cell["number"] for cell in body["cells"]}
+    assert (numbers[(0, 3)], numbers[(1, 0)], numbers[(1, 2)]) == (3, 5, 6)
+
+def test_new_clue_must_match_the_grid(client, author, puzzle):
+    response = client.patch(f"/api/puzzles/{puzzle['id']}", headers=author, json={
+        "clues": [{"number": 6, "direction": "ACROSS", "text": "Wrong", "answer": "XXXXX"}]
+    })
+    assert response.status_code == 400
+
+def test_only_the_author_may_edit(client, make_user, puzzle):
+    response = client.patch(f"/api/puzzles/{puzzle['id']}", headers=make_user(), json={"title": "Mine"})
+    assert response.status_code == 403
+
+def test_prune_progress_skips_unrelated_and_broken_saves(client, make_user, puzzle):
+    puzzle_id = puzzle["id"]
+    users = [make_user() for _ in range(3)]
+    save(client, users[0], puzzle_id, {"2,2": "M", "3,3": "S"}, 10)
+    save(client, users[1], puzzle_id, {"4,4": "Y"}, 10)
+    save(client, users[2], puzzle_id, {}, 0)
+    db = SessionLocal()
+    try:
+        broken = db.query(UserProgress).filter(UserProgress.puzzle_id == puzzle_id).order_by(UserProgress.id).all()[2]
+        broken.current_state = "not json"
+        db.commit()
+        assert prune_progress(db, puzzle_id, [(2, 2), (0, 0)]) == 1
+        db.commit()
+    finally:
+        db.close()
+    assert saved_state(client, users[0], puzzle_id) == {"3,3": "S"}
+    assert saved_state(client, users[1], puzzle_id) == {"4,4": "Y"}
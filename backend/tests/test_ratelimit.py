@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.middleware.metrics import registry
+from app.middleware.ratelimit import Limit, MemoryBuckets, RateLimitMiddleware, RouteClass, route_class
+
+SECRET = "test-secret"
+# Tiny limits that refill far slower than a test runs
+CLASSES = {
+    "auth": RouteClass(per_ip=Limit(2, 0.01)),
+    "import": RouteClass(concurrency=1),
+    "compute": RouteClass(per_ip=Limit(100, 0.01), per_user=Limit(2, 0.01)),
+    "write": RouteClass(),
+    "read": RouteClass(per_ip=Limit(3, 0.01)),
+}
+
+def token(user):
+    return {"Authorization": f"Bearer {jwt.encode({'sub': user}, SECRET, algorithm='HS256')}"}
+
+@pytest.fixture
+def gate():
+    """(started, release) events for the slow import endpoint."""
+    return threading.Event(), threading.Event()
+
+@pytest.fixture
+def limited(gate):
+    started, release = gate
+    app = FastAPI()
+
+    @app.get("/api/puzzles/")
+    def read():
+        return {}
+
+    @app.post("/api/auth/login")
+    def login():
+        return {}
+
+    @app.get("/api/words/match")
+    def match():
+        return {}
+
+    @app.post("/api/puzzles/import")
+    def slow_import():
+        started.set()
+        release.wait(5)
+        return {}
+
+    @app.get("/metrics")
+    def metrics():
+        return {}
+
+    app.add_middleware(RateLimitMiddleware, buckets=MemoryBuckets(), secret_key=SECRET,
+                       trust_forwarded_for=True, route_classes=CLASSES)
+    return TestClient(app)
+
+def test_route_classes():
+    assert route_class("POST", "/api/auth/login") == "auth"
+    assert route_class("POST", "/api/puzzles/import") == "import"
+    assert route_class("GET", "/api/jobs/export/3") == "read"
+    assert route_class("POST", "/api/jobs/export/3") == "import"
+    assert route_class("POST", "/api/puzzles/autofill") == "compute"
+    assert route_class("GET", "/api/words/match") == "compute"
+    assert route_class("PATCH", "/api/puzzles/1") == "write"
+    assert route_class("GET", "/api/puzzles/1") == "read"
+
+def test_over_the_burst_gets_429_with_retry_after(limited):
+    shed = registry.get("http_requests_shed_total", {"route_class": "auth", "reason": "rate_ip"})
+    assert [limited.post("/api/auth/login").status_code for _ in range(3)] == [200, 200, 429]
+    response = limited.post("/api/auth/login")
+    assert response.status_code == 429
+    # One token at 0.01/s: about 100 seconds away
+    assert 90 <= int(response.headers["Retry-After"]) <= 100
+    assert registry.get("http_requests_shed_total", {"route_class": "auth", "reason": "rate_ip"}) == shed + 2
+
+def test_buckets_are_per_client_ip(limited):
+    for _ in range(3):
+        assert limited.get("/api/puzzles/", headers={"X-Forwarded-For": "10.0.0.1"}).status_code == 200
+    assert limited.get("/api/puzzles/", headers={"X-Forwarded-For": "10.0.0.1"}).status_code == 429
+    # Only the last hop counts: a client can't pick its own bucket
+    assert limited.get("/api/puzzles/", headers={"X-Forwarded-For": "10.0.0.2, 10.0.0.1"}).status_code == 429
+    assert limited.get("/api/puzzles/", headers={"X-Forwarded-For": "10.0.0.2"}).status_code == 200
+
+def test_buckets_are_per_user(limited):
+    assert [limited.get("/api/words/match", headers=token("ann")).status_code for _ in range(3)] == [200, 200, 429]
+    assert limited.get("/api/words/match", headers=token("bob")).status_code == 200
+    # An unverifiable token is only limited by IP
+    forged = {"Authorization": "Bearer " + jwt.encode({"sub": "ann"}, "wrong", algorithm="HS256")}
+    assert limited.get("/api/words/match", headers=forged).status_code == 200
+
+def test_exempt_paths_are_not_limited(limited):
+    assert all(limited.get("/metrics").status_code == 200 for _ in range(10))
+
+def test_concurrency_cap_sheds_with_503(limited, gate):
+    started, release = gate
+    first = {}
+    worker = threading.Thread(target=lambda: first.update(response=limited.post("/api/puzzles/import")))
+    worker.start()
+    try:
+        assert started.wait(5)
+        response = limited.post("/api/puzzles/import")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+    finally:
+        release.set()
+        worker.join()
+    assert first["response"].status_code == 200
+    # The slot is free again
+    assert limited.post("/api/puzzles/import").status_code == 200
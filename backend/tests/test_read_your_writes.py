@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.api import progress
+from app.database import PRIMARY_COOKIE, PRIMARY_HEADER, Base
+from app.middleware.replica import ReadYourWritesMiddleware
+
+@pytest.fixture
+def replica_client(tmp_path, monkeypatch):
+    """The progress API with reads going to a replica that never catches up."""
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Base.metadata.create_all(bind=replica)
+    monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(autocommit=False, autoflush=False, bind=replica))
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, window=10)
+    app.include_router(progress.router, prefix="/api/progress")
+    yield TestClient(app)
+    replica.dispose()
+
+@pytest.fixture
+def saved(replica_client, make_user, make_puzzle):
+    solver = make_user()
+    puzzle_id = make_puzzle(make_user())["id"]
+    response = replica_client.post("/api/progress/", headers=solver, json={
+        "puzzle_id": puzzle_id, "current_state": {"0,0": "A"}, "completion_percentage": 4
+    })
+    assert response.status_code == 200
+    return solver, puzzle_id, response
+
+def test_write_then_read_with_the_echoed_header(replica_client, saved):
+    solver, puzzle_id, response = saved
+    until = response.headers[PRIMARY_HEADER]
+    assert float(until) > time.time()
+    replica_client.cookies.clear()
+    read = replica_client.get(f"/api/progress/{puzzle_id}", headers={**solver, PRIMARY_HEADER: until})
+    assert read.status_code == 200
+    assert read.json()["current_state"] == '{"0,0": "A"}'
+
+def test_write_then_read_with_the_cookie(replica_client, saved):
+    solver, puzzle_id, response = saved
+    assert PRIMARY_COOKIE in replica_client.cookies
+    assert replica_client.get(f"/api/progress/{puzzle_id}", headers=solver).status_code == 200
+
+def test_reads_without_a_recent_write_use_the_replica(replica_client, saved):
+    solver, puzzle_id, _ = saved
+    replica_client.cookies.clear()
+    # Not on the (empty) replica yet
+    assert replica_client.get(f"/api/progress/{puzzle_id}", headers=solver).status_code == 404
+    expired = {**solver, PRIMARY_HEADER: f"{time.time() - 1:.0f}"}
+    assert replica_client.get(f"/api/progress/{puzzle_id}", headers=expired).status_code == 404
+
+def test_failed_writes_do_not_pin(replica_client, make_user):
+    response = replica_client.post("/api/progress/", headers=make_user(), json={
+        "puzzle_id": 999999, "current_state": {}, "completion_percentage": 0
+    })
+    assert response.status_code == 404
+    assert PRIMARY_HEADER not in response.headers
+
+def test_cross_site_frontends_can_read_the_header(client):
+    response = client.get("/api/puzzles/", headers={"Origin": "http://localhost:5173"})
+    assert PRIMARY_HEADER in response.headers["access-control-expose-headers"]
@@ -0,0 +1,70 @@
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy.orm import selectinload
+
+from app.database import SessionLocal
+from app.models.puzzle import Puzzle
+from app.models.user_progress import UserProgress
+from app.schemas import progress as progress_schema, puzzle as puzzle_schema
+from app.utils import serialization
+from app.utils.serialization import dumps, progress_to_dict, puzzle_to_dict
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_dumps_with_and_without_orjson(monkeypatch, fast):
+    if not fast:
+        monkeypatch.setattr(serialization, "orjson", None)
+    data = {
+        "when": datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=timezone.utc),
+        "day": date(2024, 5, 6),
+        "direction": puzzle_schema.Direction.DOWN,
+        "text": "Café ☕",
+        1: [None, True, 1.5],
+    }
+    assert json.loads(dumps(data)) == {
+        "when": "2024-05-06T07:08:09.123456+00:00",
+        "day": "2024-05-06",
+        "direction": "DOWN",
+        "text": "Café ☕",
+        "1": [None, True, 1.5],
+    }
+    with pytest.raises(TypeError):
+        dumps({"bad": object()})
+
+def test_puzzle_dict_matches_the_response_model(client, make_user, make_puzzle, db):
+    author = make_user()
+    puzzle_id = make_puzzle(author, title="Shape test", difficulty="hard")["id"]
+    # updated_at set as well as created_at
+    client.patch(f"/api/puzzles/{puzzle_id}", headers=author, json={"description": "Edited"})
+    puzzle = db.query(Puzzle).options(selectinload(Puzzle.cells), selectinload(Puzzle.clues)) \
+        .filter(Puzzle.id == puzzle_id).one()
+
+    fast = json.loads(dumps(puzzle_to_dict(puzzle)))
+    validated = puzzle_schema.Puzzle.model_validate(puzzle).model_dump(mode="json")
+    assert fast == validated
+    assert fast["updated_at"] is not None
+    # And the endpoint serves the same document
+    served = client.get(f"/api/puzzles/{puzzle_id}").json()
+    assert served == {**validated, "user_progress": None}
+
+def test_progress_dict_matches_the_response_model(client, make_user, make_puzzle, db):
+    user = make_user()
+    puzzle_id = make_puzzle(user)["id"]
+    response = client.post("/api/progress/", headers=user, json={
+        "puzzle_id": puzzle_id, "current_state": {"0,0": "A"}, "completion_percentage": 100,
+        "completion_time": 42, "is_completed": True
+    })
+    assert response.status_code == 200
+    progress = db.query(UserProgress).filter(UserProgress.id == response.json()["id"]).one()
+
+    fast = json.loads(dumps(progress_to_dict(progress)))
+    assert fast == progress_schema.Progress.model_validate(progress).model_dump(mode="json")
+    assert fast["completed_at"] is not None
+    assert response.json() == fast
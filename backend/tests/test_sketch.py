@@ -0,0 +1,55 @@
+import random
+
+from app.utils.sketch import QuantileSketch
+
+def exact_quantile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(5, 1.5) for _ in range(20000)]
+    sketch = QuantileSketch(relative_accuracy=0.02)
+    for value in values:
+        sketch.add(value)
+    assert sketch.count == len(values)
+    for q in (0.01, 0.25, 0.5, 0.75, 0.9, 0.99):
+        expected = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - expected) <= 0.02 * expected + 1e-9
+
+def test_merge_matches_single_sketch():
+    rng = random.Random(3)
+    values = [rng.randint(1, 5000) for _ in range(5000)]
+    whole, left, right = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for n, value in enumerate(values):
+        whole.add(value)
+        (left if n % 2 else right).add(value)
+    left.merge(right)
+    assert left.count == whole.count
+    assert left.buckets == whole.buckets
+    assert [left.quantile(q) for q in (0.1, 0.5, 0.9)] == [whole.quantile(q) for q in (0.1, 0.5, 0.9)]
+
+def test_zeros_and_empty():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+    sketch.add(0)
+    sketch.add(0)
+    sketch.add(100)
+    assert sketch.quantile(0.0) == 0.0
+    assert abs(sketch.quantile(1.0) - 100) <= 2
+
+def test_bucket_limit_keeps_upper_quantiles():
+    sketch = QuantileSketch(max_buckets=32)
+    for value in range(1, 100001):
+        sketch.add(value)
+    assert len(sketch.buckets) <= 32
+    assert abs(sketch.quantile(0.99) - 99000) <= 0.02 * 99000
+
+def test_json_round_trip():
+    sketch = QuantileSketch()
+    for value in (3, 30, 300, 0):
+        sketch.add(value)
+    restored = QuantileSketch.from_json(sketch.to_json())
+    assert (restored.count, restored.zeros, restored.buckets) == (sketch.count, sketch.zeros, sketch.buckets)
+    assert restored.quantile(0.5) == sketch.quantile(0.5)
+    assert QuantileSketch.from_json(None).count == 0
@@ -0,0 +1,70 @@
+import pytest
+from sqlalchemy import update
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.puzzle import Puzzle
+from app.utils.snapshot import Snapshot, build_snapshot
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def snapshot_path(tmp_path, monkeypatch):
+    path = tmp_path / "puzzles.snapshot"
+    monkeypatch.setattr(settings, "PUZZLE_SNAPSHOT_PATH", str(path))
+    monkeypatch.setattr(settings, "SNAPSHOT_RELOAD_SECONDS", 0)
+    return path
+
+def retitle_quietly(db, puzzle_id, title):
+    """Change a puzzle without bumping its version, so only a snapshot hit shows the old title."""
+    db.execute(update(Puzzle).where(Puzzle.id == puzzle_id).values(title=title, updated_at=Puzzle.updated_at))
+    db.commit()
+
+def test_snapshot_round_trip(make_user, make_puzzle, snapshot_path, db):
+    puzzle_id = make_puzzle(make_user(), title="Mapped")["id"]
+    build_snapshot(db, str(snapshot_path), batch_size=2)
+    snapshot = Snapshot(str(snapshot_path))
+    assert len(snapshot) == db.query(Puzzle).count()
+    assert b'"title":"Mapped"' in bytes(snapshot.get(puzzle_id)).replace(b" ", b"")
+    assert snapshot.get(10 ** 9) is None
+
+def test_reads_fall_back_to_the_database_when_stale(client, make_user, make_puzzle, snapshot_path, db):
+    author = make_user()
+    kept, edited, deleted = (make_puzzle(author, title=title)["id"] for title in ("Kept", "Edited", "Deleted"))
+    build_snapshot(db, str(snapshot_path))
+    for puzzle_id in (kept, edited):
+        retitle_quietly(db, puzzle_id, "Changed quietly")
+    added = make_puzzle(author, title="Added")["id"]
+
+    # Unchanged puzzles come from the snapshot, in both formats
+    assert client.get(f"/api/puzzles/{kept}").json()["title"] == "Kept"
+    assert client.get(f"/api/puzzles/{kept}?format=compact").json()["title"] == "Kept"
+    # An edit bumps the version, so the database is read instead
+    assert client.patch(f"/api/puzzles/{edited}", headers=author, json={"title": "Edited again"}).status_code == 200
+    assert client.get(f"/api/puzzles/{edited}").json()["title"] == "Edited again"
+    # Deleted and newer puzzles are never served from the file
+    assert client.delete(f"/api/puzzles/{deleted}", headers=author).status_code == 200
+    assert client.get(f"/api/puzzles/{deleted}").status_code == 404
+    assert client.get(f"/api/puzzles/{added}").json()["title"] == "Added"
+
+def test_unverified_reads_trust_the_snapshot(client, make_user, make_puzzle, snapshot_path, db, monkeypatch):
+    author = make_user()
+    puzzle_id = make_puzzle(author, title="Trusted")["id"]
+    build_snapshot(db, str(snapshot_path))
+    client.patch(f"/api/puzzles/{puzzle_id}", headers=author, json={"title": "Edited"})
+    monkeypatch.setattr(settings, "SNAPSHOT_VERIFY", False)
+    assert client.get(f"/api/puzzles/{puzzle_id}").json()["title"] == "Trusted"
+
+def test_unreadable_snapshot_is_ignored(client, make_user, make_puzzle, snapshot_path, db):
+    puzzle_id = make_puzzle(make_user(), title="Fallback")["id"]
+    build_snapshot(db, str(snapshot_path))
+    whole = snapshot_path.read_bytes()
+    for damaged in (b"not a snapshot at all, just some bytes", whole[:10], whole[:40]):
+        snapshot_path.write_bytes(damaged)
+        assert client.get(f"/api/puzzles/{puzzle_id}").json()["title"] == "Fallback"
+    snapshot_path.unlink()
+    assert client.get(f"/api/puzzles/{puzzle_id}").json()["title"] == "Fallback"
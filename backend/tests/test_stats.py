@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.database import SessionLocal, insert_or_ignore
+from app.models.puzzle_stats import PuzzleStats
+from app.models.user_progress import UserProgress
+from app.utils.stats import rebuild_stats
+
+def save(client, headers, puzzle_id, percentage, time=None, score=None):
+    response = client.post("/api/progress/", headers=headers, json={
+        "puzzle_id": puzzle_id, "current_state": {}, "completion_percentage": percentage,
+        "completion_time": time, "score": score
+    })
+    assert response.status_code == 200
+
+@pytest.fixture
+def played(client, make_user, make_puzzle):
+    """A puzzle started by three users, two of whom finished it (one saved twice more)."""
+    puzzle_id = make_puzzle(make_user())["id"]
+    first, second, third = make_user(), make_user(), make_user()
+    save(client, first, puzzle_id, 10)
+    save(client, first, puzzle_id, 100, time=120, score=50)
+    save(client, first, puzzle_id, 100, time=120, score=50)  # Already complete: not counted again
+    save(client, second, puzzle_id, 100, time=300, score=30)
+    save(client, third, puzzle_id, 40)
+    return puzzle_id
+
+def test_saves_update_the_counters(client, played):
+    stats = client.get(f"/api/puzzles/{played}/stats").json()
+    assert (stats["starts"], stats["completions"], stats["timed_completions"]) == (3, 2, 2)
+    assert stats["average_score"] == 40
+    assert stats["average_solve_time"] == 210
+
+def test_missing_stats_row_is_created_on_first_save(client, make_user, played):
+    db = SessionLocal()
+    try:
+        db.query(PuzzleStats).filter(PuzzleStats.puzzle_id == played).delete()
+        db.commit()
+    finally:
+        db.close()
+    save(client, make_user(), played, 100, time=60)
+    stats = client.get(f"/api/puzzles/{played}/stats").json()
+    assert (stats["starts"], stats["completions"], stats["timed_completions"]) == (1, 1, 1)
+
+def test_rebuild_matches_incremental_stats(client, played):
+    before = client.get(f"/api/puzzles/{played}/stats").json()
+    db = SessionLocal()
+    try:
+        assert rebuild_stats(db) >= 1
+    finally:
+        db.close()
+    assert client.get(f"/api/puzzles/{played}/stats").json() == before
+
+def test_one_progress_row_per_user_and_puzzle(client, make_user, played):
+    db = SessionLocal()
+    try:
+        existing = db.query(UserProgress).filter(UserProgress.puzzle_id == played).first()
+        # What a racing first save does: its insert is skipped, so it isn't a second start
+        assert not insert_or_ignore(db, UserProgress, {"user_id": existing.user_id, "puzzle_id": played})
+        db.add(UserProgress(user_id=existing.user_id, puzzle_id=played))
+        with pytest.raises(IntegrityError):
+            db.flush()
+        db.rollback()
+    finally:
+        db.close()
+    assert client.get(f"/api/puzzles/{played}/stats").json()["starts"] == 3
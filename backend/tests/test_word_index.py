@@ -0,0 +1,111 @@
+import pickle
+from datetime import datetime, timezone
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.puzzle import Clue, Puzzle
+from app.utils import word_index
+from app.utils.word_index import WordIndex, build_word_index, get_word_index, refresh_word_index
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+def test_discarded_words_stop_matching_and_can_return():
+    index = WordIndex()
+    index.add_many(["CAT", "COT", "CUT"])
+    assert index.discard_many(["cot", "DOG"]) == 1
+    assert "COT" not in index
+    assert index.match("C?T") == ["CAT", "CUT"]
+    assert index.count("C?T") == 2
+
+    # Later additions don't resurrect it; adding it back does
+    index.add_many(["CIT"])
+    assert index.match("C?T") == ["CAT", "CUT", "CIT"]
+    assert index.add("COT")
+    assert index.count("C?T") == 4
+
+def test_snapshot_round_trip(tmp_path):
+    index = WordIndex()
+    index.add_many(["CAT", "COT", "CUT", "ÉTÉ", "STORM", "AB"])
+    index.discard_many(["COT"])
+    path = tmp_path / "words.snap"
+    index.save(str(path))
+
+    loaded = WordIndex.load(str(path))
+    assert len(loaded) == len(index) == 5
+    assert "COT" not in loaded
+    for pattern in ("C?T", "?T?", "S...M", "??"):
+        assert loaded.match(pattern) == index.match(pattern)
+    assert loaded.position("CUT") == index.position("CUT")
+
+def test_snapshot_rejects_damaged_and_foreign_files(tmp_path):
+    index = WordIndex()
+    index.add_many(["CAT", "COT"])
+    path = tmp_path / "words.snap"
+    index.save(str(path))
+    data = bytearray(path.read_bytes())
+
+    data[-1] ^= 1
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        WordIndex.load(str(path))
+
+    path.write_bytes(bytes(data[:-3]))
+    with pytest.raises(ValueError):
+        WordIndex.load(str(path))
+
+    # Old pickle snapshots are never unpickled
+    path.write_bytes(pickle.dumps({"version": 1, "buckets": {}}))
+    with pytest.raises(ValueError):
+        WordIndex.load(str(path))
+
+def test_build_replaces_a_bad_snapshot_with_the_word_list(tmp_path, db):
+    words, snap = tmp_path / "words.txt", tmp_path / "words.snap"
+    words.write_text("# scored list\nLISTED;50\nOTHER\n")
+    snap.write_bytes(b"not a snapshot")
+
+    assert "LISTED" in build_word_index(db, str(words), str(snap))
+    # The snapshot is rewritten with the word list alone
+    assert sorted(WordIndex.load(str(snap)).match("??????", limit=None)) == ["LISTED"]
+    assert len(WordIndex.load(str(snap))) == 2
+
+def set_answer(db, clue_id, answer):
+    """Change a clue the way another worker's edit would, bypassing this worker's index."""
+    clue = db.get(Clue, clue_id)
+    clue.answer = answer
+    db.get(Puzzle, clue.puzzle_id).updated_at = datetime.now(timezone.utc)
+    db.commit()
+
+def test_refresh_follows_edited_and_deleted_answers(client, make_user, make_puzzle, tmp_path, db):
+    words = tmp_path / "words.txt"
+    words.write_text("KEEPQ\n")
+    build_word_index(db, str(words))
+    author = make_user()
+    puzzle = make_puzzle(author)
+    make_puzzle(author)
+    clue_ids = [clue_id for (clue_id,) in db.query(Clue.id).filter(Clue.puzzle_id == puzzle["id"]).order_by(Clue.id)]
+    index = get_word_index()
+
+    set_answer(db, clue_ids[0], "ZQXJA")
+    refresh_word_index(db, 0)
+    assert "ZQXJA" in index
+
+    # Replaced answers go, unless the word list has them
+    set_answer(db, clue_ids[0], "KEEPQ")
+    set_answer(db, clue_ids[1], "ZQXJB")
+    refresh_word_index(db, 0)
+    assert "ZQXJA" not in index
+    assert "ZQXJB" in index and "KEEPQ" in index
+    assert index.match("ZQXJ?") == ["ZQXJB"]
+
+    # Deleting through this worker refreshes on the next lookup
+    assert client.delete(f"/api/puzzles/{puzzle['id']}", headers=author).status_code == 200
+    body = client.get("/api/words/match", params={"pattern": "ZQXJ?"}).json()
+    assert body["count"] == 0
+    # Answers another puzzle still uses stay
+    assert "KEEPQ" in index and "ABCDE" in index
+    assert "ZQXJB" not in word_index._answer_words
@@ -4,8 +4,11 @@ import { Provider } from 'react-redux'
 import { BrowserRouter } from 'react-router-dom'
 import App from './App.tsx'
 import { store } from './store/store.ts'
+import { installReadYourWrites } from './utils/readYourWrites.ts'
 import './index.css'
 
+installReadYourWrites()
+
 ReactDOM.createRoot(document.getElementById('root')!).render(
   <React.StrictMode>
     <Provider store={store}>
@@ -0,0 +1,26 @@
+import axios from 'axios'
+
+// After a write, the API answers with X-Read-Primary-Until (Unix seconds):
+// until then this client's reads must go to the primary database, not a
+// lagging replica. The API is on another site, so its cookie isn't sent
+// back; echo the header on every request instead.
+const PRIMARY_HEADER = 'X-Read-Primary-Until'
+
+let readPrimaryUntil = 0
+
+export function installReadYourWrites(): void {
+  axios.interceptors.request.use(request => {
+    if (readPrimaryUntil > Date.now() / 1000) {
+      request.headers.set(PRIMARY_HEADER, String(readPrimaryUntil))
+    }
+    return request
+  })
+
+  axios.interceptors.response.use(response => {
+    const until = Number(response.headers[PRIMARY_HEADER.toLowerCase()])
+    if (until > readPrimaryUntil) {
+      readPrimaryUntil = until
+    }
+    return response
+  })
+}
@@ -4,11 +4,40 @@
 import sys
 import os
 
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+
 # Add backend directory to Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
+sys.path.insert(0, BACKEND_DIR)
+
+def __getattr__(name):
+    # `main:app` still works, but importing this module doesn't load the app:
+    # the app creates missing tables on import, so migrations must run first
+    if name == "app":
+        from app.main import app
+        return app
+    raise AttributeError(name)
 
-from app.main import app
+def serve_multiprocess():
+    """Replace this process with gunicorn (see backend/gunicorn.conf.py)."""
+    os.chdir(BACKEND_DIR)
+    os.execvp(sys.executable, [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"])
 
 if __name__ == "__main__":
     import uvicorn
+    from migrate import migrate
+
+    from app.config import settings
+
+    migrate()
+    # One worker per core when REDIS_URL shares job and rate-limit state
+    # between them (see backend/gunicorn.conf.py), otherwise a single process
+    workers = int(os.environ.get("WEB_CONCURRENCY", (os.cpu_count() or 1) if settings.REDIS_URL else 1))
+    if workers > 1 and os.name == "posix":
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            print("gunicorn is not installed; serving with a single process", file=sys.stderr)
+        else:
+            serve_multiprocess()
+    from app.main import app
     uvicorn.run(app, host="0.0.0.0", port=int(os.environ.get("PORT", 8000)))
\ No newline at end of file